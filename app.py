@@ -1,12 +1,35 @@
-from flask import Flask, flash, render_template, request, redirect, url_for, session
+from flask import (Flask, flash, g, has_app_context, has_request_context, jsonify, render_template, request,
+                   redirect, send_file, url_for, session)
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
 import psycopg2.extras
+import psycopg2.pool
+from itsdangerous import BadSignature, URLSafeSerializer
+from werkzeug.http import is_resource_modified
 from werkzeug.security import check_password_hash, generate_password_hash
+import base64
+import bisect
 import calendar
-from datetime import datetime, date
-from functools import wraps
+import concurrent.futures
+import csv
+import hashlib
+import heapq
+import hmac
+import io
+import itertools
+import json
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache, wraps
+import select
 import smtplib
+import tempfile
+import threading
+import time
 import os
+import uuid
 
 
 app = Flask(__name__)
@@ -15,59 +38,889 @@ app.secret_key = os.environ.get("SECRET_KEY")
 
 
 # Gmail SMTP config - Use App Password (generate at https://myaccount.google.com/apppasswords)
-SMTP_SERVER = 'smtp.gmail.com'
-SMTP_PORT = 587
+# Point SMTP_SERVER/SMTP_PORT at a local stand-in (e.g. `python -m aiosmtpd -n -l localhost:8025`
+# with SMTP_STARTTLS=0) for development and tests.
+SMTP_SERVER = os.environ.get("SMTP_SERVER", 'smtp.gmail.com')
+SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "1") == "1"
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT", 30))
 SENDER_EMAIL = os.environ.get("SENDER_EMAIL")
 SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD")
 
+# Outbox delivery (see EMAIL OUTBOX below)
+EMAIL_OUTBOX_WORKER = os.environ.get("EMAIL_OUTBOX_WORKER", "1") == "1"  # run the worker thread in web processes
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", 20))
+EMAIL_RATE_PER_MINUTE = int(os.environ.get("EMAIL_RATE_PER_MINUTE", 60))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", 6))
+EMAIL_RETRY_BASE = float(os.environ.get("EMAIL_RETRY_BASE", 30))       # seconds, doubled per failed attempt
+EMAIL_RETRY_MAX = float(os.environ.get("EMAIL_RETRY_MAX", 3600))
+EMAIL_POLL_INTERVAL = float(os.environ.get("EMAIL_POLL_INTERVAL", 5))
+EMAIL_SMTP_IDLE = float(os.environ.get("EMAIL_SMTP_IDLE", 60))         # close the SMTP session after this idle time
+
+# Password hashing (see PASSWORD HASHING below). Changing the method/cost
+# re-hashes each user's password the next time they log in.
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256:260000")
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", os.cpu_count() or 2))   # concurrent hash computations per process
+HASH_QUEUE = int(os.environ.get("HASH_QUEUE", 32))                        # logins allowed to wait for a hash worker
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", 10))
+
+# ---------------- METRICS ----------------
+# Per-process request / query / pool / SMTP measurements, served in the
+# Prometheus text format on /metrics, plus one JSON access-log line per
+# request. Each gunicorn worker counts on its own; with METRICS_DIR set
+# (a directory all workers share - empty it on deploy) every worker writes
+# its snapshot there at most every METRICS_FLUSH_INTERVAL seconds and
+# /metrics adds all of them up, so any worker can answer a scrape (and
+# drops the snapshots of workers that have exited). /metrics answers
+# scrapers that send METRICS_TOKEN and logged-in admins, nobody else.
+
+METRICS_DIR = os.environ.get("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")                  # scrapers send "Authorization: Bearer <token>"
+ACCESS_LOG = os.environ.get("ACCESS_LOG", "1") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+METRICS = {
+    # name: (type, help, buckets)
+    'http_request_duration_seconds': ('histogram', 'Request latency by route', LATENCY_BUCKETS),
+    'http_request_queries': ('histogram', 'Database statements per request', COUNT_BUCKETS),
+    'http_request_query_seconds': ('histogram', 'Database time per request', LATENCY_BUCKETS),
+    'db_pool_checkout_seconds': ('histogram', 'Time to check a connection out of the pool', LATENCY_BUCKETS),
+    'db_queries_total': ('counter', 'Database statements executed', None),
+    'smtp_send_seconds': ('histogram', 'SMTP send latency', LATENCY_BUCKETS),
+    'retention_batch_seconds': ('histogram', 'Duration of one retention archive batch', LATENCY_BUCKETS),
+    'retention_archived_total': ('counter', 'Rows moved to the archive tables by retention', None),
+    'retention_runs_total': ('counter', 'Completed retention runs by result', None),
+    'partition_changes_total': ('counter', 'Monthly meeting partitions created / detached / failed', None),
+    'page_cache_requests_total': ('counter', 'Page cache lookups by route and hit / miss', None),
+}
+
+_metrics = {}                   # name -> {labels (sorted tuple of pairs): value or [bucket counts..., sum, count]}
+_metrics_lock = threading.Lock()
+_metrics_flushed = 0.0
+
+
+def observe(name, value, **labels):
+    """Record value in histogram name (see METRICS)."""
+    buckets = METRICS[name][2]
+    key = tuple(sorted(labels.items()))
+    with _metrics_lock:
+        series = _metrics.setdefault(name, {})
+        entry = series.get(key)
+        if entry is None:
+            entry = series[key] = [0] * len(buckets) + [0.0, 0]
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                entry[i] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+
+def count(name, amount=1, **labels):
+    """Add amount to counter name (see METRICS)."""
+    key = tuple(sorted(labels.items()))
+    with _metrics_lock:
+        series = _metrics.setdefault(name, {})
+        series[key] = series.get(key, 0) + amount
+
+
+def record_query(seconds):
+    """Account one database statement to the metrics and the current request."""
+    count('db_queries_total')
+    if has_request_context():
+        g._query_count = g.get('_query_count', 0) + 1
+        g._query_seconds = g.get('_query_seconds', 0.0) + seconds
+
+
+def flush_metrics(force=False):
+    """Write this process's snapshot to METRICS_DIR (rate limited unless force)."""
+    global _metrics_flushed
+    if not METRICS_DIR or (not force and time.monotonic() - _metrics_flushed < METRICS_FLUSH_INTERVAL):
+        return
+    _metrics_flushed = time.monotonic()
+    with _metrics_lock:
+        snapshot = {name: [[list(key), value] for key, value in series.items()]
+                    for name, series in _metrics.items()}
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    try:
+        with open(path + ".tmp", "w") as f:
+            json.dump(snapshot, f)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"❌ Metrics flush failed: {e}")
+
+
+def _process_alive(pid):
+    """Whether the worker that wrote snapshot <pid>.json is still running (on this host)."""
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect_metrics():
+    """All processes' metrics added up (just this process without METRICS_DIR)."""
+    if not METRICS_DIR:
+        with _metrics_lock:
+            return {name: {key: (list(value) if isinstance(value, list) else value)
+                           for key, value in series.items()}
+                    for name, series in _metrics.items()}
+
+    flush_metrics(force=True)
+    merged = {}
+    for filename in os.listdir(METRICS_DIR):
+        if not filename.endswith(".json"):
+            continue
+        if not _process_alive(filename[:-len(".json")]):
+            try:
+                os.remove(os.path.join(METRICS_DIR, filename))
+            except OSError:
+                pass
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, series in snapshot.items():
+            target = merged.setdefault(name, {})
+            for key, value in series:
+                key = tuple(tuple(pair) for pair in key)
+                if isinstance(value, list):
+                    total = target.setdefault(key, [0] * len(value))
+                    target[key] = [a + b for a, b in zip(total, value)]
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+
+def _label_text(pairs):
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def render_metrics(metrics):
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = metrics.get(name, {})
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for key, value in sorted(series.items()):
+            if kind == 'counter':
+                lines.append(f"{name}{_label_text(key)} {value}")
+                continue
+            for bound, n in zip(buckets, value):
+                lines.append(f"{name}_bucket{_label_text(key + (('le', bound),))} {n}")
+            lines.append(f"{name}_bucket{_label_text(key + (('le', '+Inf'),))} {value[-1]}")
+            lines.append(f"{name}_sum{_label_text(key)} {value[-2]}")
+            lines.append(f"{name}_count{_label_text(key)} {value[-1]}")
+    stats = pool_stats()
+    for field in ('open', 'in_use', 'idle'):
+        if field in stats:
+            lines += [f"# TYPE db_pool_{field} gauge", f'db_pool_{field}{{pid="{stats["pid"]}"}} {stats[field]}']
+    return '\n'.join(lines) + '\n'
+
+
+@app.before_request
+def start_request_timer():
+    g._request_started = time.perf_counter()
+    g._query_count = 0
+    g._query_seconds = 0.0
+    g._pool_seconds = 0.0
+
+
+@app.after_request
+def record_request(response):
+    started = g.get('_request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    queries, query_seconds = g.get('_query_count', 0), g.get('_query_seconds', 0.0)
+
+    observe('http_request_duration_seconds', elapsed, route=route, method=request.method,
+            status=response.status_code)
+    observe('http_request_queries', queries, route=route)
+    observe('http_request_query_seconds', query_seconds, route=route)
+    flush_metrics()
+
+    if ACCESS_LOG:
+        # Streamed responses (exports, ICS feeds) are logged when their body starts.
+        print(json.dumps({
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 2),
+            'queries': queries,
+            'query_ms': round(query_seconds * 1000, 2),
+            'pool_wait_ms': round(g.get('_pool_seconds', 0.0) * 1000, 2),
+            'user_id': session.get('user_id'),
+            'remote_addr': request.remote_addr,
+            'pid': os.getpid(),
+        }), flush=True)
+    return response
+
+
+def metrics_allowed():
+    auth = request.headers.get('Authorization', '').encode()
+    if METRICS_TOKEN and hmac.compare_digest(auth, f"Bearer {METRICS_TOKEN}".encode()):
+        return True
+    return is_admin()
+
+
+@app.route('/metrics')
+def metrics():
+    if not metrics_allowed():
+        return "Unauthorized", 401
+    return app.response_class(render_metrics(collect_metrics()),
+                              mimetype='text/plain; version=0.0.4')
+
+
 # ---------------- DATABASE CONNECTION ----------------
-def get_db():
-    """Get a new database connection per request."""
+# Pool sizing / health settings (override per environment)
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", 1))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))              # seconds to wait for a free connection
+DB_POOL_MAX_LIFETIME = float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800))  # recycle connections older than this
+DB_POOL_CHECK_IDLE = float(os.environ.get("DB_POOL_CHECK_IDLE", 30))        # ping connections idle longer than this
+
+
+def get_database_url():
     db_url = os.environ.get('DATABASE_URL', '')
     # Render gives 'postgres://' but psycopg2 needs 'postgresql://'
     if db_url.startswith('postgres://'):
         db_url = db_url.replace('postgres://', 'postgresql://', 1)
-    conn = psycopg2.connect(db_url)
+    return db_url
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers when it was opened and last used, and
+    which prepared statements (see execute_prepared) exist in its session.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.prepared = set()
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+    - opens at most maxconn connections, waits up to `timeout` for a free one
+    - pings a connection that sat idle longer than `check_idle` before handing it out
+    - recycles connections older than `max_lifetime`
+    - belongs to the process that created it (see get_pool for fork handling)
+    """
+
+    def __init__(self, dsn, minconn, maxconn, timeout, max_lifetime, check_idle):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self.pid = os.getpid()
+        self._idle = []
+        self._opened = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'connects': 0, 'checkouts': 0, 'waits': 0, 'checkout_seconds': 0.0,
+            'timeouts': 0, 'recycled': 0, 'failed_checks': 0,
+        }
+        for _ in range(minconn):
+            conn = self._connect()
+            with self._cond:
+                self._opened += 1
+                self._idle.append(conn)
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn, connection_factory=PooledConnection)
+        with self._cond:
+            self._stats['connects'] += 1
+        return conn
+
+    def _expired(self, conn):
+        return time.monotonic() - conn.created_at > self.max_lifetime
+
+    def _checkout(self, conn):
+        """Validate an idle connection (or open a new one) before handing it out."""
+        if conn is not None and (conn.closed or self._expired(conn)):
+            if not conn.closed:
+                conn.close()
+            with self._cond:
+                self._stats['recycled'] += 1
+            conn = None
+        if conn is not None and time.monotonic() - conn.last_used > self.check_idle:
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+                conn.rollback()
+            except psycopg2.Error:
+                conn.close()
+                with self._cond:
+                    self._stats['failed_checks'] += 1
+                conn = None
+        if conn is None:
+            conn = self._connect()
+        conn.last_used = time.monotonic()
+        return conn
+
+    def getconn(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        conn = None
+        with self._cond:
+            waited = False
+            while not self._idle and self._opened >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise psycopg2.pool.PoolError(
+                        f"connection pool exhausted ({self.maxconn} connections in use)"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._opened += 1
+            self._in_use += 1
+            if waited:
+                self._stats['waits'] += 1
+
+        try:
+            conn = self._checkout(conn)
+        except Exception:
+            with self._cond:
+                self._opened -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._stats['checkouts'] += 1
+            self._stats['checkout_seconds'] += time.monotonic() - started
+        return conn
+
+    def putconn(self, conn, close=False):
+        if os.getpid() != self.pid:
+            # Connection inherited through fork: the socket belongs to the parent.
+            return
+        discard = close or conn.closed or self._expired(conn)
+        if not discard and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard and not conn.closed:
+            conn.close()
+
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._opened -= 1
+                self._stats['recycled'] += 1
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            for conn in self._idle:
+                conn.close()
+            self._opened -= len(self._idle)
+            self._idle = []
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, pid=self.pid, min=self.minconn, max=self.maxconn,
+                        open=self._opened, idle=len(self._idle), in_use=self._in_use)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+# Pools inherited from a parent process (gunicorn master). Kept referenced so
+# their connections are never finalized - closing them would tear down the
+# parent's sessions.
+_inherited_pools = []
+
+
+def get_pool():
+    """Return this process's connection pool, creating it on first use / after fork."""
+    global _pool
+    pool = _pool
+    if pool is None or pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                if _pool is not None:
+                    _inherited_pools.append(_pool)
+                _pool = ConnectionPool(get_database_url(), DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT,
+                                       DB_POOL_MAX_LIFETIME, DB_POOL_CHECK_IDLE)
+            pool = _pool
+    return pool
+
+
+def pool_stats():
+    return _pool.stats() if _pool is not None and _pool.pid == os.getpid() else {}
+
+
+def get_db():
+    """Check out a pooled database connection. Hand it back with release_db()."""
+    started = time.perf_counter()
+    conn = get_pool().getconn()
+    waited = time.perf_counter() - started
+    observe('db_pool_checkout_seconds', waited)
+    if has_request_context():
+        g._pool_seconds = g.get('_pool_seconds', 0.0) + waited
+    return conn
+
+
+def release_db(conn):
+    """Return a connection obtained from get_db() to the pool."""
+    get_pool().putconn(conn)
+
+
+def _context_db():
+    """
+    Connection pinned to the current app/request context (checked out on first use).
+    It runs in autocommit mode so plain reads never leave a transaction open;
+    transaction() switches it to a real transaction for the duration of a block.
+    """
+    conn = g.get('_db_conn')
+    if conn is None or conn.closed:
+        if conn is not None:
+            release_db(conn)
+        conn = get_db()
+        conn.autocommit = True
+        g._db_conn = conn
     return conn
 
-def execute_query(query, params=None, fetch='all', commit=False):
+
+@app.teardown_appcontext
+def release_context_db(exc):
+    g.pop('_db_tx_depth', None)
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        if not conn.closed:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = False
+        release_db(conn)
+
+
+@contextmanager
+def transaction():
+    """
+    Unit of work for the current request: every execute_query() inside the
+    block runs on the request's connection and is committed once when the
+    block exits (rolled back if it raises). Nested blocks join the outer one.
+    Yields the connection for code that needs a raw cursor.
+    """
+    conn = _context_db()
+    depth = g.get('_db_tx_depth', 0)
+    if depth == 0:
+        conn.autocommit = False
+        g._db_after_commit = []
+    g._db_tx_depth = depth + 1
+    try:
+        yield conn
+        if depth == 0:
+            conn.commit()
+    except BaseException:
+        if depth == 0 and not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        g._db_tx_depth = depth
+        if depth == 0 and not conn.closed:
+            conn.autocommit = True
+    if depth == 0:
+        for callback in g.pop('_db_after_commit', []):
+            callback()
+
+
+def after_commit(callback):
+    """Run callback() once the enclosing transaction() commits (right away if there is none)."""
+    if has_app_context() and g.get('_db_tx_depth', 0) > 0:
+        g._db_after_commit.append(callback)
+    else:
+        callback()
+
+
+STREAM_ITERSIZE = int(os.environ.get("STREAM_ITERSIZE", 2000))   # rows per round trip for fetch='stream'
+
+
+@lru_cache(maxsize=512)
+def _record_type(columns):
+    base = namedtuple('Record', columns, rename=True)
+
+    class Record(base):
+        __slots__ = ()
+
+        def __getitem__(self, key):
+            return getattr(self, key) if isinstance(key, str) else tuple.__getitem__(self, key)
+
+        def get(self, key, default=None):
+            return getattr(self, key, default)
+
+    return Record
+
+
+class RecordCursor(psycopg2.extras.NamedTupleCursor):
+    """Rows as named tuples that also accept row['column'] - no per-row dict."""
+
+    def _make_nt(self):
+        return _record_type(tuple(d[0] for d in self.description) if self.description else ())
+
+
+ROW_CURSORS = {
+    'dict': None,           # plain cursor, rows zipped into dicts below
+    'tuple': None,
+    'record': RecordCursor,
+}
+
+
+def _shape_rows(cursor, rows, row_type):
+    if row_type != 'dict':
+        return rows
+    columns = [d[0] for d in cursor.description]
+    return (dict(zip(columns, row)) for row in rows)
+
+
+def _stream_rows(query, params, row_type, itersize):
+    conn = get_db()
+    try:
+        conn.autocommit = False     # named cursors only exist inside a transaction
+        with conn.cursor(name='stream', cursor_factory=ROW_CURSORS[row_type]) as cursor:
+            cursor.itersize = itersize or STREAM_ITERSIZE
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            record_query(time.perf_counter() - started)
+            # The description is only known once the first batch has arrived.
+            rows = iter(cursor)
+            first = next(rows, None)
+            if first is not None:
+                yield from _shape_rows(cursor, [first], row_type)
+                yield from _shape_rows(cursor, rows, row_type)
+        conn.rollback()
+    finally:
+        release_db(conn)
+
+
+def execute_query(query, params=None, fetch='all', commit=False, row_type='dict', itersize=None):
     """
     Execute a query and return results.
-    fetch: 'all', 'one', or None
-    commit: True for INSERT/UPDATE/DELETE
-    Returns: fetched rows (as dicts), lastrowid for INSERT, or None
+    fetch: 'all', 'one', 'stream' or None
+    commit: True for INSERT/UPDATE/DELETE (deferred to the end of an enclosing transaction())
+    row_type: 'dict' (default), 'tuple', or 'record' - a named tuple that also
+    accepts row['column'], for big read-only results (templates can't tell).
+    Returns: fetched rows, lastrowid for INSERT, or None
+    Inside a request all calls share one pooled connection; elsewhere
+    (scripts, scheduler jobs) each call checks one out and returns it.
+
+    fetch='stream' returns a generator instead: rows come from a server-side
+    cursor, itersize (STREAM_ITERSIZE) at a time, on a connection of their
+    own so the generator can outlive the request while a response streams -
+    so it does not see uncommitted writes of an enclosing transaction().
+    The connection goes back to the pool when the generator finishes or is closed.
     """
+    if fetch == 'stream':
+        return _stream_rows(query, params, row_type, itersize)
+
     # PostgreSQL uses %s placeholders — same as MySQL, so no query changes needed.
-    conn = get_db()
+    pinned = has_app_context()
+    conn = _context_db() if pinned else get_db()
+    in_transaction = pinned and g.get('_db_tx_depth', 0) > 0
+    started = time.perf_counter()
     try:
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = conn.cursor(cursor_factory=ROW_CURSORS[row_type])
         cursor.execute(query, params)
         result = None
         if fetch == 'all':
-            result = cursor.fetchall()
-            # Convert RealDictRow list to plain list of dicts
-            result = [dict(row) for row in result]
+            # Build each row straight from the client-side cursor: no second full copy.
+            result = list(_shape_rows(cursor, cursor, row_type))
         elif fetch == 'one':
             row = cursor.fetchone()
-            result = dict(row) if row else None
+            result = next(_shape_rows(cursor, [row], row_type)) if row else None
         if commit:
-            conn.commit()
-            # For INSERT, return the last inserted id
-            if query.strip().upper().startswith('INSERT'):
+            if not in_transaction:
+                conn.commit()
+            # For INSERT without RETURNING, return the last inserted id
+            if result is None and query.strip().upper().startswith('INSERT'):
                 # PostgreSQL uses RETURNING or lastval()
+                cursor = conn.cursor()
                 cursor.execute("SELECT lastval()")
                 last_id = cursor.fetchone()
                 result = last_id[0] if last_id else None
         return result
     except Exception as e:
-        conn.rollback()
+        if not in_transaction and not conn.closed:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        record_query(time.perf_counter() - started)
+        if not pinned:
+            release_db(conn)
+
+
+# Server-side prepared statements for the hottest read queries: each one is
+# parsed and planned once per pooled connection and afterwards only EXECUTEd.
+# Statements are registered by name with a fixed SQL text - pass a list to
+# "= ANY(%s)" instead of building an IN (...) list per call. Set
+# DB_PREPARE=0 behind a transaction-pooling proxy (e.g. pgbouncer), where a
+# session's prepared statements don't follow the client.
+DB_PREPARE = os.environ.get("DB_PREPARE", "1") == "1"
+
+PREPARED_STATEMENTS = {}    # name -> (query with %s, query with $1..$n, parameter count)
+
+
+def positional_query(query):
+    """query with its %s placeholders numbered $1, $2, ... (PREPARE / asyncpg syntax)."""
+    parts = query.split('%s')
+    return parts[0] + ''.join(f'${i}{part}' for i, part in enumerate(parts[1:], 1))
+
+
+def prepared_statement(name, query):
+    """Register query (with %s placeholders) for execute_prepared(); returns the name."""
+    PREPARED_STATEMENTS[name] = (query, positional_query(query), query.count('%s'))
+    return name
+
+
+def execute_prepared(name, params=(), fetch='all', row_type='dict'):
+    """Run a registered read-only statement; results as from execute_query()."""
+    query, positional, arity = PREPARED_STATEMENTS[name]
+    if not DB_PREPARE:
+        return execute_query(query, params, fetch=fetch, row_type=row_type)
+
+    pinned = has_app_context()
+    conn = _context_db() if pinned else get_db()
+    in_transaction = pinned and g.get('_db_tx_depth', 0) > 0
+    started = time.perf_counter()
+    try:
+        cursor = conn.cursor(cursor_factory=ROW_CURSORS[row_type])
+        if name not in conn.prepared:
+            # Prepared statements belong to the session and survive a rollback, so the
+            # name is recorded as soon as PREPARE succeeds, whatever EXECUTE does next.
+            cursor.execute(f"PREPARE {name} AS {positional}")
+            conn.prepared.add(name)
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * arity)})" if arity else f"EXECUTE {name}",
+                       params)
+        if fetch == 'one':
+            row = cursor.fetchone()
+            return next(_shape_rows(cursor, [row], row_type)) if row else None
+        return list(_shape_rows(cursor, cursor, row_type))
+    except Exception as e:
+        if isinstance(e, psycopg2.errors.InvalidSqlStatementName):
+            conn.prepared.discard(name)     # gone server-side (DISCARD ALL, ...): PREPARE again next time
+        if not in_transaction and not conn.closed:
+            conn.rollback()
+        raise e
+    finally:
+        record_query(time.perf_counter() - started)
+        if not pinned:
+            release_db(conn)
 
 
 # ----------------Helper functions-------------
 
+PARTICIPANT_BATCH_SIZE = int(os.environ.get("PARTICIPANT_BATCH_SIZE", 1000))
+
+
+def insert_participants(conn, meeting_id, user_ids, meeting_date):
+    """
+    Add participants to a meeting with multi-row INSERTs - one round trip per
+    PARTICIPANT_BATCH_SIZE rows instead of one per participant. meeting_date
+    is the meeting's date (participants are partitioned with their meeting).
+    Run it inside transaction() so the rows commit together with the meeting.
+    """
+    rows = [(uid, meeting_id, meeting_date) for uid in dict.fromkeys(int(uid) for uid in user_ids)]
+    if not rows:
+        return
+    cursor = conn.cursor()
+    psycopg2.extras.execute_values(
+        cursor,
+        "INSERT INTO meeting_participant (user_id, meeting_id, meeting_date) VALUES %s",
+        rows, page_size=PARTICIPANT_BATCH_SIZE
+    )
+    cursor.close()
+
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", 200))
+
+
+def encode_cursor(values):
+    """Opaque page token for a row's sort-key values."""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        return None
+    return values if isinstance(values, list) else None
+
+
+# Cursor values come back from JSON as strings / numbers; the key columns want their own types.
+MEETING_KEY_TYPES = (date.fromisoformat, int)
+ID_KEY_TYPES = (int,)
+
+
+def _cursor_scalar(value):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise TypeError(f"cursor value {value!r}")
+    return value
+
+
+def fetch_page(select, where, params, key_columns, key_fields, descending=True, row_type='dict', key_types=None):
+    """
+    Keyset ("seek") pagination: instead of OFFSET, continue from the sort key
+    of the last row seen, so every page costs the same however deep it is.
+    select: query up to (not including) WHERE; where: list of AND-ed conditions.
+    key_columns / key_fields: unique sort key as SQL expressions / result keys,
+    e.g. ["m.meeting_date", "m.meeting_id"] / ["meeting_date", "meeting_id"].
+    Reads ?after= / ?before= / ?limit= from the request; key_types (one
+    converter per key column, e.g. MEETING_KEY_TYPES) vets the cursor's values.
+    row_type is passed to execute_query ('record' for pages that only go to a template).
+    Returns (rows, next_cursor, prev_cursor).
+    """
+    query, params, page = page_query(select, where, params, key_columns, request.args, descending, key_types)
+    rows = execute_query(query, params, fetch='all', row_type=row_type)
+    return page_rows(rows, page, key_fields)
+
+
+def page_query(select, where, params, key_columns, args, descending=True, key_types=None):
+    """
+    The SQL half of fetch_page(): (query, params, page) for the page that
+    args (?after= / ?before= / ?limit=) asks for. key_types turns the
+    cursor's JSON values back into typed parameters, so a forged cursor
+    ("after" with a list for a date) never reaches the database; a cursor
+    they reject is ignored like a corrupt one. Without key_types only plain
+    strings and numbers are accepted.
+    """
+    after = decode_cursor(args.get("after"))
+    before = decode_cursor(args.get("before"))
+    try:
+        limit = max(1, min(int(args.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE))
+    except ValueError:
+        limit = PAGE_SIZE
+
+    where, params = list(where), list(params)
+    columns = ", ".join(key_columns)
+    placeholders = ", ".join(["%s"] * len(key_columns))
+    forward = before is None or len(before) != len(key_columns)
+    cursor = after if forward else before
+    if cursor is not None and len(cursor) == len(key_columns):
+        try:
+            cursor = [convert(value) for convert, value in zip(key_types or [_cursor_scalar] * len(cursor), cursor)]
+        except (TypeError, ValueError, OverflowError):
+            cursor = None
+    if cursor is not None and len(cursor) == len(key_columns):
+        op = "<" if descending == forward else ">"
+        where.append(f"({columns}) {op} ({placeholders})")
+        params.extend(cursor)
+    else:
+        cursor = None
+
+    direction = "DESC" if descending == forward else "ASC"
+    query = select
+    if where:
+        query += " WHERE " + " AND ".join(f"({w})" for w in where)
+    query += " ORDER BY " + ", ".join(f"{c} {direction}" for c in key_columns) + " LIMIT %s"
+    return query, params + [limit + 1], (limit, forward, cursor)
+
+
+def page_rows(rows, page, key_fields):
+    """The result half of fetch_page(): (rows, next_cursor, prev_cursor) from page_query()'s rows."""
+    limit, forward, cursor = page
+    has_cursor = cursor is not None
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not forward:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+    first = encode_cursor([rows[0][f] for f in key_fields])
+    last = encode_cursor([rows[-1][f] for f in key_fields])
+    if forward:
+        return rows, (last if has_more else None), (first if has_cursor else None)
+    return rows, last, (first if has_more else None)
+
+
+# Searches match the keyword as a case-insensitive substring. Every OR arm is
+# backed by an index (pg_trgm GIN on the text columns, btree on the foreign
+# keys - migrations/0002_search_indexes.sql), so Postgres combines them with a
+# BitmapOr instead of scanning meeting / "user" on every keystroke.
+SEARCH_MAX_LENGTH = 100
+
+MEETING_SEARCH = {
+    'columns': ["m.meeting_title"],
+    'lookups': [("m.department_id", "department", "department_id", "department_name"),
+                ("m.user_id", '"user"', "user_id", "user_name")],
+}
+USER_SEARCH = {
+    'columns': ["u.user_name", "u.email"],
+    'lookups': [("u.department_id", "department", "department_id", "department_name"),
+                ("u.role_id", "role", "role_id", "role_name")],
+}
+
+
+def search_condition(keyword, columns=(), lookups=()):
+    """
+    WHERE fragment + params for a keyword search.
+    columns: text columns of the listed table.
+    lookups: (fk_column, table, key_column, name_column) - match rows whose
+             foreign key points at a row of `table` whose name matches.
+    """
+    escaped = keyword[:SEARCH_MAX_LENGTH].replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = "%" + escaped + "%"
+    arms = [f"{column} ILIKE %s" for column in columns]
+    arms += [f"{fk} = ANY(ARRAY(SELECT {key} FROM {table} WHERE {name} ILIKE %s))"
+             for fk, table, key, name in lookups]
+    return " OR ".join(arms), [pattern] * len(arms)
+
+
+MEETING_LIST_SELECT = """
+    SELECT m.meeting_id, m.meeting_title, m.meeting_date,
+           m.start_time, m.end_time, m.venue, m.user_id,
+           d.department_name, u.user_name, u.user_mobileno,
+           (SELECT COUNT(*) FROM meeting_participant mp
+            WHERE mp.meeting_id = m.meeting_id AND mp.meeting_date = m.meeting_date) AS participant_count
+    FROM meeting m
+    JOIN department d ON m.department_id = d.department_id
+    JOIN "user" u ON m.user_id = u.user_id
+"""
+MEETING_PAGE_KEY = (["m.meeting_date", "m.meeting_id"], ["meeting_date", "meeting_id"])
+
+MEETING_MEMBERS_QUERY = """
+    SELECT DISTINCT mp.participant_id, mp.user_id, u.user_name,
+           u.email, u.user_mobileno, r.role_name, d.department_name
+    FROM meeting_participant mp
+    JOIN "user" u ON mp.user_id = u.user_id
+    LEFT JOIN role r ON u.role_id = r.role_id
+    LEFT JOIN department d ON u.department_id = d.department_id
+    WHERE mp.meeting_id = %s AND mp.meeting_date = %s
+    ORDER BY u.user_name
+"""
+
+
 def get_session_user_info():
     """Safely get user info from session"""
     return {
@@ -94,73 +947,1560 @@ def admin_required(f):
         if "user_id" not in session:
             flash("Please login first!")
             return redirect(url_for('login'))
-        role_id = get_role(session['user_id'])
-        if role_id != 100:
+        if not is_admin():
             flash("Admin access required!")
             return redirect(url_for('faculty_dashboard'))
         return f(*args, **kwargs)
     return decorated_function
 
 
-def get_role(user_id):
-    """Get user role from database"""
-    result = execute_query(
-        'SELECT role_id FROM "user" WHERE user_id = %s', (user_id,), fetch='one'
+def parse_time(time_str):
+    """Parse '14:30', '2:30 PM' or '14:30:00' into 'HH:MM:SS'."""
+    for fmt in ("%H:%M:%S", "%I:%M %p", "%H:%M"):
+        try:
+            return datetime.strptime(str(time_str), fmt).strftime("%H:%M:%S")
+        except ValueError:
+            continue
+    raise ValueError(f"Time format not recognized: {time_str}")
+
+
+def send_meeting_email(recipients, action, meeting_info):
+    """Queue a notification email to meeting members (delivered by the outbox worker)."""
+    if action == 'created':
+        subject = f'New Meeting Created: {meeting_info["title"]}'
+    elif action == 'updated':
+        subject = f'Meeting Updated: {meeting_info["title"]}'
+    else:
+        subject = f'Meeting Cancelled: {meeting_info["title"]}'
+
+    body = f"""
+Meeting {action.upper()} Notification:
+
+Title: {meeting_info["title"]}
+Date: {meeting_info["date"]}
+Time: {meeting_info["start_time"]} to {meeting_info["end_time"]}
+Venue: {meeting_info.get("venue", "TBD")}
+Department: {meeting_info.get("dept_name", "N/A")}
+"""
+
+    enqueue_email(recipients, subject, body)
+
+
+# ---------------- EMAIL OUTBOX ----------------
+# Requests only INSERT into email_outbox (migrations/0001_email_outbox.sql).
+# Every process runs an outbox thread, but only the one holding the Postgres
+# advisory lock EMAIL_LOCK_KEY delivers (another takes over if it dies), so
+# EMAIL_RATE_PER_MINUTE is the rate of the whole deployment rather than of
+# each gunicorn worker. The leader claims a batch of due rows by pushing
+# their next_attempt_at EMAIL_CLAIM_SECONDS ahead in one short transaction,
+# then sends them over one reused SMTP session and commits each message's
+# outcome as soon as it is known. A worker that dies mid-batch leaves its
+# unrecorded messages to be retried when the claim runs out. Delivery is
+# at-least-once. Other processes' messages are picked up within
+# EMAIL_POLL_INTERVAL.
+
+EMAIL_CLAIM_SECONDS = float(os.environ.get("EMAIL_CLAIM_SECONDS", 300))
+EMAIL_LEADER_RETRY = float(os.environ.get("EMAIL_LEADER_RETRY", 30))   # followers retry the lock this often
+EMAIL_LOCK_KEY = 72616402
+
+EMAIL_CLAIM_QUERY = """
+    UPDATE email_outbox SET next_attempt_at = now() + make_interval(secs => %s)
+    WHERE id IN (
+        SELECT id FROM email_outbox
+        WHERE status = 'pending' AND next_attempt_at <= now()
+        ORDER BY next_attempt_at
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
     )
-    return result['role_id'] if result else None
+    RETURNING id, recipients, subject, body, attempts
+"""
+
+_outbox_wakeup = threading.Event()
+_outbox_worker_pid = None
+
+
+def enqueue_email(recipients, subject, body):
+    """Queue an email for background delivery (joins the caller's transaction, if any)."""
+    execute_query(
+        "INSERT INTO email_outbox (recipients, subject, body) VALUES (%s, %s, %s)",
+        (list(recipients), subject, body), commit=True, fetch=None
+    )
+    _outbox_wakeup.set()
+
+
+def retry_delay(attempts):
+    """Seconds before retry number `attempts` (1-based): EMAIL_RETRY_BASE doubled per failure, capped."""
+    return min(EMAIL_RETRY_BASE * 2 ** (attempts - 1), EMAIL_RETRY_MAX)
+
+
+def outbox_message(row):
+    return f"""From: {SENDER_EMAIL}
+To: {', '.join(row['recipients'])}
+Subject: {row['subject']}
+
+{row['body']}"""
+
+
+class SMTPSession:
+    """One authenticated SMTP connection, reused across messages and reopened when dropped."""
+
+    def __init__(self):
+        self.server = None
+        self.last_used = 0.0
+        self.sent_times = []
+
+    def _open(self):
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_STARTTLS:
+            server.starttls()
+        if SENDER_PASSWORD:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        return server
+
+    def quota(self):
+        """Messages that may still go out under EMAIL_RATE_PER_MINUTE (sliding 60 second window)."""
+        now = time.monotonic()
+        self.sent_times = [t for t in self.sent_times if now - t < 60]
+        return max(0, EMAIL_RATE_PER_MINUTE - len(self.sent_times))
+
+    def rate_limited(self):
+        return self.quota() == 0
+
+    def send(self, recipients, message):
+        if self.server is not None and time.monotonic() - self.last_used > EMAIL_SMTP_IDLE:
+            self.close()
+        started = time.perf_counter()
+        result = 'error'
+        try:
+            if self.server is None:
+                self.server = self._open()
+            try:
+                self.server.sendmail(SENDER_EMAIL, recipients, message.encode('utf-8'))
+            except smtplib.SMTPServerDisconnected:
+                self.server = self._open()
+                self.server.sendmail(SENDER_EMAIL, recipients, message.encode('utf-8'))
+            result = 'ok'
+        finally:
+            observe('smtp_send_seconds', time.perf_counter() - started, result=result)
+        self.last_used = time.monotonic()
+        self.sent_times.append(self.last_used)
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.server = None
+
+
+def claim_outbox(limit):
+    """Claim up to `limit` due messages (committed at once); returns them oldest first."""
+    with transaction():
+        rows = execute_query(EMAIL_CLAIM_QUERY, (EMAIL_CLAIM_SECONDS, limit), fetch='all', commit=True)
+    return sorted(rows, key=lambda row: row['id'])
+
+
+def record_delivery(row, error=None):
+    """Commit one message's outcome: sent, retry later with backoff, or dead after EMAIL_MAX_ATTEMPTS."""
+    attempts = row['attempts'] + 1
+    with transaction():
+        if error is None:
+            execute_query("""
+                UPDATE email_outbox SET status = 'sent', attempts = %s, sent_at = now()
+                WHERE id = %s
+            """, (attempts, row['id']), commit=True, fetch=None)
+            print(f"✅ Email sent to {len(row['recipients'])} recipients ({row['subject']})")
+        elif attempts >= EMAIL_MAX_ATTEMPTS:
+            print(f"❌ Email {row['id']} dead-lettered after {attempts} attempts: {error}")
+            execute_query("""
+                UPDATE email_outbox SET status = 'dead', attempts = %s, last_error = %s
+                WHERE id = %s
+            """, (attempts, str(error), row['id']), commit=True, fetch=None)
+        else:
+            delay = retry_delay(attempts)
+            print(f"❌ Email {row['id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+            execute_query("""
+                UPDATE email_outbox
+                SET attempts = %s, last_error = %s,
+                    next_attempt_at = now() + make_interval(secs => %s)
+                WHERE id = %s
+            """, (attempts, str(error), delay, row['id']), commit=True, fetch=None)
+
+
+def drain_outbox(smtp_session, batch_size=None):
+    """
+    Deliver one batch of due outbox messages, as many as the rate limit
+    allows. Failed messages are retried with exponential backoff and
+    dead-lettered (status 'dead') after EMAIL_MAX_ATTEMPTS.
+    Returns the number of messages attempted.
+    """
+    limit = min(batch_size or EMAIL_BATCH_SIZE, smtp_session.quota())
+    if not limit:
+        return 0
+    with app.app_context():
+        rows = claim_outbox(limit)
+        for row in rows:
+            try:
+                smtp_session.send(row['recipients'], outbox_message(row))
+            except (smtplib.SMTPException, OSError) as e:
+                smtp_session.close()
+                record_delivery(row, e)
+            else:
+                record_delivery(row)
+    return len(rows)
 
 
-def get_departments():
-    return execute_query(
-        "SELECT * FROM department ORDER BY department_name", fetch='all'
-    )
+def run_outbox_worker():
+    """Become the outbox leader when the advisory lock is free, then drain the outbox forever."""
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(get_database_url())
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (EMAIL_LOCK_KEY,))
+            if cursor.fetchone()[0]:
+                print(f"✅ Email outbox leader: pid {os.getpid()}")
+                drain_forever(cursor)
+        except Exception as e:
+            print(f"❌ Outbox worker error: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+        time.sleep(EMAIL_LEADER_RETRY)
+
+
+def drain_forever(lock_cursor):
+    """The leader's loop; sleeps between polls unless woken by enqueue_email() in this process."""
+    smtp_session = SMTPSession()
+    try:
+        while True:
+            # Still holding the lock? It lives as long as its connection, which raises here once it has
+            # dropped - checked before every batch, so a backlog can't outlive the leadership.
+            lock_cursor.execute("SELECT 1")
+            try:
+                attempted = drain_outbox(smtp_session)
+            except Exception as e:
+                print(f"❌ Outbox worker error: {e}")
+                attempted = 0
+            if not attempted or smtp_session.rate_limited():
+                _outbox_wakeup.wait(EMAIL_POLL_INTERVAL)
+                _outbox_wakeup.clear()
+                if time.monotonic() - smtp_session.last_used > EMAIL_SMTP_IDLE:
+                    smtp_session.close()
+    finally:
+        smtp_session.close()
+
+
+def start_outbox_worker():
+    """Start the outbox thread once per process; only the lock holder sends."""
+    global _outbox_worker_pid
+    if _outbox_worker_pid == os.getpid():
+        return
+    _outbox_worker_pid = os.getpid()
+    threading.Thread(target=run_outbox_worker, name="email-outbox", daemon=True).start()
+
+
+@app.cli.command("outbox-worker")
+def outbox_worker_command():
+    """Run the email outbox worker in the foreground (it waits while another process is the leader)."""
+    run_outbox_worker()
+
+
+# ---------------- CHANGE NOTIFICATIONS ----------------
+# In-process caches are kept coherent across gunicorn workers with Postgres
+# LISTEN/NOTIFY. notify_change() runs pg_notify inside the caller's
+# transaction, so other processes only hear about a write once it commits.
+# Each process runs one listener thread that hands payloads to the handlers
+# registered with on_change(channel). When the listener (re)connects it calls
+# every handler with None, meaning "you may have missed changes - flush".
+
+_change_handlers = {}
+_listener_pid = None
+
+
+def on_change(channel):
+    """Register a handler(payload) for a notification channel."""
+    def decorator(handler):
+        _change_handlers.setdefault(channel, []).append(handler)
+        return handler
+    return decorator
+
+
+def notify_change(channel, payload=''):
+    """Tell the other processes about a change (delivered when the current transaction commits)."""
+    execute_query("SELECT pg_notify(%s, %s)", (channel, f"{os.getpid()}:{payload}"), fetch=None)
+
+
+def _dispatch_change(channel, payload):
+    for handler in _change_handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception as e:
+            print(f"❌ Change handler for {channel} failed: {e}")
+
+
+def run_change_listener():
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(get_database_url())
+            conn.autocommit = True
+            cursor = conn.cursor()
+            for channel in _change_handlers:
+                cursor.execute(f"LISTEN {channel}")
+            for channel in _change_handlers:
+                _dispatch_change(channel, None)
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notification = conn.notifies.pop(0)
+                    pid, _, payload = notification.payload.partition(':')
+                    if pid != str(os.getpid()):
+                        _dispatch_change(notification.channel, payload)
+        except Exception as e:
+            print(f"❌ Change listener error: {e}")
+            time.sleep(5)
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+def start_change_listener():
+    """Start the listener thread once per process."""
+    global _listener_pid
+    if _listener_pid == os.getpid() or not _change_handlers:
+        return
+    _listener_pid = os.getpid()
+    threading.Thread(target=run_change_listener, name="change-listener", daemon=True).start()
+
+
+# ---------------- REFERENCE DATA CACHE ----------------
+# department and role change rarely but are read by nearly every form, so
+# each process keeps them in memory. A cached table is reloaded after
+# REFERENCE_CACHE_TTL seconds or as soon as its version stamp moves - writes
+# call invalidate_reference(), which bumps the stamp here after commit and in
+# every other process via the 'reference_changed' notification.
+
+REFERENCE_CACHE_TTL = float(os.environ.get("REFERENCE_CACHE_TTL", 300))
+
+REFERENCE_QUERIES = {
+    'department': "SELECT * FROM department ORDER BY department_name",
+    'role': "SELECT * FROM role ORDER BY role_name",
+}
+
+_reference_cache = {}       # name -> (version, loaded_at, rows)
+_reference_versions = {}    # name -> version stamp
+
+
+def cached_reference(name):
+    """Rows of a reference table (shared between requests - do not modify them)."""
+    version = _reference_versions.get(name, 0)
+    entry = _reference_cache.get(name)
+    if entry is not None and entry[0] == version and time.monotonic() - entry[1] < REFERENCE_CACHE_TTL:
+        return entry[2]
+    rows = execute_query(REFERENCE_QUERIES[name], fetch='all')
+    if _reference_versions.get(name, 0) == version:
+        _reference_cache[name] = (version, time.monotonic(), rows)
+    return rows
+
+
+def _bump_reference(name):
+    for n in ([name] if name else list(REFERENCE_QUERIES)):
+        _reference_versions[n] = _reference_versions.get(n, 0) + 1
+
+
+def invalidate_reference(name):
+    """Mark a reference table as changed. Call it inside the write's transaction()."""
+    notify_change('reference_changed', name)
+    after_commit(lambda: _bump_reference(name))
+
+
+@on_change('reference_changed')
+def _reference_changed(payload):
+    _bump_reference(payload)
+
+
+def get_departments():
+    return cached_reference('department')
+
+
+def get_all_roles():
+    return cached_reference('role')
+
+
+def get_roles():
+    """Roles a user can be given (everything except admin)"""
+    return [r for r in get_all_roles() if r['role_id'] != 100]
+
+
+# ---------------- AUTHORIZATION ----------------
+# Admin checks used to read the user's role from the database on every
+# request (or trust the role copied into the session at login). Roles are now
+# cached per process like the reference data: entries carry a per-user version
+# stamp that invalidate_role() bumps here and, via 'role_changed', in every
+# other worker. AUTHZ_CACHE_TTL bounds how long a missed notification can keep
+# a demoted or deleted user's old role alive.
+
+AUTHZ_CACHE_TTL = float(os.environ.get("AUTHZ_CACHE_TTL", 30))
+AUTHZ_CACHE_SIZE = int(os.environ.get("AUTHZ_CACHE_SIZE", 10000))
+ADMIN_ROLE_ID = 100
+
+_role_cache = OrderedDict()   # user_id -> (version, loaded_at, role_id), least recently used first
+_role_versions = {}           # user_id -> version stamp ('*' for everyone)
+_role_lock = threading.Lock()
+
+
+def _role_version(user_id):
+    return _role_versions.get('*', 0), _role_versions.get(user_id, 0)
+
+
+ROLE_QUERY = 'SELECT role_id FROM "user" WHERE user_id = %s'
+
+
+def cached_role(user_id):
+    """(version, hit, role_id) from the role cache; on a miss, load the role and pass version to remember_role()."""
+    with _role_lock:
+        version = _role_version(user_id)
+        entry = _role_cache.get(user_id)
+        if entry is not None and entry[0] == version and time.monotonic() - entry[1] < AUTHZ_CACHE_TTL:
+            _role_cache.move_to_end(user_id)
+            return version, True, entry[2]
+    return version, False, None
+
+
+def remember_role(user_id, version, role_id):
+    """Cache a role loaded after cached_role() missed, unless it was invalidated meanwhile."""
+    with _role_lock:
+        if _role_version(user_id) == version:
+            _role_cache[user_id] = (version, time.monotonic(), role_id)
+            while len(_role_cache) > AUTHZ_CACHE_SIZE:
+                _role_cache.popitem(last=False)
+
+
+def get_role(user_id):
+    """Role of a user (None if the user no longer exists), cached per process."""
+    version, hit, role_id = cached_role(user_id)
+    if hit:
+        return role_id
+
+    result = execute_query(ROLE_QUERY, (user_id,), fetch='one')
+    role_id = result['role_id'] if result else None
+    remember_role(user_id, version, role_id)
+    return role_id
+
+
+def is_admin():
+    """True if the logged-in user currently holds the admin role."""
+    return "user_id" in session and get_role(session["user_id"]) == ADMIN_ROLE_ID
+
+
+def _bump_role(user_id):
+    key = user_id if user_id is not None else '*'
+    with _role_lock:
+        _role_versions[key] = _role_versions.get(key, 0) + 1
+        if user_id is None:
+            _role_cache.clear()
+        else:
+            _role_cache.pop(user_id, None)
+
+
+def invalidate_role(user_id):
+    """A user's role changed (or the user was created/deleted). Call it inside the write's transaction()."""
+    notify_change('role_changed', str(user_id))
+    after_commit(lambda: _bump_role(user_id))
+
+
+@on_change('role_changed')
+def _role_changed(payload):
+    _bump_role(int(payload) if payload else None)
+
+
+# ---------------- PAGE CACHE ----------------
+# my_schedule and view_all_meetings run the same all-meetings query (with a
+# participant count per row) for every user on every hit, although meetings
+# only change through a few writers. Each page's data - the rows and
+# cursors, not the HTML, since my_schedule shows per-user edit links - is
+# cached under route, query string and role, prefixed by the meeting-change
+# version. Every meeting write moves the version, here after commit and via
+# 'meeting_changed' in the other processes, which orphans all cached pages.
+# User and department renames do not move it; PAGE_CACHE_TTL bounds how
+# long a page shows an old name. Browsers get an ETag per cached page and
+# user, so a reload with nothing changed is a 304.
+#
+# With PAGE_CACHE_DIR set (a directory private to the app, shared by the
+# workers of a host), pages and the version are kept there as files, so a
+# page built by one worker is served by all of them. Otherwise each process
+# keeps its own LRU of PAGE_CACHE_SIZE pages. Page files are JSON (dates
+# and times tagged), so whoever can write the directory can at worst spoil
+# a cached page, never run code in the app.
+
+PAGE_CACHE_SIZE = int(os.environ.get("PAGE_CACHE_SIZE", 256))
+PAGE_CACHE_TTL = float(os.environ.get("PAGE_CACHE_TTL", 300))
+PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR")
+
+
+class MemoryPageStore:
+    """Per-process LRU of cached pages; the version is this process's own."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._epoch = uuid.uuid4().hex[:8]     # a restarted process never reuses an old version
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def version(self):
+        return f"{self._epoch}.{self._counter}"
+
+    def bump(self):
+        with self._lock:
+            self._counter += 1
+            self._entries.clear()
+
+    def changed_elsewhere(self):
+        self.bump()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+def _page_json_default(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, type(datetime.min.time())):
+        return {'__time__': value.isoformat()}
+    raise TypeError(f"{type(value).__name__} in a cached page")
+
+
+PAGE_JSON_TAGS = {
+    '__datetime__': datetime.fromisoformat,
+    '__date__': date.fromisoformat,
+    '__time__': lambda text: datetime.fromisoformat(f"1900-01-01T{text}").time(),
+}
+
+
+def _page_json_object(obj):
+    if len(obj) == 1:
+        (tag, text), = obj.items()
+        if tag in PAGE_JSON_TAGS:
+            return PAGE_JSON_TAGS[tag](text)
+    return obj
+
+
+class FilePageStore:
+    """Cached pages as JSON files in a directory shared by the host's workers, with the version file."""
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.size = size
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _write(self, name, data):
+        tmp = os.path.join(self.directory, f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, os.path.join(self.directory, name))
+
+    def version(self):
+        try:
+            with open(os.path.join(self.directory, "version")) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return "0"
+
+    def bump(self):
+        self._write("version", uuid.uuid4().hex.encode())
+
+    def changed_elsewhere(self):
+        pass    # the writer's process already moved the shared version
+
+    def get(self, key):
+        try:
+            with open(os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".page"), "rb") as f:
+                return json.load(f, object_hook=_page_json_object)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, entry):
+        data = json.dumps(entry, default=_page_json_default).encode()
+        self._write(hashlib.sha256(key.encode()).hexdigest() + ".page", data)
+        pages = [e for e in os.scandir(self.directory) if e.name.endswith(".page")]
+        if len(pages) > self.size:
+            pages.sort(key=lambda e: e.stat().st_mtime)
+            for stale in pages[:len(pages) - self.size]:
+                try:
+                    os.remove(stale.path)
+                except FileNotFoundError:
+                    pass
+
+
+page_store = FilePageStore(PAGE_CACHE_DIR, PAGE_CACHE_SIZE) if PAGE_CACHE_DIR else MemoryPageStore(PAGE_CACHE_SIZE)
+
+
+def invalidate_meeting_pages():
+    """Meetings changed: drop the cached pages once the write commits. Call it inside the write's transaction()."""
+    after_commit(page_store.bump)
+
+
+def cached_page(template, build):
+    """
+    Render template with build()'s variables (dict rows, plain values,
+    dates and times - what FilePageStore can write as JSON), reusing data
+    cached for this route, query string, role and meeting version, and
+    answer 304 when the browser's copy is current.
+    """
+    user_id = session.get("user_id")
+    role = get_role(user_id) if user_id is not None else None
+    key = "|".join([page_store.version(), request.path, request.query_string.decode("latin-1"), str(role)])
+    entry = page_store.get(key)
+    if entry is None or time.time() - entry["built_at"] > PAGE_CACHE_TTL:
+        entry = {"built_at": time.time(), "data": build()}
+        page_store.set(key, entry)
+        count('page_cache_requests_total', route=request.path, result='miss')
+    else:
+        count('page_cache_requests_total', route=request.path, result='hit')
+
+    etag = hashlib.sha1(f"{key}|{entry['built_at']}|{user_id}".encode()).hexdigest()
+    if not is_resource_modified(request.environ, etag=etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.make_response(render_template(template, **entry["data"]))
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+# ---------------- CONFLICT ENGINE ----------------
+# "Which of these participants already have a meeting overlapping
+# [start, end) on this date?" is answered from an in-memory index: per date,
+# per user, the user's meetings sorted by start time. A date is loaded with
+# one query the first time it is checked, patched in place by this process's
+# own writes and dropped when another process reports a write to that date.
+# CONFLICT_ENGINE: 'index' (default), 'sql' (always query), or 'verify'
+# (run both, log any disagreement and trust SQL).
+
+CONFLICT_ENGINE = os.environ.get("CONFLICT_ENGINE", "index")
+CONFLICT_INDEX_TTL = float(os.environ.get("CONFLICT_INDEX_TTL", 600))     # reload a date after this many seconds
+CONFLICT_INDEX_MAX_DAYS = int(os.environ.get("CONFLICT_INDEX_MAX_DAYS", 400))
+
+_CONFLICT_SELECT = """
+    SELECT u.user_id, u.user_name, d_meeting.department_name AS meeting_department_name,
+           m.meeting_id, m.meeting_title, m.meeting_date, m.start_time, m.end_time
+    FROM meeting m
+    JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id AND m.meeting_date = mp.meeting_date
+    JOIN "user" u ON mp.user_id = u.user_id
+    LEFT JOIN department d_meeting ON m.department_id = d_meeting.department_id
+"""
+
+CONFLICT_QUERY = prepared_statement('conflict_check', _CONFLICT_SELECT + """
+    WHERE m.meeting_date = %s
+    AND mp.user_id = ANY(%s)
+    AND %s < m.end_time
+    AND %s > m.start_time
+    AND m.meeting_id != %s
+""")
+
+CONFLICT_DAY_QUERY = prepared_statement('conflict_day', _CONFLICT_SELECT + "WHERE m.meeting_date = %s")
+
+CONFLICT_MEETING_QUERY = prepared_statement('conflict_meeting', _CONFLICT_SELECT + "WHERE m.meeting_id = %s")
+
+CONFLICT_DATES_QUERY = prepared_statement('conflict_dates', _CONFLICT_SELECT + """
+    WHERE m.meeting_date = ANY(%s)
+    AND mp.user_id = ANY(%s)
+    AND %s < m.end_time
+    AND %s > m.start_time
+""")
+
+
+def as_time(value):
+    """Normalise 'HH:MM:SS' strings (what parse_time returns) to datetime.time."""
+    if isinstance(value, str):
+        return datetime.strptime(value, "%H:%M:%S").time()
+    return value
+
+
+class DayIndex:
+    """Every meeting on one date, as per-user interval lists sorted by start time."""
+
+    def __init__(self, rows):
+        self.loaded_at = time.monotonic()
+        self.meetings = {}      # meeting_id -> meeting columns of CONFLICT_*_QUERY
+        self.users = {}         # user_id -> user_name
+        self.intervals = {}     # user_id -> sorted [(start, end, meeting_id)]
+        self.max_end = {}       # user_id -> running max of end over intervals
+        self.add_rows(rows)
+
+    def add_rows(self, rows):
+        """Add CONFLICT_*_QUERY rows (one per participant of a meeting)."""
+        touched = set()
+        for row in rows:
+            meeting_id, user_id = row['meeting_id'], row['user_id']
+            self.meetings[meeting_id] = {
+                'meeting_id': meeting_id,
+                'meeting_title': row['meeting_title'],
+                'meeting_date': row['meeting_date'],
+                'start_time': row['start_time'],
+                'end_time': row['end_time'],
+                'meeting_department_name': row['meeting_department_name'],
+            }
+            self.users[user_id] = row['user_name']
+            self.intervals.setdefault(user_id, []).append((row['start_time'], row['end_time'], meeting_id))
+            touched.add(user_id)
+        for user_id in touched:
+            self._reindex(user_id)
+
+    def _reindex(self, user_id):
+        intervals = self.intervals[user_id]
+        intervals.sort()
+        running, max_end = None, []
+        for _, end, _ in intervals:
+            running = end if running is None or end > running else running
+            max_end.append(running)
+        self.max_end[user_id] = max_end
+
+    def remove_meeting(self, meeting_id):
+        if self.meetings.pop(meeting_id, None) is None:
+            return
+        for user_id, intervals in self.intervals.items():
+            if any(m_id == meeting_id for _, _, m_id in intervals):
+                intervals[:] = [iv for iv in intervals if iv[2] != meeting_id]
+                self._reindex(user_id)
+
+    def overlapping(self, user_id, start, end, exclude_meeting_id=None):
+        """Meeting ids of user_id's meetings overlapping [start, end) - O(log M + matches)."""
+        intervals = self.intervals.get(user_id)
+        if not intervals:
+            return []
+        max_end = self.max_end[user_id]
+        i = bisect.bisect_left(intervals, (end,))   # candidates all start before `end`
+        found = []
+        for j in range(i - 1, -1, -1):
+            if max_end[j] <= start:
+                break                                # nothing earlier can reach `start`
+            if intervals[j][1] > start and intervals[j][2] != exclude_meeting_id:
+                found.append(intervals[j][2])
+        return found
+
+
+_conflict_days = OrderedDict()     # date -> DayIndex, least recently used first
+_conflict_generation = {}          # date -> bumped on every invalidation
+_conflict_lock = threading.RLock()
+
+
+def _conflict_day(meeting_date):
+    with _conflict_lock:
+        day = _conflict_days.get(meeting_date)
+        if day is not None and time.monotonic() - day.loaded_at < CONFLICT_INDEX_TTL:
+            _conflict_days.move_to_end(meeting_date)
+            return day
+        generation = _conflict_generation.get(meeting_date, 0)
+
+    day = DayIndex(execute_prepared(CONFLICT_DAY_QUERY, (meeting_date,)))
+
+    with _conflict_lock:
+        # Only cache it if nobody invalidated the date while we were loading.
+        if _conflict_generation.get(meeting_date, 0) == generation:
+            _conflict_days[meeting_date] = day
+            while len(_conflict_days) > CONFLICT_INDEX_MAX_DAYS:
+                _conflict_days.popitem(last=False)
+    return day
+
+
+def invalidate_conflict_days(dates=None):
+    """Drop the given dates (or everything) from the conflict index."""
+    with _conflict_lock:
+        for meeting_date in (list(_conflict_days) if dates is None else dates):
+            _conflict_days.pop(meeting_date, None)
+            _conflict_generation[meeting_date] = _conflict_generation.get(meeting_date, 0) + 1
+
+
+@on_change('meeting_changed')
+def _meeting_changed(payload):
+    page_store.changed_elsewhere()
+    if not payload:
+        invalidate_conflict_days()
+    else:
+        invalidate_conflict_days([date.fromisoformat(d) for d in payload.split(',')])
+
+
+def meeting_written(meeting_id, old_date=None):
+    """
+    Keep the conflict index current after a meeting was created, edited
+    (old_date = its date before the edit) or deleted (old_date = its date).
+    Call it inside the write's transaction(): it reads the meeting back, and
+    this process's index is patched / the other processes are notified once
+    the transaction commits.
+    """
+    rows = execute_prepared(CONFLICT_MEETING_QUERY, (meeting_id,))
+    dates = {d for d in [old_date] + [row['meeting_date'] for row in rows] if d}
+    notify_change('meeting_changed', ','.join(d.isoformat() for d in dates))
+
+    def patch_index():
+        with _conflict_lock:
+            for meeting_date in dates:
+                if meeting_date in _conflict_days:
+                    _conflict_days[meeting_date].remove_meeting(meeting_id)
+            if rows and rows[0]['meeting_date'] in _conflict_days:
+                _conflict_days[rows[0]['meeting_date']].add_rows(rows)
+    after_commit(patch_index)
+    invalidate_meeting_pages()
+
+
+def sql_find_conflicts(meeting_date, start_time, end_time, participant_ids, exclude_meeting_id=None):
+    params = (meeting_date, [int(p) for p in participant_ids], start_time, end_time, exclude_meeting_id or 0)
+    return execute_prepared(CONFLICT_QUERY, params)
+
+
+def index_find_conflicts(meeting_date, start_time, end_time, participant_ids, exclude_meeting_id=None):
+    start, end = as_time(start_time), as_time(end_time)
+    day = _conflict_day(meeting_date)
+    with _conflict_lock:
+        conflicts = []
+        for user_id in dict.fromkeys(participant_ids):
+            for meeting_id in day.overlapping(user_id, start, end, exclude_meeting_id):
+                conflicts.append(dict(day.meetings[meeting_id], user_id=user_id,
+                                      user_name=day.users[user_id]))
+        return conflicts
+
+
+def find_conflicts(meeting_date, start_time, end_time, participant_ids, exclude_meeting_id=None,
+                   exclude_series_id=None):
+    """
+    Meetings on meeting_date overlapping [start_time, end_time) for any of
+    participant_ids, one dict per (participant, meeting). Occurrences of
+    meeting series are included too (meeting_id None, series_id set).
+    """
+    if CONFLICT_ENGINE == 'sql':
+        conflicts = sql_find_conflicts(meeting_date, start_time, end_time, participant_ids, exclude_meeting_id)
+    else:
+        conflicts = index_find_conflicts(meeting_date, start_time, end_time, participant_ids, exclude_meeting_id)
+        if CONFLICT_ENGINE == 'verify':
+            expected = sql_find_conflicts(meeting_date, start_time, end_time, participant_ids, exclude_meeting_id)
+            if ({(c['user_id'], c['meeting_id']) for c in conflicts}
+                    != {(c['user_id'], c['meeting_id']) for c in expected}):
+                print(f"❌ Conflict index disagrees with SQL for {meeting_date}; reloading")
+                invalidate_conflict_days([meeting_date])
+            conflicts = expected
+    return conflicts + series_conflicts([meeting_date], start_time, end_time, participant_ids, exclude_series_id)
+
+
+def find_series_conflicts(dates, start_time, end_time, participant_ids, exclude_series_id=None):
+    """
+    find_conflicts() for every date of a series: one query for the meetings
+    on all the dates, and one O(1) test per (existing series, date).
+    """
+    ids = [int(p) for p in participant_ids]
+    conflicts = execute_prepared(CONFLICT_DATES_QUERY, (list(dates), ids, start_time, end_time))
+    return conflicts + series_conflicts(dates, start_time, end_time, ids, exclude_series_id)
+
+
+# ---------------- MEETING SERIES ----------------
+# A recurring meeting is one meeting_series row holding an RRULE subset
+# (migrations/0009), never a row per occurrence. Occurrences are expanded
+# only for the dates a conflict check or view asks about, and "does series
+# S occur on date D" is arithmetic on the rule, so a year-long weekly series
+# costs one row and an O(1) test per date checked.
+
+SERIES_MAX_OCCURRENCES = int(os.environ.get("SERIES_MAX_OCCURRENCES", 366))
+SERIES_MAX_SPAN_DAYS = int(os.environ.get("SERIES_MAX_SPAN_DAYS", 3660))     # first to last occurrence
+RRULE_MAX_INTERVAL = 99
+SERIES_VIEW_DAYS = int(os.environ.get("SERIES_VIEW_DAYS", 28))     # upcoming occurrences shown per series
+RRULE_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+RRULE_PARTS = ('FREQ', 'INTERVAL', 'BYDAY', 'UNTIL', 'COUNT')
+
+
+class Recurrence:
+    """
+    FREQ=DAILY|WEEKLY|MONTHLY with INTERVAL, BYDAY (weekly only, default the
+    weekday of dtstart) and UNTIL and/or COUNT, anchored at dtstart. Monthly
+    rules repeat on dtstart's day of the month and skip months without it.
+    """
+
+    def __init__(self, text, dtstart):
+        parts = {}
+        for part in text.upper().split(';'):
+            key, sep, value = part.partition('=')
+            if not sep or key.strip() not in RRULE_PARTS:
+                raise ValueError(f"Unsupported recurrence rule part: {part}")
+            parts[key.strip()] = value.strip()
+
+        self.text = text
+        self.dtstart = dtstart
+        self.freq = parts.get('FREQ')
+        if self.freq not in ('DAILY', 'WEEKLY', 'MONTHLY'):
+            raise ValueError("Repeat must be daily, weekly or monthly.")
+        self.interval = int(parts.get('INTERVAL', 1))
+        if not 1 <= self.interval <= RRULE_MAX_INTERVAL:
+            raise ValueError(f"Repeat interval must be 1 to {RRULE_MAX_INTERVAL}.")
+        if 'BYDAY' in parts and self.freq != 'WEEKLY':
+            raise ValueError("Weekdays can only be chosen for weekly meetings.")
+        days = parts['BYDAY'].split(',') if 'BYDAY' in parts else [RRULE_WEEKDAYS[dtstart.weekday()]]
+        if not set(days) <= set(RRULE_WEEKDAYS):
+            raise ValueError(f"Unknown weekday in {parts['BYDAY']}")
+        self.byday = tuple(sorted(RRULE_WEEKDAYS.index(d) for d in set(days)))
+        self.until = datetime.strptime(parts['UNTIL'][:8], "%Y%m%d").date() if 'UNTIL' in parts else None
+        self.count = int(parts['COUNT']) if 'COUNT' in parts else None
+        if self.until is None and self.count is None:
+            raise ValueError("A recurring meeting needs an end date or a number of occurrences.")
+        if self.count is not None and not 0 < self.count <= SERIES_MAX_OCCURRENCES:
+            raise ValueError(f"A recurring meeting can have 1 to {SERIES_MAX_OCCURRENCES} occurrences.")
+        if self.until is not None and (self.until - dtstart).days > SERIES_MAX_SPAN_DAYS:
+            raise ValueError(f"A recurring meeting can span at most {SERIES_MAX_SPAN_DAYS} days.")
+        try:
+            self.last = self._last_date()
+        except OverflowError:       # the rule runs past the end of the calendar
+            raise ValueError("The repeat rule runs past the last supported date.") from None
+        if self.last is None:
+            raise ValueError("The repeat rule produces no meetings.")
+        if (self.last - dtstart).days > SERIES_MAX_SPAN_DAYS:
+            raise ValueError(f"A recurring meeting can span at most {SERIES_MAX_SPAN_DAYS} days.")
+
+    def _dates(self, start):
+        """Every date the rule produces on or after start, ignoring UNTIL and COUNT."""
+        try:
+            yield from self._unbounded_dates(start)
+        except (OverflowError, ValueError):     # stepped past date.max
+            return
+
+    def _unbounded_dates(self, start):
+        if self.freq == 'DAILY':
+            steps = max(0, -(-(start - self.dtstart).days // self.interval))
+            day = self.dtstart + timedelta(days=steps * self.interval)
+            while True:
+                yield day
+                day += timedelta(days=self.interval)
+        elif self.freq == 'WEEKLY':
+            anchor = self.dtstart - timedelta(days=self.dtstart.weekday())
+            weeks = max(0, (start - anchor).days // 7)
+            week = anchor + timedelta(weeks=weeks - weeks % self.interval)
+            while True:
+                for weekday in self.byday:
+                    day = week + timedelta(days=weekday)
+                    if day >= start and day >= self.dtstart:
+                        yield day
+                week += timedelta(weeks=self.interval)
+        else:
+            months = max(0, (start.year - self.dtstart.year) * 12 + start.month - self.dtstart.month)
+            months -= months % self.interval
+            while True:
+                year, month = divmod(self.dtstart.month - 1 + months, 12)
+                if self.dtstart.day <= calendar.monthrange(self.dtstart.year + year, month + 1)[1]:
+                    day = date(self.dtstart.year + year, month + 1, self.dtstart.day)
+                    if day >= start:
+                        yield day
+                months += self.interval
+
+    def _last_date(self):
+        if self.count is None:
+            return self.until if self.until >= self.dtstart else None
+        last = None
+        for n, day in enumerate(self._dates(self.dtstart), 1):
+            if self.until and day > self.until:
+                break
+            last = day
+            if n == self.count:
+                break
+        else:
+            raise OverflowError("COUNT runs past date.max")
+        return last
+
+    def occurs_on(self, day):
+        """Whether the rule produces `day` - O(1), nothing is expanded."""
+        if not self.dtstart <= day <= self.last:
+            return False
+        if self.freq == 'DAILY':
+            return (day - self.dtstart).days % self.interval == 0
+        if self.freq == 'WEEKLY':
+            weeks = ((day - self.dtstart).days + self.dtstart.weekday() - day.weekday()) // 7
+            return day.weekday() in self.byday and weeks % self.interval == 0
+        months = (day.year - self.dtstart.year) * 12 + day.month - self.dtstart.month
+        return day.day == self.dtstart.day and months % self.interval == 0
+
+    def between(self, start, end):
+        """Dates the rule produces with start <= date <= end, generated lazily."""
+        end = min(end, self.last)
+        for day in self._dates(max(start, self.dtstart)):
+            if day > end:
+                return
+            yield day
+
+    def describe(self):
+        unit = {'DAILY': 'day', 'WEEKLY': 'week', 'MONTHLY': 'month'}[self.freq]
+        text = f"Every {unit}" if self.interval == 1 else f"Every {self.interval} {unit}s"
+        if self.freq == 'WEEKLY':
+            text += " on " + ", ".join(calendar.day_abbr[d] for d in self.byday)
+        return f"{text}, {self.dtstart} to {self.last}"
+
+
+def series_rule(form, first_date):
+    """The Recurrence described by create_schedule's repeat fields, or None for a one-off meeting."""
+    freq = form.get("repeat", "").strip().upper()
+    if not freq:
+        return None
+    parts = [f"FREQ={freq}", f"INTERVAL={int(form.get('repeat_interval') or 1)}"]
+    if freq == 'WEEKLY' and form.getlist("repeat_days"):
+        parts.append("BYDAY=" + ",".join(form.getlist("repeat_days")))
+    if form.get("repeat_until"):
+        parts.append("UNTIL=" + datetime.strptime(form["repeat_until"], "%Y-%m-%d").strftime("%Y%m%d"))
+    if form.get("repeat_count"):
+        parts.append(f"COUNT={int(form['repeat_count'])}")
+
+    rule = Recurrence(";".join(parts), first_date)
+    for n, _ in enumerate(rule.between(rule.dtstart, rule.last), 1):
+        if n > SERIES_MAX_OCCURRENCES:
+            raise ValueError(f"A recurring meeting can have at most {SERIES_MAX_OCCURRENCES} occurrences.")
+    return rule
+
+
+class Series:
+    """A meeting_series row with the exceptions loaded for a window and, for conflict checks, its members."""
+
+    def __init__(self, row):
+        self.row = row
+        self.series_id = row['series_id']
+        self.rule = Recurrence(row['rrule'], row['first_date'])
+        self.members = {}       # user_id -> user_name (only the participants that were asked about)
+        self.exceptions = {}    # occurrence_date -> meeting_series_exception row
+        self.moved_in = {}      # meeting_date -> [occurrence dates moved onto it]
+
+    def add_exception(self, row):
+        self.exceptions[row['occurrence_date']] = row
+        if not row['cancelled'] and row['meeting_date'] not in (None, row['occurrence_date']):
+            self.moved_in.setdefault(row['meeting_date'], []).append(row['occurrence_date'])
+
+    def occurrence(self, occurrence_date):
+        """One occurrence in find_conflicts' row shape, with any override applied."""
+        occ = {
+            'series_id': self.series_id,
+            'meeting_id': None,
+            'occurrence_date': occurrence_date,
+            'meeting_title': self.row['meeting_title'],
+            'meeting_date': occurrence_date,
+            'start_time': self.row['start_time'],
+            'end_time': self.row['end_time'],
+            'venue': self.row['venue'],
+            'meeting_department_name': self.row['meeting_department_name'],
+        }
+        override = self.exceptions.get(occurrence_date)
+        if override:
+            for column in ('meeting_date', 'start_time', 'end_time', 'venue'):
+                if override[column] is not None:
+                    occ[column] = override[column]
+        return occ
+
+    def _stays(self, occurrence_date):
+        """The rule's occurrence on this date is neither cancelled nor moved to another day."""
+        e = self.exceptions.get(occurrence_date)
+        return e is None or (not e['cancelled'] and e['meeting_date'] in (None, occurrence_date))
+
+    def on(self, day):
+        """Occurrences taking place on `day`: O(1) plus the (rare) occurrences moved onto it."""
+        found = [self.occurrence(day)] if self.rule.occurs_on(day) and self._stays(day) else []
+        found.extend(self.occurrence(original) for original in self.moved_in.get(day, ())
+                     if self.rule.occurs_on(original))
+        return found
+
+    def occurrences(self, start, end):
+        """Occurrences taking place with start <= date <= end, in date order."""
+        found = [self.occurrence(day) for day in self.rule.between(start, end) if self._stays(day)]
+        for day, originals in self.moved_in.items():
+            if start <= day <= end:
+                found.extend(self.occurrence(original) for original in originals if self.rule.occurs_on(original))
+        return sorted(found, key=lambda o: (o['meeting_date'], o['start_time']))
+
+
+_SERIES_COLUMNS = """s.series_id, s.meeting_title, s.rrule, s.first_date, s.last_date, s.start_time,
+           s.end_time, s.venue, s.user_id AS organizer_id, s.department_id,
+           d.department_name AS meeting_department_name"""
+
+SERIES_FOR_USERS_QUERY = prepared_statement('series_for_users', f"""
+    SELECT {_SERIES_COLUMNS}, sp.user_id, u.user_name
+    FROM meeting_series_participant sp
+    JOIN meeting_series s ON s.series_id = sp.series_id
+    JOIN "user" u ON u.user_id = sp.user_id
+    LEFT JOIN department d ON s.department_id = d.department_id
+    WHERE sp.user_id = ANY(%s) AND s.first_date <= %s AND s.last_date >= %s
+""")
+
+SERIES_EXCEPTIONS_QUERY = prepared_statement('series_exceptions', """
+    SELECT series_id, occurrence_date, cancelled, meeting_date, start_time, end_time, venue
+    FROM meeting_series_exception
+    WHERE series_id = ANY(%s)
+    AND (occurrence_date BETWEEN %s AND %s OR meeting_date BETWEEN %s AND %s)
+""")
+
+DEPARTMENT_SERIES_QUERY = f"""
+    SELECT {_SERIES_COLUMNS}
+    FROM meeting_series s
+    LEFT JOIN department d ON s.department_id = d.department_id
+    WHERE s.department_id = %s AND s.last_date >= %s AND s.first_date <= %s
+"""
+
+ORGANIZER_SERIES_QUERY = f"""
+    SELECT {_SERIES_COLUMNS}
+    FROM meeting_series s
+    LEFT JOIN department d ON s.department_id = d.department_id
+    WHERE s.user_id = %s AND s.last_date >= %s
+    ORDER BY s.first_date, s.series_id
+"""
+
+
+def series_from_rows(rows):
+    """series_id -> Series for query rows (one per series, or per series participant)."""
+    series = {}
+    for row in rows:
+        if row['series_id'] not in series:
+            series[row['series_id']] = Series(row)
+        if 'user_id' in row:
+            series[row['series_id']].members[row['user_id']] = row['user_name']
+    return series
+
+
+def load_series(rows, start, end):
+    """Series for query rows, with their exceptions for [start, end]."""
+    series = series_from_rows(rows)
+    if series:
+        for row in execute_prepared(SERIES_EXCEPTIONS_QUERY, (list(series), start, end, start, end)):
+            series[row['series_id']].add_exception(row)
+    return list(series.values())
+
+
+def participant_series(participant_ids, start, end):
+    """Series any of participant_ids belongs to that can have occurrences in [start, end]."""
+    rows = execute_prepared(SERIES_FOR_USERS_QUERY, ([int(p) for p in participant_ids], end, start))
+    return load_series(rows, start, end)
+
+
+def department_series(department_id, start, end):
+    return load_series(execute_query(DEPARTMENT_SERIES_QUERY, (department_id, start, end)), start, end)
+
+
+# Meeting listings (my_schedule, view_all_meetings, search, export) show
+# occurrences next to the stored meetings. An occurrence sorts after the
+# meetings of its day under the key (meeting_date, -series_id), so the one
+# keyset cursor pages through both, and only the occurrences that can land
+# on the page asked for (between the cursor and the last meeting fetched)
+# are expanded.
+SERIES_LIST_SELECT = f"""
+    SELECT {_SERIES_COLUMNS}, u.user_name, u.user_mobileno,
+           (SELECT COUNT(*) FROM meeting_series_participant sp
+            WHERE sp.series_id = s.series_id) AS participant_count
+    FROM meeting_series s
+    LEFT JOIN department d ON s.department_id = d.department_id
+    JOIN "user" u ON s.user_id = u.user_id
+"""
+SERIES_SEARCH = {
+    'columns': ["s.meeting_title"],
+    'lookups': [("s.department_id", "department", "department_id", "department_name"),
+                ("s.user_id", '"user"', "user_id", "user_name")],
+}
+LISTING_KEY_FIELDS = ["meeting_date", "list_key"]
+
+
+def listing_series_query(where, params, start=None, end=None):
+    """SERIES_LIST_SELECT for the series matching where that can occur in [start, end] (None: unbounded)."""
+    where, params = list(where), list(params)
+    if start is not None:
+        where.append("s.last_date >= %s")
+        params.append(start)
+    if end is not None:
+        where.append("s.first_date <= %s")
+        params.append(end)
+    query = SERIES_LIST_SELECT
+    if where:
+        query += " WHERE " + " AND ".join(f"({w})" for w in where)
+    return query, params
+
+
+def series_span(rows, start=None, end=None):
+    """[start, end] with an unbounded side closed at the series rows' first / last dates."""
+    return (start if start is not None else min(row['first_date'] for row in rows),
+            end if end is not None else max(row['last_date'] for row in rows))
+
+
+def listing_occurrences(series, start, end):
+    """Occurrences of Series in [start, end] as MEETING_LIST_SELECT-shaped rows (meeting_id None)."""
+    rows = []
+    for s in series:
+        for occ in s.occurrences(start, end):
+            rows.append(dict(occ, list_key=-s.series_id, user_id=s.row['organizer_id'],
+                             department_name=s.row['meeting_department_name'], user_name=s.row['user_name'],
+                             user_mobileno=s.row['user_mobileno'], participant_count=s.row['participant_count']))
+    return rows
+
+
+def occurrence_window(rows, page):
+    """
+    The dates whose occurrences can land on a listing page, from the meeting
+    rows page_query() fetched (newest first; reversed for a ?before= page):
+    from the cursor to the last row fetched, unbounded where the rows run out.
+    """
+    limit, forward, cursor = page
+    near = cursor[0] if cursor is not None else None
+    far = rows[-1]['meeting_date'] if len(rows) > limit else None
+    return (far, near) if forward else (near, far)
+
+
+def merge_listing(rows, occurrences, page):
+    """page_rows() over meeting rows and occurrences merged in listing order."""
+    limit, forward, cursor = page
+    for row in rows:
+        row['list_key'] = row['meeting_id']
+    if cursor is not None:
+        cursor = tuple(cursor)
+        occurrences = [o for o in occurrences if ((o['meeting_date'], o['list_key']) < cursor if forward
+                                                  else (o['meeting_date'], o['list_key']) > cursor)]
+    merged = sorted(rows + occurrences, key=lambda r: (r['meeting_date'], r['list_key']), reverse=forward)
+    return page_rows(merged[:limit + 1], page, LISTING_KEY_FIELDS)
+
+
+def listing_filters(keyword):
+    """(where, params, series_where, series_params) for a listing's ?q= search (MEETING_SEARCH / SERIES_SEARCH)."""
+    if not keyword:
+        return [], [], [], []
+    condition, params = search_condition(keyword, **MEETING_SEARCH)
+    series_condition, series_params = search_condition(keyword, **SERIES_SEARCH)
+    return [condition], params, [series_condition], series_params
+
+
+def fetch_listing_page(select, where, params, series_where=(), series_params=()):
+    """fetch_page() over MEETING_PAGE_KEY for a meeting listing, with series occurrences merged in."""
+    key_columns, _ = MEETING_PAGE_KEY
+    query, query_params, page = page_query(select, where, params, key_columns, request.args,
+                                           key_types=MEETING_KEY_TYPES)
+    rows = execute_query(query, query_params, fetch='all')
+    start, end = occurrence_window(rows, page)
+    series_rows = execute_query(*listing_series_query(series_where, series_params, start, end), fetch='all')
+    occurrences = []
+    if series_rows:
+        start, end = series_span(series_rows, start, end)
+        occurrences = listing_occurrences(load_series(series_rows, start, end), start, end)
+    return merge_listing(rows, occurrences, page)
+
+
+
+def _occurrences_newest_first(series):
+    """A Series' listing rows from its last date back to its first, SERIES_VIEW_DAYS of dates at a time."""
+    first, end = series.row['first_date'], series.row['last_date']
+    while True:
+        start = end - timedelta(days=max(0, min(SERIES_VIEW_DAYS - 1, (end - first).days)))
+        yield from reversed(listing_occurrences([series], start, end))
+        if start <= first:
+            return
+        end = start - timedelta(days=1)
+
+
+def export_occurrences(where, params):
+    """
+    Listing rows for every occurrence of the series matching where, newest
+    first (export_meetings). The series stream in by last_date and only join
+    the merge once the export has reached that date, so memory holds the
+    series running at the current date, a window of occurrences each.
+    """
+    query, params = listing_series_query(where, params)
+    rows = execute_query(query + " ORDER BY s.last_date DESC, s.series_id DESC", params, fetch='stream')
+    waiting = next(rows, None)
+    heap = []   # (-date ordinal, series_id, occurrence, the rest of that series' occurrences)
+
+    def push(occurrences):
+        occ = next(occurrences, None)
+        if occ is not None:
+            heapq.heappush(heap, (-occ['meeting_date'].toordinal(), -occ['list_key'], occ, occurrences))
+
+    while heap or waiting is not None:
+        newest = heap[0][2]['meeting_date'] if heap else waiting['last_date']
+        if waiting is not None and waiting['last_date'] >= newest:
+            batch = []
+            while waiting is not None and waiting['last_date'] >= newest:
+                batch.append(waiting)
+                waiting = next(rows, None)
+            for series in load_series(batch, min(r['first_date'] for r in batch), batch[0]['last_date']):
+                push(_occurrences_newest_first(series))
+            continue
+        _, _, occ, occurrences = heapq.heappop(heap)
+        yield occ
+        push(occurrences)
+
+def series_conflicts(dates, start_time, end_time, participant_ids, exclude_series_id=None):
+    """
+    Occurrences of the participants' series on any of `dates` overlapping
+    [start_time, end_time), in find_conflicts' row shape. The series are
+    loaded once for the span of `dates`; each (series, date) is then an
+    O(1) test, however long the series runs.
+    """
+    if not dates:
+        return []
+    start, end = as_time(start_time), as_time(end_time)
+    conflicts = []
+    for series in participant_series(participant_ids, min(dates), max(dates)):
+        if series.series_id == exclude_series_id:
+            continue
+        for day in dates:
+            for occ in series.on(day):
+                if occ['start_time'] < end and occ['end_time'] > start:
+                    conflicts.extend(dict(occ, user_id=user_id, user_name=user_name)
+                                     for user_id, user_name in series.members.items())
+    return conflicts
+
+
+def series_emails(series_id):
+    rows = execute_query("""
+        SELECT DISTINCT u.email
+        FROM meeting_series_participant sp
+        JOIN "user" u ON sp.user_id = u.user_id
+        WHERE sp.series_id = %s AND u.email IS NOT NULL
+    """, (series_id,), fetch='all')
+    return [row['email'] for row in rows]
+
+
+def create_series(title, rule, start_time, end_time, organizer_id, department_id, venue, participant_ids):
+    """Store a series (one row, whatever its length) with its participants and email them once."""
+    with transaction() as conn:
+        series_id = execute_query("""
+            INSERT INTO meeting_series
+            (meeting_title, rrule, first_date, last_date, start_time, end_time, user_id, department_id, venue)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING series_id
+        """, (title, rule.text, rule.dtstart, rule.last, start_time, end_time,
+              organizer_id, department_id, venue), fetch='one', commit=True)['series_id']
+
+        cursor = conn.cursor()
+        psycopg2.extras.execute_values(
+            cursor,
+            "INSERT INTO meeting_series_participant (series_id, user_id) VALUES %s",
+            [(series_id, uid) for uid in dict.fromkeys(int(uid) for uid in participant_ids)],
+            page_size=PARTICIPANT_BATCH_SIZE
+        )
+        cursor.close()
+
+    emails = series_emails(series_id)
+    if emails:
+        dept = execute_query("SELECT department_name FROM department WHERE department_id = %s",
+                             (department_id,), fetch='one')
+        send_meeting_email(emails, 'created', {
+            'title': title, 'date': rule.describe(), 'start_time': start_time, 'end_time': end_time,
+            'venue': venue, 'dept_name': dept['department_name'] if dept else 'N/A'
+        })
+    return series_id
+
+
+def organizer_series(series_id):
+    """The session user's series row, or None."""
+    return execute_query(f"""
+        SELECT {_SERIES_COLUMNS}
+        FROM meeting_series s
+        LEFT JOIN department d ON s.department_id = d.department_id
+        WHERE s.series_id = %s AND s.user_id = %s
+    """, (series_id, session["user_id"]), fetch='one')
+
+
+@app.route("/faculty/series/<int:series_id>/occurrence/<occurrence_date>", methods=["POST"])
+@login_required
+def edit_series_occurrence(series_id, occurrence_date):
+    """Cancel one occurrence (action=cancel) or move / retime / relocate it (meeting_date, start_time, end_time, venue)."""
+    row = organizer_series(series_id)
+    if not row:
+        flash("❌ You can only edit your own meetings!")
+        return redirect(url_for("my_created_meetings"))
+
+    try:
+        occurrence_date = date.fromisoformat(occurrence_date)
+        series = Series(row)
+        if not series.rule.occurs_on(occurrence_date):
+            raise ValueError(f"{row['meeting_title']} does not take place on {occurrence_date}.")
+
+        cancelled = request.form.get("action") == "cancel"
+        new_date = new_start = new_end = None
+        if not cancelled:
+            new_date = datetime.strptime(request.form.get("meeting_date") or occurrence_date.isoformat(),
+                                         "%Y-%m-%d").date()
+            new_start = parse_time(request.form.get("start_time") or row['start_time'])
+            new_end = parse_time(request.form.get("end_time") or row['end_time'])
+            if not row['first_date'] <= new_date <= row['last_date']:
+                raise ValueError(f"An occurrence can only move within {row['first_date']} to {row['last_date']}.")
+    except ValueError as e:
+        flash(f"❌ {e}")
+        return redirect(url_for("my_created_meetings"))
+
+    if not cancelled:
+        members = [r['user_id'] for r in execute_query(
+            "SELECT user_id FROM meeting_series_participant WHERE series_id = %s", (series_id,), fetch='all')]
+        conflicts = find_conflicts(new_date, new_start, new_end, members, exclude_series_id=series_id)
+        if conflicts:
+            flash("Conflicts detected:\n" + "\n".join(
+                f"Member: {m['user_name']} (ID: {m['user_id']}), Scheduled on: {m['meeting_date']} "
+                f"from {m['start_time']} to {m['end_time']}" for m in conflicts))
+            return redirect(url_for("my_created_meetings"))
+
+    with transaction():
+        execute_query("""
+            INSERT INTO meeting_series_exception
+            (series_id, occurrence_date, cancelled, meeting_date, start_time, end_time, venue)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (series_id, occurrence_date) DO UPDATE SET
+                cancelled = EXCLUDED.cancelled, meeting_date = EXCLUDED.meeting_date,
+                start_time = EXCLUDED.start_time, end_time = EXCLUDED.end_time, venue = EXCLUDED.venue
+        """, (series_id, occurrence_date, cancelled, new_date, new_start, new_end,
+              None if cancelled else request.form.get("venue") or None), commit=True, fetch=None)
+        # Bumps the department calendar version (migrations/0009).
+        execute_query("UPDATE meeting_series SET updated_at = now() WHERE series_id = %s",
+                      (series_id,), commit=True, fetch=None)
+
+    emails = series_emails(series_id)
+    if emails:
+        send_meeting_email(emails, 'deleted/cancelled' if cancelled else 'updated', {
+            'title': f"{row['meeting_title']} ({occurrence_date})",
+            'date': 'N/A (cancelled)' if cancelled else new_date,
+            'start_time': 'N/A' if cancelled else new_start,
+            'end_time': 'N/A' if cancelled else new_end,
+            'venue': 'N/A' if cancelled else request.form.get("venue") or row['venue'],
+            'dept_name': row['meeting_department_name'] or 'N/A'
+        })
+
+    flash(f"✅ {occurrence_date} {'cancelled' if cancelled else 'updated'}.")
+    return redirect(url_for("my_created_meetings"))
+
+
+@app.route("/faculty/delete-series/<int:series_id>")
+@login_required
+def delete_series(series_id):
+    row = organizer_series(series_id)
+    if not row:
+        flash("❌ You can only delete your own meetings!")
+        return redirect(url_for("my_created_meetings"))
+
+    emails = series_emails(series_id)
+    with transaction():
+        execute_query("DELETE FROM meeting_series WHERE series_id = %s", (series_id,), commit=True, fetch=None)
+
+    if emails:
+        send_meeting_email(emails, 'deleted/cancelled', {
+            'title': row['meeting_title'], 'date': 'N/A (all occurrences cancelled)',
+            'start_time': 'N/A', 'end_time': 'N/A', 'venue': 'N/A', 'dept_name': 'N/A'
+        })
+
+    flash(f'✅ "{row["meeting_title"][:30]}" and all its occurrences deleted.')
+    return redirect(url_for("my_created_meetings"))
+
+
+# ---------------- BACKGROUND WORKERS ----------------
+
+@app.before_request
+def start_background_workers():
+    if EMAIL_OUTBOX_WORKER:
+        start_outbox_worker()
+    if RETENTION_WORKER:
+        start_retention_worker()
+    start_change_listener()
+
+
+# ---------------- PASSWORD HASHING ----------------
+# PBKDF2 is deliberately slow, so a burst of logins used to pin every request
+# thread on the CPU. Hashing now runs on a small per-process thread pool
+# (hashlib releases the GIL while it works): at most HASH_WORKERS hashes run
+# at once, up to HASH_QUEUE more requests wait for a slot, and anything beyond
+# that is turned away with HashPoolBusy instead of piling up.
+
+class HashPoolBusy(Exception):
+    pass
+
+
+@app.errorhandler(HashPoolBusy)
+def hash_pool_busy(error):
+    return "Server busy, please try again in a moment.", 503
+
+
+_hash_pool = None
+_hash_pool_pid = None
+_hash_pool_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE)
+_hash_prefix = None
+
+
+def _get_hash_pool():
+    global _hash_pool, _hash_pool_pid
+    with _hash_pool_lock:
+        # Threads do not survive a fork, so a pool created before gunicorn forked is useless.
+        if _hash_pool is None or _hash_pool_pid != os.getpid():
+            _hash_pool = concurrent.futures.ThreadPoolExecutor(HASH_WORKERS, thread_name_prefix='hash')
+            _hash_pool_pid = os.getpid()
+        return _hash_pool
+
+
+def run_hashing(fn, *args):
+    """
+    Run a password hash function on the hash pool and wait for its result.
+    The slot is given back when the hash finishes, not when this request
+    gives up on it, so timed-out hashes still count against the limit.
+    """
+    if not _hash_slots.acquire(blocking=False):
+        raise HashPoolBusy()
+    try:
+        future = _get_hash_pool().submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        raise HashPoolBusy()
+
 
+def hash_password(password):
+    return run_hashing(generate_password_hash, password, PASSWORD_HASH_METHOD)
 
-def get_roles():
-    """Get all roles from database"""
-    return execute_query(
-        """SELECT role_id, role_name FROM role WHERE role_id != 100 ORDER BY role_name""",
-        fetch='all'
-    )
 
+def verify_password(password_hash, password):
+    return run_hashing(check_password_hash, password_hash, password)
 
-def send_meeting_email(recipients, action, meeting_info):
-    """Send notification email to meeting members."""
-    if action == 'created':
-        subject = f'New Meeting Created: {meeting_info["title"]}'
-    elif action == 'updated':
-        subject = f'Meeting Updated: {meeting_info["title"]}'
-    else:
-        subject = f'Meeting Cancelled: {meeting_info["title"]}'
 
-    body = f"""
-Meeting {action.upper()} Notification:
+def needs_rehash(password_hash):
+    """True if the hash was made with a different method or cost than PASSWORD_HASH_METHOD."""
+    global _hash_prefix
+    if _hash_prefix is None:
+        # Werkzeug fills in defaults (e.g. the iteration count), so compare against a real hash.
+        _hash_prefix = generate_password_hash('', PASSWORD_HASH_METHOD).split('$', 1)[0]
+    return password_hash.split('$', 1)[0] != _hash_prefix
 
-Title: {meeting_info["title"]}
-Date: {meeting_info["date"]}
-Time: {meeting_info["start_time"]} to {meeting_info["end_time"]}
-Venue: {meeting_info.get("venue", "TBD")}
-Department: {meeting_info.get("dept_name", "N/A")}
-"""
 
-    message = f"""From: {SENDER_EMAIL}
-To: {', '.join(recipients)}
-Subject: {subject}
+# ---------------- LOGIN ----------------
 
-{body}"""
+LOGIN_COLUMNS = 'user_id, user_name, email, role_id, password_hash'
+LOGIN_BY_ID = prepared_statement('login_by_id', f'SELECT {LOGIN_COLUMNS} FROM "user" WHERE user_id = %s')
+LOGIN_BY_EMAIL = prepared_statement('login_by_email', f'SELECT {LOGIN_COLUMNS} FROM "user" WHERE email = %s')
 
-    try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.sendmail(SENDER_EMAIL, recipients, message)
-        server.quit()
-        print(f"✅ Email sent to {len(recipients)} recipients ({action})")
-    except Exception as e:
-        print(f"❌ Email failed: {e}")
 
+def find_login_user(identifier):
+    """Look a user up by numeric user id or by email, whichever the identifier is."""
+    identifier = identifier.strip()
+    if identifier.isascii() and identifier.isdigit():
+        if int(identifier) > 2147483647:
+            return None
+        statement, value = LOGIN_BY_ID, int(identifier)
+    elif '@' in identifier:
+        statement, value = LOGIN_BY_EMAIL, identifier
+    else:
+        return None
+    return execute_prepared(statement, (value,), fetch='one')
 
-# ---------------- LOGIN ----------------
 
 @app.route("/", methods=["GET", "POST"])
 @app.route('/login', methods=['GET', 'POST'])
@@ -169,13 +2509,19 @@ def login():
         identifier = request.form['username']
         password = request.form['password']
 
-        user = execute_query(
-            'SELECT * FROM "user" WHERE user_id = %s OR email = %s',
-            (identifier, identifier),
-            fetch='one'
-        )
+        user = find_login_user(identifier)
 
-        if user and check_password_hash(user['password_hash'], password):
+        try:
+            valid = user is not None and verify_password(user['password_hash'], password)
+            if valid and needs_rehash(user['password_hash']):
+                execute_query(
+                    'UPDATE "user" SET password_hash=%s WHERE user_id=%s',
+                    (hash_password(password), user['user_id']), commit=True, fetch=None
+                )
+        except HashPoolBusy:
+            return render_template('login.html', error="Too many sign-ins right now, please try again."), 503
+
+        if valid:
             session['user_id'] = user['user_id']
             session['user_name'] = user['user_name']
             session['email'] = user['email']
@@ -195,7 +2541,7 @@ def login():
 
 @app.route("/admin/dashboard")
 def admin_dashboard():
-    if "user_id" not in session or session.get("role_id") != 100:
+    if not is_admin():
         return redirect(url_for("login"))
     user_name = session.get("user_name", "Admin")
     return render_template("admin/admin_dashboard.html", user=user_name)
@@ -211,16 +2557,18 @@ def faculty_dashboard():
 
 @app.route("/admin/add-department", methods=["GET", "POST"])
 def add_department():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     if request.method == "POST":
         department_name = request.form["department_name"]
-        execute_query(
-            "INSERT INTO department (department_name) VALUES (%s)",
-            (department_name,),
-            commit=True
-        )
+        with transaction():
+            execute_query(
+                "INSERT INTO department (department_name) VALUES (%s)",
+                (department_name,),
+                commit=True, fetch=None
+            )
+            invalidate_reference('department')
         return redirect(url_for("view_departments"))
 
     return render_template("admin/add_department.html")
@@ -228,19 +2576,18 @@ def add_department():
 
 @app.route("/admin/view-departments", methods=["GET"])
 def view_departments():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     search = request.args.get("search", "").strip()
 
     if search:
+        condition, params = search_condition(search, columns=["department_name"])
         departments = execute_query(
-            "SELECT * FROM department WHERE department_name ILIKE %s",
-            ("%" + search + "%",),
-            fetch='all'
+            "SELECT * FROM department WHERE " + condition, params, fetch='all'
         )
     else:
-        departments = execute_query("SELECT * FROM department", fetch='all')
+        departments = get_departments()
 
     return render_template(
         "admin/view_departments.html",
@@ -251,7 +2598,7 @@ def view_departments():
 
 @app.route("/admin/delete-department/<int:dept_id>")
 def delete_department(dept_id):
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     users_count = execute_query(
@@ -267,33 +2614,44 @@ def delete_department(dept_id):
     if users_count > 0 or meetings_count > 0:
         return "❌ Cannot delete department. Users or meetings exist."
 
-    execute_query(
-        "DELETE FROM department WHERE department_id=%s",
-        (dept_id,), commit=True, fetch=None
-    )
+    with transaction():
+        execute_query(
+            "DELETE FROM department WHERE department_id=%s",
+            (dept_id,), commit=True, fetch=None
+        )
+        invalidate_reference('department')
     return redirect(url_for("view_departments"))
 
 
 @app.route("/admin/search-departments")
 def search_departments():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return {"error": "Unauthorized"}, 403
 
     keyword = request.args.get("q", "").strip()
 
-    if keyword == "":
-        departments = execute_query("SELECT * FROM department", fetch='all')
-    else:
-        departments = execute_query(
-            "SELECT * FROM department WHERE department_name ILIKE %s",
-            ("%" + keyword + "%",), fetch='all'
-        )
-    return {"departments": departments}
+    where, params = [], []
+    if keyword:
+        condition, params = search_condition(keyword, columns=["department_name"])
+        where.append(condition)
+
+    departments, next_cursor, prev_cursor = fetch_page(
+        "SELECT * FROM department", where, params,
+        ["department_id"], ["department_id"], descending=False, key_types=ID_KEY_TYPES
+    )
+    return {"departments": departments, "next": next_cursor, "prev": prev_cursor}
+
+
+@app.route("/admin/db-pool-stats")
+def db_pool_stats():
+    if not is_admin():
+        return {"error": "Unauthorized"}, 403
+    return {"pool": pool_stats()}
 
 
 @app.route("/admin/view-users")
 def view_users():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     keyword = request.args.get("q", "").strip()
@@ -305,28 +2663,24 @@ def view_users():
         LEFT JOIN department d ON u.department_id = d.department_id
         LEFT JOIN role r ON u.role_id = r.role_id
     """
-    params = []
+    where, params = ["u.role_id != 100"], []
 
     if keyword:
-        query += """
-        WHERE u.user_name ILIKE %s
-           OR u.email ILIKE %s
-           OR d.department_name ILIKE %s
-           OR r.role_name ILIKE %s
-        """
-        params = ["%" + keyword + "%"] * 4
+        condition, params = search_condition(keyword, **USER_SEARCH)
+        where.append(condition)
 
-    query += ' ORDER BY u.user_id'
-
-    users = execute_query(query, params if params else None, fetch='all')
-    users = [u for u in users if u['role_id'] != 100]
+    users, next_cursor, prev_cursor = fetch_page(
+        query, where, params, ["u.user_id"], ["user_id"], descending=False, row_type='record',
+        key_types=ID_KEY_TYPES
+    )
 
-    return render_template("admin/view_users.html", users=users, search_query=keyword)
+    return render_template("admin/view_users.html", users=users, search_query=keyword,
+                           next_cursor=next_cursor, prev_cursor=prev_cursor)
 
 
 @app.route("/admin/edit-user/<int:user_id>", methods=["GET", "POST"])
 def edit_user(user_id):
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     if request.method == "POST":
@@ -335,69 +2689,70 @@ def edit_user(user_id):
         department_id = request.form.get("department_id")
         role_id = request.form["role_id"]
 
-        execute_query("""
-            UPDATE "user"
-            SET user_name=%s, email=%s, department_id=%s, role_id=%s
-            WHERE user_id=%s
-        """, (user_name, email, department_id, role_id, user_id), commit=True, fetch=None)
+        with transaction():
+            execute_query("""
+                UPDATE "user"
+                SET user_name=%s, email=%s, department_id=%s, role_id=%s
+                WHERE user_id=%s
+            """, (user_name, email, department_id, role_id, user_id), commit=True, fetch=None)
+            invalidate_role(user_id)
 
         return redirect(url_for("view_users"))
 
     user = execute_query('SELECT * FROM "user" WHERE user_id=%s', (user_id,), fetch='one')
-    departments = execute_query("SELECT * FROM department", fetch='all')
-    roles = execute_query("SELECT * FROM role", fetch='all')
+    departments = get_departments()
+    roles = get_all_roles()
 
     return render_template("admin/edit_user.html", user=user, departments=departments, roles=roles)
 
 
 @app.route("/admin/delete-user/<int:user_id>")
 def delete_user(user_id):
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
-    execute_query('DELETE FROM "user" WHERE user_id=%s', (user_id,), commit=True, fetch=None)
+    with transaction():
+        execute_query('DELETE FROM "user" WHERE user_id=%s', (user_id,), commit=True, fetch=None)
+        invalidate_role(user_id)
     return redirect(url_for("view_users"))
 
 
+# The JSON searches and the department event feed are also served by
+# asgi.py on an async driver; both sides share these queries and shapers.
+SEARCH_MEETINGS_SELECT = """
+    SELECT m.meeting_id, m.meeting_title, m.meeting_date, m.start_time, m.end_time,
+           m.venue, d.department_name, u.user_name
+    FROM meeting m
+    JOIN department d ON m.department_id = d.department_id
+    JOIN "user" u ON m.user_id = u.user_id
+"""
+
+
+def search_result(m):
+    return {
+        "meeting_title": m["meeting_title"],
+        "meeting_date": str(m["meeting_date"]),
+        "start_time": str(m["start_time"]),
+        "end_time": str(m["end_time"]),
+        "venue": m["venue"],
+        "department_name": m["department_name"],
+        "user_name": m["user_name"]
+    }
+
+
 @app.route("/admin/search-meetings")
 def search_meetings():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return {"error": "Unauthorized"}, 403
 
     keyword = request.args.get("q", "").strip()
 
-    query = """
-        SELECT m.meeting_title, m.meeting_date, m.start_time, m.end_time,
-               m.venue, d.department_name, u.user_name
-        FROM meeting m
-        JOIN department d ON m.department_id = d.department_id
-        JOIN "user" u ON m.user_id = u.user_id
-    """
-    params = []
-
-    if keyword:
-        query += """
-        WHERE m.meeting_title ILIKE %s
-           OR d.department_name ILIKE %s
-           OR u.user_name ILIKE %s
-        """
-        params = ["%" + keyword + "%"] * 3
-
-    results = execute_query(query, params if params else None, fetch='all')
-
-    meetings = []
-    for m in results:
-        meetings.append({
-            "meeting_title": m["meeting_title"],
-            "meeting_date": str(m["meeting_date"]),
-            "start_time": str(m["start_time"]),
-            "end_time": str(m["end_time"]),
-            "venue": m["venue"],
-            "department_name": m["department_name"],
-            "user_name": m["user_name"]
-        })
+    where, params, series_where, series_params = listing_filters(keyword)
+    results, next_cursor, prev_cursor = fetch_listing_page(SEARCH_MEETINGS_SELECT, where, params,
+                                                           series_where, series_params)
 
-    return {"meetings": meetings}
+    meetings = [search_result(m) for m in results]
+    return {"meetings": meetings, "next": next_cursor, "prev": prev_cursor}
 
 
 # ---------------- MY CREATED MEETINGS ----------------
@@ -407,24 +2762,25 @@ def search_meetings():
 def my_created_meetings():
     keyword = request.args.get("q", "").strip()
 
-    query = """
-    SELECT m.meeting_id, m.meeting_title, m.meeting_date, m.start_time, m.end_time,
-           m.venue, d.department_name, COUNT(mp.participant_id) as participant_count
-    FROM meeting m
-    JOIN department d ON m.department_id = d.department_id
-    LEFT JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id
-    WHERE m.user_id = %s
-    """
-    params = [session["user_id"]]
+    where, params = ["m.user_id = %s"], [session["user_id"]]
 
     if keyword:
-        query += " AND (m.meeting_title ILIKE %s OR d.department_name ILIKE %s)"
-        params.extend(["%" + keyword + "%"] * 2)
+        condition, keyword_params = search_condition(
+            keyword, columns=["m.meeting_title"], lookups=MEETING_SEARCH['lookups'][:1]
+        )
+        where.append(condition)
+        params.extend(keyword_params)
 
-    query += " GROUP BY m.meeting_id, m.meeting_title, m.meeting_date, m.start_time, m.end_time, m.venue, d.department_name ORDER BY m.meeting_date DESC"
+    meetings, next_cursor, prev_cursor = fetch_page(MEETING_LIST_SELECT, where, params, *MEETING_PAGE_KEY,
+                                                    row_type='record', key_types=MEETING_KEY_TYPES)
 
-    meetings = execute_query(query, params, fetch='all')
-    return render_template("my_created_meetings.html", meetings=meetings, search_query=keyword)
+    # The organizer's current series, with their next SERIES_VIEW_DAYS of occurrences.
+    today = date.today()
+    horizon = today + timedelta(days=SERIES_VIEW_DAYS)
+    series = load_series(execute_query(ORGANIZER_SERIES_QUERY, (session["user_id"], today)), today, horizon)
+    return render_template("my_created_meetings.html", meetings=meetings, search_query=keyword,
+                           next_cursor=next_cursor, prev_cursor=prev_cursor,
+                           series=[(s, s.occurrences(today, horizon)) for s in series])
 
 
 @app.route("/faculty/meeting-edit/<int:meeting_id>", methods=['GET', 'POST'])
@@ -442,8 +2798,8 @@ def edit_meeting(meeting_id):
         SELECT u.user_id, u.user_name
         FROM meeting_participant mp
         JOIN "user" u ON mp.user_id = u.user_id
-        WHERE mp.meeting_id = %s
-    """, (meeting_id,), fetch='all')
+        WHERE mp.meeting_id = %s AND mp.meeting_date = %s
+    """, (meeting_id, meeting['meeting_date']), fetch='all')
 
     all_users = execute_query("""
         SELECT u.user_id, u.user_name, u.email, u.user_mobileno, d.department_name
@@ -452,15 +2808,7 @@ def edit_meeting(meeting_id):
         WHERE u.role_id != 100
     """, fetch='all')
 
-    departments = execute_query("SELECT * FROM department ORDER BY department_name", fetch='all')
-
-    def parse_time(time_str):
-        for fmt in ("%H:%M:%S", "%I:%M %p", "%H:%M"):
-            try:
-                return datetime.strptime(str(time_str), fmt).strftime("%H:%M:%S")
-            except ValueError:
-                continue
-        raise ValueError(f"Time format not recognized: {time_str}")
+    departments = get_departments()
 
     if request.method == 'POST':
         new_title = request.form['meeting_title']
@@ -491,22 +2839,8 @@ def edit_meeting(meeting_id):
         if str(session["user_id"]) not in new_participants:
             participant_ids.append(session["user_id"])
 
-        format_strings = ','.join(['%s'] * len(participant_ids))
-        conflict_query = f"""
-            SELECT u.user_id, u.user_name, d_meeting.department_name AS meeting_department_name,
-                   m.meeting_title, m.meeting_date, m.start_time, m.end_time
-            FROM meeting m
-            JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id
-            JOIN "user" u ON mp.user_id = u.user_id
-            LEFT JOIN department d_meeting ON m.department_id = d_meeting.department_id
-            WHERE m.meeting_date = %s
-            AND u.user_id IN ({format_strings})
-            AND %s < m.end_time
-            AND %s > m.start_time
-            AND m.meeting_id != %s
-        """
-        conflict_params = [new_date, *participant_ids, new_start_time, new_end_time, meeting_id]
-        conflicting_members = execute_query(conflict_query, conflict_params, fetch='all')
+        conflicting_members = find_conflicts(new_date, new_start_time, new_end_time,
+                                             participant_ids, exclude_meeting_id=meeting_id)
 
         if conflicting_members:
             conflict_messages = [
@@ -520,32 +2854,33 @@ def edit_meeting(meeting_id):
                                    meeting=meeting, participants=participants,
                                    all_users=all_users, departments=departments)
 
-        execute_query("""
-            UPDATE meeting SET meeting_title=%s, meeting_date=%s,
-            start_time=%s, end_time=%s, venue=%s, department_id=%s
-            WHERE meeting_id=%s
-        """, (new_title, new_date, new_start_time, new_end_time, new_venue, new_dept_id, meeting_id),
-            commit=True, fetch=None)
+        with transaction() as conn:
+            execute_query("""
+                UPDATE meeting SET meeting_title=%s, meeting_date=%s,
+                start_time=%s, end_time=%s, venue=%s, department_id=%s
+                WHERE meeting_id=%s AND meeting_date=%s
+            """, (new_title, new_date, new_start_time, new_end_time, new_venue, new_dept_id, meeting_id,
+                  meeting['meeting_date']), commit=True, fetch=None)
 
-        execute_query("DELETE FROM meeting_participant WHERE meeting_id=%s",
-                      (meeting_id,), commit=True, fetch=None)
-        for uid in new_participants:
-            execute_query("INSERT INTO meeting_participant (user_id, meeting_id) VALUES (%s, %s)",
-                          (uid, meeting_id), commit=True, fetch=None)
+            # A new date moves the meeting (and, by the foreign key, its participants) to another partition.
+            execute_query("DELETE FROM meeting_participant WHERE meeting_id=%s AND meeting_date=%s",
+                          (meeting_id, new_date), commit=True, fetch=None)
+            insert_participants(conn, meeting_id, new_participants, new_date)
+            meeting_written(meeting_id, old_date=meeting['meeting_date'])
 
         meeting_details = execute_query("""
             SELECT m.meeting_title, m.meeting_date, m.start_time, m.end_time, m.venue, d.department_name
             FROM meeting m
             JOIN department d ON m.department_id = d.department_id
-            WHERE m.meeting_id = %s
-        """, (meeting_id,), fetch='one')
+            WHERE m.meeting_id = %s AND m.meeting_date = %s
+        """, (meeting_id, new_date), fetch='one')
 
         emails_rows = execute_query("""
             SELECT DISTINCT u.email
             FROM meeting_participant mp
             JOIN "user" u ON mp.user_id = u.user_id
-            WHERE mp.meeting_id = %s AND u.email IS NOT NULL
-        """, (meeting_id,), fetch='all')
+            WHERE mp.meeting_id = %s AND mp.meeting_date = %s AND u.email IS NOT NULL
+        """, (meeting_id, new_date), fetch='all')
         emails = [row['email'] for row in emails_rows]
 
         if emails and meeting_details:
@@ -570,7 +2905,7 @@ def edit_meeting(meeting_id):
 @login_required
 def delete_meeting(meeting_id):
     meeting = execute_query("""
-        SELECT meeting_title FROM meeting
+        SELECT meeting_title, meeting_date FROM meeting
         WHERE meeting_id = %s AND user_id = %s
     """, (meeting_id, session["user_id"]), fetch='one')
 
@@ -578,26 +2913,29 @@ def delete_meeting(meeting_id):
         flash("❌ You can only delete your own meetings!")
         return redirect(url_for("my_created_meetings"))
 
-    emails_rows = execute_query("""
-        SELECT DISTINCT u.email
-        FROM meeting_participant mp
-        JOIN "user" u ON mp.user_id = u.user_id
-        WHERE mp.meeting_id = %s AND u.email IS NOT NULL
-    """, (meeting_id,), fetch='all')
-    emails = [row['email'] for row in emails_rows]
-
-    if emails:
-        title = meeting['meeting_title']
-        send_meeting_email(emails, 'deleted/cancelled', {
-            'title': title[:50] + '...' if len(title) > 50 else title,
-            'date': 'N/A (cancelled)', 'start_time': 'N/A',
-            'end_time': 'N/A', 'venue': 'N/A', 'dept_name': 'N/A'
-        })
+    # The cancellation is queued in the same transaction as the DELETEs, so it only goes out if they commit.
+    with transaction():
+        emails_rows = execute_query("""
+            SELECT DISTINCT u.email
+            FROM meeting_participant mp
+            JOIN "user" u ON mp.user_id = u.user_id
+            WHERE mp.meeting_id = %s AND mp.meeting_date = %s AND u.email IS NOT NULL
+        """, (meeting_id, meeting['meeting_date']), fetch='all')
+        emails = [row['email'] for row in emails_rows]
 
-    execute_query("DELETE FROM meeting_participant WHERE meeting_id = %s",
-                  (meeting_id,), commit=True, fetch=None)
-    execute_query("DELETE FROM meeting WHERE meeting_id = %s",
-                  (meeting_id,), commit=True, fetch=None)
+        execute_query("DELETE FROM meeting_participant WHERE meeting_id = %s AND meeting_date = %s",
+                      (meeting_id, meeting['meeting_date']), commit=True, fetch=None)
+        execute_query("DELETE FROM meeting WHERE meeting_id = %s AND meeting_date = %s",
+                      (meeting_id, meeting['meeting_date']), commit=True, fetch=None)
+        meeting_written(meeting_id, old_date=meeting['meeting_date'])
+
+        if emails:
+            title = meeting['meeting_title']
+            send_meeting_email(emails, 'deleted/cancelled', {
+                'title': title[:50] + '...' if len(title) > 50 else title,
+                'date': 'N/A (cancelled)', 'start_time': 'N/A',
+                'end_time': 'N/A', 'venue': 'N/A', 'dept_name': 'N/A'
+            })
 
     flash(f'✅ "{meeting["meeting_title"][:30]}" deleted successfully!')
     return redirect(url_for("my_created_meetings"))
@@ -605,15 +2943,17 @@ def delete_meeting(meeting_id):
 
 @app.route("/admin/edit-department/<int:dept_id>", methods=["GET", "POST"])
 def edit_department(dept_id):
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     if request.method == "POST":
         department_name = request.form["department_name"]
-        execute_query(
-            "UPDATE department SET department_name=%s WHERE department_id=%s",
-            (department_name, dept_id), commit=True, fetch=None
-        )
+        with transaction():
+            execute_query(
+                "UPDATE department SET department_name=%s WHERE department_id=%s",
+                (department_name, dept_id), commit=True, fetch=None
+            )
+            invalidate_reference('department')
         return redirect(url_for("view_departments"))
 
     department = execute_query(
@@ -624,7 +2964,7 @@ def edit_department(dept_id):
 
 @app.route("/admin/add-user", methods=["GET", "POST"])
 def add_user():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     if request.method == "POST":
@@ -635,12 +2975,11 @@ def add_user():
         role_id = request.form["role_id"]
         department_id = request.form["department_id"]
 
-        role = execute_query("SELECT role_id FROM role WHERE role_id = %s", (role_id,), fetch='one')
-        if not role:
+        if not any(str(r['role_id']) == role_id for r in get_all_roles()):
             flash("Invalid role selected!")
             return redirect(url_for("add_user"))
 
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
 
         execute_query("""
             INSERT INTO "user"
@@ -652,45 +2991,28 @@ def add_user():
         flash(f'✅ User "{user_name}" added successfully!')
         return redirect(url_for("view_users"))
 
-    roles = execute_query("SELECT role_id, role_name FROM role ORDER BY role_name", fetch='all')
-    departments = execute_query("SELECT * FROM department ORDER BY department_name", fetch='all')
+    roles = get_all_roles()
+    departments = get_departments()
 
     return render_template("admin/add_user.html", departments=departments, roles=roles)
 
 
 @app.route("/admin/view-meetings")
 def view_all_meetings():
-    if "user_id" not in session or session["role_id"] != 100:
+    if not is_admin():
         return redirect(url_for("login"))
 
     keyword = request.args.get("q", "").strip()
 
-    query = """
-        SELECT m.meeting_id, m.meeting_title, m.meeting_date,
-               m.start_time, m.end_time, m.venue, m.user_id,
-               d.department_name, u.user_name, u.user_mobileno,
-               COUNT(mp.participant_id) as participant_count
-        FROM meeting m
-        JOIN department d ON m.department_id = d.department_id
-        JOIN "user" u ON m.user_id = u.user_id
-        LEFT JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id
-    """
-    params = []
+    where, params, series_where, series_params = listing_filters(keyword)
 
-    if keyword:
-        query += """
-        WHERE m.meeting_title ILIKE %s OR d.department_name ILIKE %s OR u.user_name ILIKE %s
-        """
-        params = ["%" + keyword + "%"] * 3
-
-    query += """
-        GROUP BY m.meeting_id, m.meeting_title, m.meeting_date, m.start_time,
-                 m.end_time, m.venue, m.user_id, d.department_name, u.user_name, u.user_mobileno
-        ORDER BY m.meeting_date DESC
-    """
+    def build():
+        meetings, next_cursor, prev_cursor = fetch_listing_page(MEETING_LIST_SELECT, where, params,
+                                                                series_where, series_params)
+        return dict(meetings=meetings, search_query=keyword, next_cursor=next_cursor, prev_cursor=prev_cursor,
+                    xlsx_export=openpyxl is not None)
 
-    meetings = execute_query(query, params if params else None, fetch='all')
-    return render_template("admin/view_meetings.html", meetings=meetings, search_query=keyword)
+    return cached_page("admin/view_meetings.html", build)
 
 
 @app.route("/admin/view-meeting-members/<int:meeting_id>")
@@ -709,20 +3031,12 @@ def view_meeting_members(meeting_id):
         flash("Meeting not found!", "error")
         return redirect(url_for("view_all_meetings"))
 
-    members = execute_query("""
-        SELECT DISTINCT mp.participant_id, mp.user_id, u.user_name,
-               u.email, u.user_mobileno, r.role_name, d.department_name
-        FROM meeting_participant mp
-        JOIN "user" u ON mp.user_id = u.user_id
-        LEFT JOIN role r ON u.role_id = r.role_id
-        LEFT JOIN department d ON u.department_id = d.department_id
-        WHERE mp.meeting_id = %s
-        ORDER BY u.user_name
-    """, (meeting_id,), fetch='all')
+    members = execute_query(MEETING_MEMBERS_QUERY, (meeting_id, meeting['meeting_date']), fetch='all')
 
     return render_template("/view_meeting_members.html",
                            meeting=meeting, members=members,
-                           participant_count=len(members))
+                           participant_count=len(members),
+                           is_admin=is_admin(), xlsx_export=openpyxl is not None)
 
 
 @app.route("/view-my-meeting-members/<int:meeting_id>")
@@ -741,16 +3055,7 @@ def view_my_meeting_members(meeting_id):
         flash("Meeting not found!", "error")
         return redirect(url_for("view_all_meetings"))
 
-    members = execute_query("""
-        SELECT DISTINCT mp.participant_id, mp.user_id, u.user_name,
-               u.email, u.user_mobileno, r.role_name, d.department_name
-        FROM meeting_participant mp
-        JOIN "user" u ON mp.user_id = u.user_id
-        LEFT JOIN role r ON u.role_id = r.role_id
-        LEFT JOIN department d ON u.department_id = d.department_id
-        WHERE mp.meeting_id = %s
-        ORDER BY u.user_name
-    """, (meeting_id,), fetch='all')
+    members = execute_query(MEETING_MEMBERS_QUERY, (meeting_id, meeting['meeting_date']), fetch='all')
 
     return render_template("/view_my_meeting_members.html",
                            meeting=meeting, members=members,
@@ -767,30 +3072,43 @@ def logout():
 def my_schedule():
     keyword = request.args.get("q", "").strip()
 
-    query = """
-        SELECT m.meeting_id, m.meeting_title, m.meeting_date,
-               m.start_time, m.end_time, m.venue, m.user_id,
-               d.department_name, u.user_name, u.user_mobileno,
-               COUNT(mp.participant_id) as participant_count
-        FROM meeting m
-        JOIN department d ON m.department_id = d.department_id
-        JOIN "user" u ON m.user_id = u.user_id
-        LEFT JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id
-    """
-    params = []
+    where, params, series_where, series_params = listing_filters(keyword)
 
-    if keyword:
-        query += " WHERE m.meeting_title ILIKE %s OR d.department_name ILIKE %s OR u.user_name ILIKE %s"
-        params = ["%" + keyword + "%"] * 3
+    def build():
+        meetings, next_cursor, prev_cursor = fetch_listing_page(MEETING_LIST_SELECT, where, params,
+                                                                series_where, series_params)
+        return dict(meetings=meetings, search_query=keyword, next_cursor=next_cursor, prev_cursor=prev_cursor)
 
-    query += """
-        GROUP BY m.meeting_id, m.meeting_title, m.meeting_date, m.start_time,
-                 m.end_time, m.venue, m.user_id, d.department_name, u.user_name, u.user_mobileno
-        ORDER BY m.meeting_date DESC
-    """
+    return cached_page("/my_schedule.html", build)
+
+
+CALENDAR_MAX_DAYS = int(os.environ.get("CALENDAR_MAX_DAYS", 400))
+
+DEPARTMENT_VERSION_QUERY = "SELECT version, changed_at FROM department_calendar_version WHERE department_id = %s"
+
+DEPARTMENT_EVENTS_QUERY = """
+    SELECT meeting_title, TO_CHAR(meeting_date, 'YYYY-MM-DD') AS date_iso, venue
+    FROM meeting
+    WHERE department_id = %s AND meeting_date >= %s AND meeting_date < %s
+    ORDER BY meeting_date, start_time
+"""
+
+
+USER_DEPARTMENT_QUERY = 'SELECT department_id FROM "user" WHERE user_id = %s'
+
+
+def calendar_event(m):
+    """FullCalendar event for a DEPARTMENT_EVENTS_QUERY row or series occurrence."""
+    return {
+        "title": m["meeting_title"][:30] if m["meeting_title"] else "Untitled",
+        "date": m["date_iso"],
+        "venue": m["venue"] or "TBD",
+    }
 
-    meetings = execute_query(query, params if params else None, fetch='all')
-    return render_template("/my_schedule.html", meetings=meetings, search_query=keyword)
+
+def session_department_id():
+    dept = execute_query(USER_DEPARTMENT_QUERY, (session["user_id"],), fetch='one')
+    return dept["department_id"] if dept else None
 
 
 @app.route('/department_calendar')
@@ -798,37 +3116,57 @@ def department_calendar():
     if "user_id" not in session:
         return redirect('/login')
 
-    user_id = session["user_id"]
+    if not session_department_id():
+        return "Department not assigned", 404
 
-    dept = execute_query(
-        'SELECT department_id FROM "user" WHERE user_id = %s', (user_id,), fetch='one'
-    )
+    # Events are fetched month by month from department_calendar_events.
+    return render_template("department_calendar.html")
 
-    if not dept or not dept["department_id"]:
-        return "Department not assigned", 404
 
-    department_id = dept["department_id"]
+@app.route('/department_calendar/events')
+def department_calendar_events():
+    """FullCalendar event feed: meetings of the user's department with start <= date < end."""
+    if "user_id" not in session:
+        return {"error": "Unauthorized"}, 401
 
-    # PostgreSQL equivalent of CURDATE() is CURRENT_DATE
-    # DATE_FORMAT() -> TO_CHAR() in PostgreSQL
-    meetings = execute_query("""
-        SELECT m.meeting_id, m.meeting_title as title, m.meeting_date as date, m.venue,
-               CASE WHEN m.meeting_date < CURRENT_DATE THEN 'past' ELSE 'upcoming' END as status,
-               TO_CHAR(m.meeting_date, 'YYYY-MM-DD') as date_iso
-        FROM meeting m
-        WHERE m.department_id = %s
-    """, (department_id,), fetch='all')
-
-    events = []
-    for m in meetings:
-        events.append({
-            "title": m["title"][:30] if m["title"] else "Untitled",
-            "date": m["date_iso"],
-            "venue": m["venue"] or "TBD",
-            "status": m["status"]
-        })
+    department_id = session_department_id()
+    if not department_id:
+        return {"error": "Department not assigned"}, 404
+
+    try:
+        start = date.fromisoformat(request.args["start"][:10])
+        end = date.fromisoformat(request.args["end"][:10])
+    except (KeyError, ValueError):
+        return {"error": "start and end must be YYYY-MM-DD dates"}, 400
+    if not start < end or (end - start).days > CALENDAR_MAX_DAYS:
+        return {"error": f"Date range must be 1 to {CALENDAR_MAX_DAYS} days"}, 400
+
+    # Bumped by triggers on meeting (migrations/0004) whenever the department's meetings change.
+    stamp = execute_query(DEPARTMENT_VERSION_QUERY, (department_id,), fetch='one')
+    version, changed_at = (stamp["version"], stamp["changed_at"]) if stamp else (0, None)
+    etag = f"dept{department_id}-v{version}-{start}-{end}"
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=changed_at):
+        response = app.response_class(status=304)
+    else:
+        meetings = execute_query(DEPARTMENT_EVENTS_QUERY, (department_id, start, end), fetch='all')
+        # Series occurrences are expanded for this window only.
+        meetings += [dict(occ, date_iso=occ["meeting_date"].isoformat())
+                     for series in department_series(department_id, start, end - timedelta(days=1))
+                     for occ in series.occurrences(start, end - timedelta(days=1))]
+        response = jsonify([calendar_event(m) for m in meetings])
 
-    return render_template("department_calendar.html", events=events)
+    response.set_etag(etag)
+    if changed_at:
+        response.last_modified = changed_at
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+USER_BY_MOBILE = 'SELECT user_id FROM "user" WHERE user_mobileno = %s'
+USER_BY_EMAIL = 'SELECT user_id FROM "user" WHERE email = %s'
+REQUEST_BY_EMAIL = "SELECT id FROM registration_requests WHERE email = %s"
 
 
 @app.route('/register', methods=['GET', 'POST'])
@@ -846,9 +3184,7 @@ def register():
                                    error="Mobile number must be exactly 10 digits!",
                                    departments=get_departments(), roles=get_roles())
 
-        existing_mobile = execute_query(
-            'SELECT * FROM "user" WHERE user_mobileno = %s', (mobile_no,), fetch='one'
-        )
+        existing_mobile = execute_query(USER_BY_MOBILE, (mobile_no,), fetch='one')
         if existing_mobile:
             return render_template('register.html',
                                    error="Mobile number already registered!",
@@ -859,23 +3195,19 @@ def register():
                                    error="Password must be at least 6 characters!",
                                    departments=get_departments(), roles=get_roles())
 
-        existing_email = execute_query(
-            'SELECT * FROM "user" WHERE email = %s', (email,), fetch='one'
-        )
+        existing_email = execute_query(USER_BY_EMAIL, (email,), fetch='one')
         if existing_email:
             return render_template('register.html',
                                    error="Email already registered!",
                                    departments=get_departments(), roles=get_roles())
 
-        existing_request = execute_query(
-            "SELECT * FROM registration_requests WHERE email = %s", (email,), fetch='one'
-        )
+        existing_request = execute_query(REQUEST_BY_EMAIL, (email,), fetch='one')
         if existing_request:
             return render_template('register.html',
                                    error="Registration request already pending!",
                                    departments=get_departments(), roles=get_roles())
 
-        password_hash = generate_password_hash(password)
+        password_hash = hash_password(password)
         execute_query("""
             INSERT INTO registration_requests
             (name, email, user_mobileno, password_hash, role_id, department_id)
@@ -888,20 +3220,23 @@ def register():
     return render_template('register.html', departments=get_departments(), roles=get_roles())
 
 
+PENDING_REQUESTS_QUERY = """
+    SELECT r.*, d.department_name, r.role_id,
+           (SELECT role_name FROM role WHERE role_id = r.role_id) as role_name
+    FROM registration_requests r
+    LEFT JOIN department d ON r.department_id = d.department_id
+    WHERE r.status = 'pending'
+    ORDER BY r.created_at DESC
+"""
+
+
 @app.route('/admin/registration_requests')
 @login_required
 def registration_requests():
-    if session.get("role_id") != 100:
+    if not is_admin():
         return redirect(url_for('admin_dashboard'))
 
-    requests_list = execute_query("""
-        SELECT r.*, d.department_name, r.role_id,
-               (SELECT role_name FROM role WHERE role_id = r.role_id) as role_name
-        FROM registration_requests r
-        LEFT JOIN department d ON r.department_id = d.department_id
-        WHERE r.status = 'pending'
-        ORDER BY r.created_at DESC
-    """, fetch='all')
+    requests_list = execute_query(PENDING_REQUESTS_QUERY, fetch='all')
 
     return render_template('admin/registration_requests.html', requests=requests_list)
 
@@ -909,7 +3244,7 @@ def registration_requests():
 @app.route('/admin/approve_request/<int:request_id>')
 @login_required
 def approve_request(request_id):
-    if get_role(session['user_id']) != 100:
+    if not is_admin():
         return redirect(url_for('admin_dashboard'))
 
     reg_request = execute_query(
@@ -920,17 +3255,20 @@ def approve_request(request_id):
         flash('Request not found or already processed!')
         return redirect(url_for('registration_requests'))
 
-    execute_query("""
-        INSERT INTO "user" (user_name, email, user_mobileno, password_hash, department_id, role_id)
-        VALUES (%s, %s, %s, %s, %s, 101)
-    """, (reg_request['name'], reg_request['email'], reg_request['user_mobileno'],
-          reg_request['password_hash'], reg_request['department_id']),
-        commit=True, fetch=None)
+    with transaction():
+        new_user = execute_query("""
+            INSERT INTO "user" (user_name, email, user_mobileno, password_hash, department_id, role_id)
+            VALUES (%s, %s, %s, %s, %s, 101)
+            RETURNING user_id
+        """, (reg_request['name'], reg_request['email'], reg_request['user_mobileno'],
+              reg_request['password_hash'], reg_request['department_id']),
+            commit=True, fetch='one')
+        invalidate_role(new_user['user_id'])
 
-    execute_query(
-        "UPDATE registration_requests SET status = 'approved' WHERE id = %s",
-        (request_id,), commit=True, fetch=None
-    )
+        execute_query(
+            "UPDATE registration_requests SET status = 'approved' WHERE id = %s",
+            (request_id,), commit=True, fetch=None
+        )
 
     flash(f'✅ User "{reg_request["name"]}" ({reg_request["user_mobileno"]}) approved!')
     return redirect(url_for('registration_requests'))
@@ -939,7 +3277,7 @@ def approve_request(request_id):
 @app.route('/admin/reject_request/<int:request_id>')
 @login_required
 def reject_request(request_id):
-    if get_role(session['user_id']) != 100:
+    if not is_admin():
         return redirect(url_for('admin_dashboard'))
 
     execute_query(
@@ -956,7 +3294,7 @@ def profile():
         return redirect('/login')
 
     user = execute_query("""
-        SELECT u.user_name, u.email, u.user_mobileno, d.department_name, r.role_name
+        SELECT u.user_name, u.email, u.user_mobileno, u.feed_version, d.department_name, r.role_name
         FROM "user" u
         LEFT JOIN department d ON u.department_id = d.department_id
         LEFT JOIN role r ON u.role_id = r.role_id
@@ -974,7 +3312,8 @@ def profile():
         "department_name": user["department_name"] or "N/A",
         "role_name": user["role_name"] or "N/A"
     }
-    return render_template("user_profile.html", user=user_data)
+    feed_urls = {feed: calendar_feed_url(session["user_id"], feed, user["feed_version"]) for feed in FEEDS}
+    return render_template("user_profile.html", user=user_data, feed_urls=feed_urls)
 
 
 @app.route('/admin_profile')
@@ -1024,8 +3363,8 @@ def change_password():
             message = "User not found!"
             return render_template("change_password.html", message=message)
 
-        if check_password_hash(stored['password_hash'], old_password):
-            new_hashed = generate_password_hash(new_password)
+        if verify_password(stored['password_hash'], old_password):
+            new_hashed = hash_password(new_password)
             execute_query(
                 'UPDATE "user" SET password_hash=%s WHERE user_id=%s',
                 (new_hashed, session["user_id"]), commit=True, fetch=None
@@ -1067,8 +3406,8 @@ def edit_admin_profile():
         flash('✅ Profile updated successfully!')
         return redirect(url_for('profile'))
 
-    departments = execute_query("SELECT * FROM department ORDER BY department_name", fetch='all')
-    roles = execute_query("SELECT * FROM role ORDER BY role_name", fetch='all')
+    departments = get_departments()
+    roles = get_all_roles()
 
     return render_template('edit_admin_profile.html',
                            user=current_user, departments=departments, roles=roles)
@@ -1104,8 +3443,8 @@ def edit_profile():
         flash('✅ Profile updated successfully!')
         return redirect(url_for('profile'))
 
-    departments = execute_query("SELECT * FROM department ORDER BY department_name", fetch='all')
-    roles = execute_query("SELECT * FROM role ORDER BY role_name", fetch='all')
+    departments = get_departments()
+    roles = get_all_roles()
 
     return render_template('edit_profile.html',
                            user=current_user, departments=departments, roles=roles)
@@ -1116,7 +3455,7 @@ def create_schedule():
     error = ""
     success = ""
 
-    departments = execute_query("SELECT department_id, department_name FROM department", fetch='all')
+    departments = get_departments()
     all_users = execute_query("""
         SELECT u.user_id, u.user_name, u.email, u.user_mobileno, d.department_name
         FROM "user" u
@@ -1124,14 +3463,6 @@ def create_schedule():
         WHERE u.role_id != 100
     """, fetch='all')
 
-    def parse_time(time_str):
-        for fmt in ("%I:%M %p", "%H:%M"):
-            try:
-                return datetime.strptime(time_str, fmt).strftime("%H:%M:%S")
-            except ValueError:
-                continue
-        raise ValueError(f"Time format not recognized: {time_str}")
-
     if request.method == "POST":
         title = request.form["meeting_title"]
         date_str = request.form["meeting_date"]
@@ -1145,6 +3476,7 @@ def create_schedule():
             meeting_date = datetime.strptime(date_str, "%Y-%m-%d").date()
             start_time_24 = parse_time(start_time_str)
             end_time_24 = parse_time(end_time_str)
+            rule = series_rule(request.form, meeting_date)
         except ValueError as e:
             error = str(e)
             return render_template("create_schedule.html",
@@ -1160,22 +3492,11 @@ def create_schedule():
             participants.append(creator_id_str)
 
         participant_ids = [int(pid) for pid in participants]
-        format_strings = ','.join(['%s'] * len(participant_ids))
-
-        conflict_query = f"""
-            SELECT u.user_id, u.user_name, d_meeting.department_name AS meeting_department_name,
-                   m.meeting_title, m.meeting_date, m.start_time, m.end_time
-            FROM meeting m
-            JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id
-            JOIN "user" u ON mp.user_id = u.user_id
-            LEFT JOIN department d_meeting ON m.department_id = d_meeting.department_id
-            WHERE m.meeting_date = %s
-            AND u.user_id IN ({format_strings})
-            AND %s < m.end_time
-            AND %s > m.start_time
-        """
-        conflict_params = [meeting_date, *participant_ids, start_time_24, end_time_24]
-        conflicting_members = execute_query(conflict_query, conflict_params, fetch='all')
+        if rule:
+            conflicting_members = find_series_conflicts(list(rule.between(rule.dtstart, rule.last)),
+                                                        start_time_24, end_time_24, participant_ids)
+        else:
+            conflicting_members = find_conflicts(meeting_date, start_time_24, end_time_24, participant_ids)
 
         if conflicting_members:
             msgs = [
@@ -1188,40 +3509,40 @@ def create_schedule():
                                    members=all_users, departments=departments,
                                    error="Conflicts detected:\n" + "\n".join(msgs))
 
+        if rule:
+            create_series(title, rule, start_time_24, end_time_24, session["user_id"],
+                          department_id, venue, participant_ids)
+            return render_template("create_schedule.html",
+                                   members=all_users, departments=departments,
+                                   success=f"✅ Recurring meeting scheduled: {rule.describe()}.")
+
         # Insert meeting - need RETURNING id for PostgreSQL
-        conn = get_db()
-        try:
-            cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            cur.execute("""
+        with transaction() as conn:
+            meeting_id = execute_query("""
                 INSERT INTO meeting
                 (meeting_title, meeting_date, start_time, end_time, user_id, department_id, venue)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
                 RETURNING meeting_id
             """, (title, meeting_date, start_time_24, end_time_24,
-                  session["user_id"], department_id, venue))
-            meeting_id = cur.fetchone()['meeting_id']
+                  session["user_id"], department_id, venue), fetch='one', commit=True)['meeting_id']
 
-            for uid in participant_ids:
-                cur.execute("INSERT INTO meeting_participant (user_id, meeting_id) VALUES (%s, %s)",
-                            (uid, meeting_id))
-            conn.commit()
-        finally:
-            conn.close()
+            insert_participants(conn, meeting_id, participant_ids, meeting_date)
+            meeting_written(meeting_id)
 
         # Send email
         meeting_details = execute_query("""
             SELECT m.meeting_title, m.meeting_date, m.start_time, m.end_time, m.venue, d.department_name
             FROM meeting m
             JOIN department d ON m.department_id = d.department_id
-            WHERE m.meeting_id = %s
-        """, (meeting_id,), fetch='one')
+            WHERE m.meeting_id = %s AND m.meeting_date = %s
+        """, (meeting_id, meeting_date), fetch='one')
 
         emails_rows = execute_query("""
             SELECT DISTINCT u.email
             FROM meeting_participant mp
             JOIN "user" u ON mp.user_id = u.user_id
-            WHERE mp.meeting_id = %s AND u.email IS NOT NULL
-        """, (meeting_id,), fetch='all')
+            WHERE mp.meeting_id = %s AND mp.meeting_date = %s AND u.email IS NOT NULL
+        """, (meeting_id, meeting_date), fetch='all')
         emails = [row['email'] for row in emails_rows]
 
         if emails and meeting_details:
@@ -1241,21 +3562,965 @@ def create_schedule():
                            success=success, error=error)
 
 
-# ---------------- RUN APP ----------------
-if __name__ == "__main__":
-    from apscheduler.schedulers.background import BackgroundScheduler
+# ---------------- BULK MEETING IMPORT ----------------
+# Admins upload a CSV of meetings. Rows are validated while the file streams
+# in, then every participant interval (file rows and the existing meetings
+# of the same users/dates, fetched in one query) is sorted once and swept per
+# (user, date) to find overlaps. Accepted rows go in with COPY in a single
+# transaction; rejected rows are reported back with their line number.
 
-    def delete_past_meetings():
+IMPORT_MAX_ROWS = int(os.environ.get("IMPORT_MAX_ROWS", 50000))
+IMPORT_COLUMNS = ("meeting_title", "meeting_date", "start_time", "end_time",
+                  "venue", "department_id", "participants")
+
+
+def parse_import_csv(stream, default_organizer):
+    """
+    Validate an import CSV row by row.
+    Returns (rows, rejected): rows are dicts ready to insert, rejected is
+    [(line, reason)]. participants are user ids separated by ';' or spaces;
+    an optional organizer_id column defaults to the importing admin.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    missing = [c for c in IMPORT_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    rows, rejected = [], []
+    for record in reader:
+        line = reader.line_num
+        if len(rows) + len(rejected) >= IMPORT_MAX_ROWS:
+            raise ValueError(f"File has more than {IMPORT_MAX_ROWS} rows.")
         try:
-            execute_query(
-                "DELETE FROM meeting WHERE meeting_date < CURRENT_DATE",
-                commit=True, fetch=None
-            )
-            print(f"[{datetime.now()}] Old meetings deleted.")
+            title = (record["meeting_title"] or "").strip()
+            if not title:
+                raise ValueError("meeting_title is empty")
+            meeting_date = datetime.strptime((record["meeting_date"] or "").strip(), "%Y-%m-%d").date()
+            start_time = as_time(parse_time((record["start_time"] or "").strip()))
+            end_time = as_time(parse_time((record["end_time"] or "").strip()))
+            if end_time <= start_time:
+                raise ValueError("end_time must be after start_time")
+            organizer = int(record.get("organizer_id") or default_organizer)
+            participants = [int(p) for p in (record["participants"] or "").replace(";", " ").split()]
+            if not participants:
+                raise ValueError("no participants")
+            rows.append({
+                "line": line,
+                "meeting_title": title,
+                "meeting_date": meeting_date,
+                "start_time": start_time,
+                "end_time": end_time,
+                "venue": (record["venue"] or "").strip(),
+                "department_id": int(record["department_id"]),
+                "user_id": organizer,
+                "participants": list(dict.fromkeys(participants + [organizer])),
+            })
+        except (ValueError, TypeError) as e:
+            rejected.append((line, str(e)))
+    return rows, rejected
+
+
+def sweep_import_conflicts(rows):
+    """
+    Find rows that overlap an existing meeting, a series occurrence or an
+    earlier row of the file for any shared participant. One query for the
+    meetings and one for the series, plus one sort over all intervals.
+    Returns {line: reason}. Conservative: a row that is itself rejected later
+    in the sweep may already have caused another row's rejection.
+    """
+    if not rows:
+        return {}
+    user_ids = list({uid for row in rows for uid in row["participants"]})
+    dates = list({row["meeting_date"] for row in rows})
+    existing = execute_query("""
+        SELECT mp.user_id, m.meeting_date, m.start_time, m.end_time, m.meeting_title
+        FROM meeting m
+        JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id AND m.meeting_date = mp.meeting_date
+        WHERE mp.user_id = ANY(%s) AND m.meeting_date = ANY(%s)
+    """, (user_ids, dates), fetch='all')
+
+    # (user, date, start, end, line or 0 for an existing meeting or occurrence, title)
+    intervals = [(e["user_id"], e["meeting_date"], e["start_time"], e["end_time"], 0, e["meeting_title"])
+                 for e in existing]
+    for series in participant_series(user_ids, min(dates), max(dates)):
+        for day in dates:
+            for occ in series.on(day):
+                intervals.extend((uid, day, as_time(occ["start_time"]), as_time(occ["end_time"]), 0,
+                                  occ["meeting_title"]) for uid in series.members)
+    for row in rows:
+        for uid in row["participants"]:
+            intervals.append((uid, row["meeting_date"], row["start_time"], row["end_time"],
+                              row["line"], row["meeting_title"]))
+    intervals.sort(key=lambda iv: (iv[0], iv[1], iv[2], iv[4]))
+
+    rejected = {}
+    group, reach = None, None      # reach: interval with the latest end so far in this (user, date)
+    for interval in intervals:
+        uid, meeting_date, start, end, line, title = interval
+        if (uid, meeting_date) != group:
+            group, reach = (uid, meeting_date), None
+        if line in rejected:
+            continue
+        if reach is not None and start < reach[3]:
+            other_line, other_title = reach[4], reach[5]
+            if line and (other_line == 0 or other_line < line):
+                where = "an existing meeting" if other_line == 0 else f"line {other_line}"
+                rejected[line] = f"user {uid} overlaps {where} '{other_title}' on {meeting_date}"
+                continue
+            if other_line and other_line not in rejected:
+                where = "an existing meeting" if line == 0 else f"line {line}"
+                rejected[other_line] = f"user {uid} overlaps {where} '{title}' on {meeting_date}"
+        if reach is None or end > reach[3] or (reach[4] and reach[4] in rejected):
+            reach = interval
+    return rejected
+
+
+def copy_meetings(conn, rows):
+    """Insert meetings and their participants with COPY (inside the caller's transaction)."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence('meeting', 'meeting_id')) FROM generate_series(1, %s)",
+        (len(rows),)
+    )
+    meeting_ids = [r[0] for r in cursor.fetchall()]
+
+    meetings_buf, participants_buf = io.StringIO(), io.StringIO()
+    meetings_csv = csv.writer(meetings_buf, quoting=csv.QUOTE_NONNUMERIC)
+    participants_csv = csv.writer(participants_buf)
+    for meeting_id, row in zip(meeting_ids, rows):
+        meetings_csv.writerow([meeting_id, row["meeting_title"], row["meeting_date"].isoformat(),
+                               row["start_time"].isoformat(), row["end_time"].isoformat(),
+                               row["user_id"], row["department_id"], row["venue"]])
+        for uid in row["participants"]:
+            participants_csv.writerow([meeting_id, uid, row["meeting_date"].isoformat()])
+
+    meetings_buf.seek(0)
+    participants_buf.seek(0)
+    cursor.copy_expert("""
+        COPY meeting (meeting_id, meeting_title, meeting_date, start_time, end_time,
+                      user_id, department_id, venue)
+        FROM STDIN WITH (FORMAT csv)
+    """, meetings_buf)
+    cursor.copy_expert("COPY meeting_participant (meeting_id, user_id, meeting_date) FROM STDIN WITH (FORMAT csv)",
+                       participants_buf)
+    cursor.close()
+
+
+@app.route("/admin/import-meetings", methods=["GET", "POST"])
+def import_meetings():
+    if not is_admin():
+        return redirect(url_for("login"))
+
+    if request.method == "GET":
+        return render_template("admin/import_meetings.html")
+
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return render_template("admin/import_meetings.html", error="Please choose a CSV file.")
+
+    try:
+        rows, rejected = parse_import_csv(upload.stream, session["user_id"])
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return render_template("admin/import_meetings.html", error=f"Could not read file: {e}")
+    rejected = dict(rejected)
+
+    # Unknown departments / users, one query each
+    known_departments = {r["department_id"] for r in execute_query(
+        "SELECT department_id FROM department WHERE department_id = ANY(%s)",
+        (list({row["department_id"] for row in rows}),), fetch='all')}
+    known_users = {r["user_id"] for r in execute_query(
+        'SELECT user_id FROM "user" WHERE user_id = ANY(%s)',
+        (list({uid for row in rows for uid in row["participants"]}),), fetch='all')}
+    for row in rows:
+        if row["department_id"] not in known_departments:
+            rejected[row["line"]] = f"unknown department_id {row['department_id']}"
+        elif any(uid not in known_users for uid in row["participants"]):
+            unknown = [uid for uid in row["participants"] if uid not in known_users]
+            rejected[row["line"]] = f"unknown user id(s) {', '.join(map(str, unknown))}"
+    rows = [row for row in rows if row["line"] not in rejected]
+
+    rejected.update(sweep_import_conflicts(rows))
+    accepted = [row for row in rows if row["line"] not in rejected]
+
+    if accepted:
+        dates = sorted({row["meeting_date"] for row in accepted})
+        with transaction() as conn:
+            copy_meetings(conn, accepted)
+            notify_change('meeting_changed', ','.join(d.isoformat() for d in dates))
+            after_commit(lambda: invalidate_conflict_days(dates))
+            invalidate_meeting_pages()
+
+    return render_template("admin/import_meetings.html",
+                           imported=len(accepted), rejected=sorted(rejected.items()))
+
+
+# ---------------- FREE SLOT FINDER ----------------
+# Each participant's busy time on a day is a 96-bit int (one bit per
+# 15-minute slot). OR-ing the participants' bitmaps gives the day's combined
+# busy map, and a free slot is a run of zero bits inside working hours.
+
+SLOT_MINUTES = 15
+FREE_SLOT_MAX_DAYS = int(os.environ.get("FREE_SLOT_MAX_DAYS", 62))
+FREE_SLOT_MAX_PARTICIPANTS = int(os.environ.get("FREE_SLOT_MAX_PARTICIPANTS", 500))
+
+
+def _slot_index(t, round_up=False):
+    minutes = t.hour * 60 + t.minute + (1 if t.second and round_up else 0)
+    return -(-minutes // SLOT_MINUTES) if round_up else minutes // SLOT_MINUTES
+
+
+BUSY_QUERY = prepared_statement('busy_intervals', """
+    SELECT mp.user_id, m.meeting_date, m.start_time, m.end_time
+    FROM meeting m
+    JOIN meeting_participant mp ON m.meeting_id = mp.meeting_id AND m.meeting_date = mp.meeting_date
+    WHERE mp.user_id = ANY(%s) AND m.meeting_date BETWEEN %s AND %s
+""")
+
+
+def busy_bitmaps(participant_ids, start_date, end_date):
+    """{(user_id, date): bitmap} of the slots each participant is booked in."""
+    rows = execute_prepared(BUSY_QUERY, (list(participant_ids), start_date, end_date))
+    rows += [dict(occ, user_id=user_id)
+             for series in participant_series(participant_ids, start_date, end_date)
+             for occ in series.occurrences(start_date, end_date)
+             for user_id in series.members]
+
+    bitmaps = {}
+    for row in rows:
+        first = _slot_index(row['start_time'])
+        last = _slot_index(row['end_time'], round_up=True)
+        if last > first:
+            key = (row['user_id'], row['meeting_date'])
+            bitmaps[key] = bitmaps.get(key, 0) | (((1 << (last - first)) - 1) << first)
+    return bitmaps
+
+
+def find_free_slots(participant_ids, start_date, end_date, day_start, day_end, duration,
+                    limit=5, weekends=False):
+    """Earliest `limit` non-overlapping slots of `duration` minutes where every participant is free."""
+    need = -(-duration // SLOT_MINUTES)
+    window_start, window_end = _slot_index(day_start, round_up=True), _slot_index(day_end)
+    if need > window_end - window_start:
+        return []       # also keeps needed_mask below the day's 96 bits
+
+    bitmaps = busy_bitmaps(participant_ids, start_date, end_date)
+    combined = {}
+    for (_, meeting_date), bitmap in bitmaps.items():
+        combined[meeting_date] = combined.get(meeting_date, 0) | bitmap
+
+    needed_mask = (1 << need) - 1
+    now = datetime.now()
+    slots = []
+    day = start_date
+    while day <= end_date and len(slots) < limit:
+        if weekends or day.weekday() < 5:
+            busy = combined.get(day, 0)
+            first = window_start
+            if day == now.date():
+                first = max(first, _slot_index(now.time(), round_up=True))
+            slot = first
+            while slot + need <= window_end and len(slots) < limit:
+                if (busy >> slot) & needed_mask:
+                    slot += 1
+                    continue
+                start_minutes, end_minutes = slot * SLOT_MINUTES, (slot + need) * SLOT_MINUTES
+                slots.append({
+                    "date": day.isoformat(),
+                    "start_time": f"{start_minutes // 60:02d}:{start_minutes % 60:02d}",
+                    "end_time": f"{end_minutes // 60:02d}:{end_minutes % 60:02d}",
+                })
+                slot += need
+        day += timedelta(days=1)
+    return slots
+
+
+@app.route("/faculty/free-slots")
+@login_required
+def free_slots():
+    """
+    JSON: earliest common free slots.
+    ?participants=1,2,3 (or repeated) &start_date=YYYY-MM-DD &end_date=YYYY-MM-DD
+    &day_start=09:00 &day_end=17:00 &duration=60 (minutes) &limit=5 &weekends=0
+    """
+    try:
+        participant_ids = {int(pid) for value in request.args.getlist("participants")
+                           for pid in value.split(",") if pid.strip()}
+        participant_ids.add(session["user_id"])
+        start_date = datetime.strptime(request.args.get("start_date", date.today().isoformat()), "%Y-%m-%d").date()
+        end_date = (datetime.strptime(request.args["end_date"], "%Y-%m-%d").date()
+                    if request.args.get("end_date") else start_date + timedelta(days=13))
+        day_start = as_time(parse_time(request.args.get("day_start", "09:00")))
+        day_end = as_time(parse_time(request.args.get("day_end", "17:00")))
+        duration = int(request.args.get("duration", 60))
+        limit = min(int(request.args.get("limit", 5)), 50)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    if end_date < start_date or (end_date - start_date).days >= FREE_SLOT_MAX_DAYS:
+        return {"error": f"Date range must be 1 to {FREE_SLOT_MAX_DAYS} days."}, 400
+    if duration <= 0 or day_end <= day_start:
+        return {"error": "Duration and working hours must be positive."}, 400
+    working_minutes = (day_end.hour * 60 + day_end.minute) - (day_start.hour * 60 + day_start.minute)
+    if duration > working_minutes:
+        return {"error": "Duration must fit between day_start and day_end."}, 400
+    if len(participant_ids) > FREE_SLOT_MAX_PARTICIPANTS:
+        return {"error": f"At most {FREE_SLOT_MAX_PARTICIPANTS} participants."}, 400
+
+    slots = find_free_slots(participant_ids, start_date, end_date, day_start, day_end,
+                            duration, limit=limit, weekends=request.args.get("weekends") == "1")
+    return {"slots": slots, "participants": sorted(participant_ids)}
+
+
+# ---------------- ADMIN EXPORTS ----------------
+# CSV is generated row by row from a server-side cursor (fetch='stream'), so
+# memory stays flat however many rows match and the header goes out before
+# the query has even run. XLSX needs the optional openpyxl package; its
+# write-only mode keeps memory flat too, but the workbook has to be finished
+# (in a temp file) before the first byte can be sent.
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+EXPORT_CSV_CHUNK = 500      # rows per chunk written to the response
+EXPORT_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+MEETING_EXPORT_COLUMNS = [
+    ("Meeting ID", "meeting_id"), ("Title", "meeting_title"), ("Date", "meeting_date"),
+    ("Start", "start_time"), ("End", "end_time"), ("Venue", "venue"),
+    ("Department", "department_name"), ("Created By", "user_name"),
+    ("Creator Mobile", "user_mobileno"), ("Participants", "participant_count"),
+]
+MEMBER_EXPORT_COLUMNS = [
+    ("User ID", "user_id"), ("Name", "user_name"), ("Email", "email"),
+    ("Mobile", "user_mobileno"), ("Role", "role_name"), ("Department", "department_name"),
+]
+
+
+def export_cell(value):
+    """A text value a spreadsheet would run as a formula ("=HYPERLINK(...)") gets a leading quote."""
+    if isinstance(value, str) and value.startswith(EXPORT_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([title for title, _ in columns])
+    yield '\ufeff' + buffer.getvalue()      # BOM so Excel reads the file as UTF-8
+    buffer.seek(0)
+    buffer.truncate()
+    for count, row in enumerate(rows, 1):
+        writer.writerow([export_cell(row[field]) for _, field in columns])
+        if count % EXPORT_CSV_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def xlsx_file(columns, rows):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([title for title, _ in columns])
+    for row in rows:
+        sheet.append([export_cell(row[field]) for _, field in columns])
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def export_response(filename, columns, rows):
+    """Stream rows (an iterable, e.g. a fetch='stream' query) as ?format=csv (default) or xlsx."""
+    export_format = request.args.get("format", "csv")
+    if export_format == "xlsx":
+        if openpyxl is None:
+            return "XLSX export needs the openpyxl package.", 400
+        return send_file(xlsx_file(columns, rows), as_attachment=True,
+                         download_name=f"{filename}.xlsx",
+                         mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    if export_format != "csv":
+        return "Unknown export format.", 400
+    response = app.response_class(csv_stream(columns, rows), mimetype="text/csv")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+@app.route("/admin/export-meetings")
+def export_meetings():
+    """All meetings and series occurrences matching ?q= (same search as view_all_meetings), newest first."""
+    if not is_admin():
+        return redirect(url_for("login"))
+
+    where, params, series_where, series_params = listing_filters(request.args.get("q", "").strip())
+    query = MEETING_LIST_SELECT
+    if where:
+        query += " WHERE " + where[0]
+    query += " ORDER BY m.meeting_date DESC, m.meeting_id DESC"
+    meetings = execute_query(query, params, fetch='stream', row_type='record')
+
+    rows = heapq.merge(meetings, export_occurrences(series_where, series_params),
+                       key=lambda r: r['meeting_date'], reverse=True)
+
+    return export_response(f"meetings-{date.today().isoformat()}", MEETING_EXPORT_COLUMNS, rows)
+
+
+@app.route("/admin/export-meeting-members/<int:meeting_id>")
+def export_meeting_members(meeting_id):
+    if not is_admin():
+        return redirect(url_for("login"))
+
+    meeting = execute_query("SELECT meeting_date FROM meeting WHERE meeting_id = %s", (meeting_id,), fetch='one')
+    if not meeting:
+        flash("Meeting not found!", "error")
+        return redirect(url_for("view_all_meetings"))
+
+    return export_response(f"meeting-{meeting_id}-members", MEMBER_EXPORT_COLUMNS,
+                           execute_query(MEETING_MEMBERS_QUERY, (meeting_id, meeting['meeting_date']),
+                                         fetch='stream', row_type='record'))
+
+
+# ---------------- CALENDAR FEEDS ----------------
+# Read-only iCalendar subscriptions: /calendar/<token>.ics serves either the
+# meetings a user takes part in or their department's meetings. The token is
+# signed with the app secret and names the user and their feed_version
+# (migrations/0013), so the link works without a session and stops working
+# once the user is deleted or resets their feed links.
+#
+# Clients poll these every few minutes, so the cheap path matters: the ETag
+# comes from the feed's version row (bumped by triggers, migrations/0004 and
+# 0006) and an unchanged feed is a single primary-key lookup and a 304.
+# Clients that send ?sync=<X-Sync-Token of their last response> get only the
+# meetings changed since then, plus STATUS:CANCELLED entries for meetings that
+# left the feed. Tokens are backdated by ICS_SYNC_OVERLAP so a write that
+# commits late is still picked up (at worst an event is sent twice).
+# A meeting series is one VEVENT with an RRULE (plus one per changed
+# occurrence), tracked the same way (migrations/0012).
+
+ICS_SYNC_OVERLAP = int(os.environ.get("ICS_SYNC_OVERLAP", 300))        # seconds
+ICS_SYNC_MAX_AGE = int(os.environ.get("ICS_SYNC_MAX_AGE", 30))         # days of tombstones kept
+ICS_TIMEZONE = os.environ.get("ICS_TIMEZONE")                          # e.g. "Asia/Kolkata"; floating times if unset
+
+_FEED_COLUMNS = """m.meeting_id, m.meeting_title, m.meeting_date, m.start_time, m.end_time,
+               m.venue, d.department_name, m.updated_at, FALSE AS cancelled"""
+_FEED_CANCELLED = """t.meeting_id, NULL, NULL, NULL, NULL, NULL, NULL, MAX(t.removed_at), TRUE"""
+_FEED_SERIES_CANCELLED = """t.series_id, MAX(t.removed_at) AS updated_at, TRUE AS cancelled"""
+
+FEEDS = {
+    'user': {
+        'version': "SELECT version, now() AS now FROM user_calendar_version WHERE user_id = %(id)s",
+        'meetings': f"""
+            SELECT {_FEED_COLUMNS}
+            FROM meeting m
+            JOIN meeting_participant p ON p.meeting_id = m.meeting_id AND p.meeting_date = m.meeting_date
+            LEFT JOIN department d ON d.department_id = m.department_id
+            WHERE p.user_id = %(id)s""",
+        'cancelled': f"""
+            SELECT {_FEED_CANCELLED}
+            FROM meeting_tombstone t
+            WHERE t.user_id = %(id)s AND t.removed_at > %(since)s
+              AND NOT EXISTS (SELECT 1 FROM meeting_participant p
+                              WHERE p.meeting_id = t.meeting_id AND p.user_id = %(id)s)
+            GROUP BY t.meeting_id""",
+        'series': f"""
+            SELECT {_SERIES_COLUMNS}, s.updated_at
+            FROM meeting_series s
+            JOIN meeting_series_participant sp ON sp.series_id = s.series_id
+            LEFT JOIN department d ON d.department_id = s.department_id
+            WHERE sp.user_id = %(id)s""",
+        'series_cancelled': f"""
+            SELECT {_FEED_SERIES_CANCELLED}
+            FROM meeting_series_tombstone t
+            WHERE t.user_id = %(id)s AND t.removed_at > %(since)s
+              AND NOT EXISTS (SELECT 1 FROM meeting_series_participant sp
+                              WHERE sp.series_id = t.series_id AND sp.user_id = %(id)s)
+            GROUP BY t.series_id""",
+    },
+    'department': {
+        'version': "SELECT version, now() AS now FROM department_calendar_version WHERE department_id = %(id)s",
+        'meetings': f"""
+            SELECT {_FEED_COLUMNS}
+            FROM meeting m
+            LEFT JOIN department d ON d.department_id = m.department_id
+            WHERE m.department_id = %(id)s""",
+        'cancelled': f"""
+            SELECT {_FEED_CANCELLED}
+            FROM meeting_tombstone t
+            WHERE t.department_id = %(id)s AND t.removed_at > %(since)s
+              AND NOT EXISTS (SELECT 1 FROM meeting m
+                              WHERE m.meeting_id = t.meeting_id AND m.department_id = %(id)s)
+            GROUP BY t.meeting_id""",
+        'series': f"""
+            SELECT {_SERIES_COLUMNS}, s.updated_at
+            FROM meeting_series s
+            LEFT JOIN department d ON d.department_id = s.department_id
+            WHERE s.department_id = %(id)s""",
+        'series_cancelled': f"""
+            SELECT {_FEED_SERIES_CANCELLED}
+            FROM meeting_series_tombstone t
+            WHERE t.department_id = %(id)s AND t.removed_at > %(since)s
+              AND NOT EXISTS (SELECT 1 FROM meeting_series s
+                              WHERE s.series_id = t.series_id AND s.department_id = %(id)s)
+            GROUP BY t.series_id""",
+    },
+}
+
+
+def _feed_serializer():
+    return URLSafeSerializer(app.secret_key, salt='calendar-feed')
+
+
+def calendar_feed_url(user_id, feed, feed_version):
+    """Subscription URL for a user's 'user' or 'department' feed."""
+    token = _feed_serializer().dumps({'u': user_id, 'f': feed, 'v': feed_version})
+    return url_for('calendar_feed', token=token, _external=True)
+
+
+@app.route('/calendar/reset', methods=['POST'])
+@login_required
+def reset_calendar_feeds():
+    """Revoke the user's feed links: every token issued so far names the old feed_version."""
+    execute_query('UPDATE "user" SET feed_version = feed_version + 1 WHERE user_id = %s',
+                  (session["user_id"],), commit=True, fetch=None)
+    flash("Your calendar links have been reset. Subscribe again with the new links.")
+    return redirect(url_for('profile'))
+
+
+def ics_escape(text):
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def ics_fold(line):
+    """Fold a content line at 75 octets (RFC 5545 3.1) without splitting a UTF-8 sequence."""
+    data, chunks, limit = line.encode(), [], 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80:
+            cut -= 1
+        chunks.append(data[:cut])
+        data, limit = data[cut:], 74
+    chunks.append(data)
+    return b'\r\n '.join(chunks).decode() + '\r\n'
+
+
+def ics_time(day, t):
+    tzid = f';TZID={ICS_TIMEZONE}' if ICS_TIMEZONE else ''
+    return f"{tzid}:{day.strftime('%Y%m%d')}T{as_time(t).strftime('%H%M%S')}"
+
+
+def ics_event(row, host, uid=None, extra=()):
+    """A meeting row (or, with uid / extra, a series occurrence) as a VEVENT."""
+    stamp = row['updated_at'].astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    uid = uid or f"meeting-{row['meeting_id']}"
+    lines = ['BEGIN:VEVENT', f'UID:{uid}@{host}', f'DTSTAMP:{stamp}']
+    if row['cancelled']:
+        lines.append('STATUS:CANCELLED')
+    else:
+        lines += [
+            'DTSTART' + ics_time(row['meeting_date'], row['start_time']),
+            'DTEND' + ics_time(row['meeting_date'], row['end_time']),
+            *extra,
+            f'LAST-MODIFIED:{stamp}',
+            f"SUMMARY:{ics_escape(row['meeting_title'] or 'Untitled')}",
+            f"LOCATION:{ics_escape(row['venue'] or 'TBD')}",
+            f"DESCRIPTION:{ics_escape('Department: ' + (row['department_name'] or 'N/A'))}",
+            'STATUS:CONFIRMED',
+        ]
+    lines.append('END:VEVENT')
+    return ''.join(ics_fold(line) for line in lines)
+
+
+def ics_series(series, host):
+    """
+    A series as one VEVENT with an RRULE (COUNT rather than UNTIL, which would
+    have to be in UTC next to a TZID) and EXDATEs for its cancelled
+    occurrences, plus a RECURRENCE-ID VEVENT for each moved or changed one.
+    """
+    row, rule = series.row, series.rule
+    uid = f"series-{series.series_id}"
+    days = list(rule.between(rule.dtstart, rule.last))
+    rrule = f"RRULE:FREQ={rule.freq};INTERVAL={rule.interval};COUNT={len(days)}"
+    if rule.freq == 'WEEKLY':
+        rrule += ";BYDAY=" + ",".join(RRULE_WEEKDAYS[d] for d in rule.byday)
+    exdates = [e for e in sorted(series.exceptions) if series.exceptions[e]['cancelled'] and rule.occurs_on(e)]
+    extra = [rrule] + ['EXDATE' + ics_time(day, row['start_time']) for day in exdates]
+
+    base = dict(row, meeting_date=days[0], department_name=row['meeting_department_name'], cancelled=False)
+    events = [ics_event(base, host, uid, extra)]
+    for day, exception in sorted(series.exceptions.items()):
+        if not exception['cancelled'] and rule.occurs_on(day):
+            occ = dict(base, **series.occurrence(day))
+            events.append(ics_event(occ, host, uid, ['RECURRENCE-ID' + ics_time(day, row['start_time'])]))
+    return ''.join(events)
+
+
+def ics_stream(name, events):
+    """The calendar around events (VEVENT strings), sent in chunks."""
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Meeting Scheduler//EN',
+              'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{ics_escape(name)}']
+    if ICS_TIMEZONE:
+        header.append(f'X-WR-TIMEZONE:{ICS_TIMEZONE}')
+    yield ''.join(ics_fold(line) for line in header)
+    chunk = []
+    for event in events:
+        chunk.append(event)
+        if len(chunk) >= 100:
+            yield ''.join(chunk)
+            chunk = []
+    yield ''.join(chunk) + 'END:VCALENDAR\r\n'
+
+
+def prune_meeting_tombstones():
+    """Drop tombstones older than any sync token the feeds still accept."""
+    for table in ("meeting_tombstone", "meeting_series_tombstone"):
+        execute_query(
+            f"DELETE FROM {table} WHERE removed_at < now() - %s * INTERVAL '1 day'",
+            (ICS_SYNC_MAX_AGE,), commit=True, fetch=None
+        )
+
+
+@app.route('/calendar/<token>.ics')
+def calendar_feed(token):
+    try:
+        claims = _feed_serializer().loads(token)
+        user_id, feed = claims['u'], claims['f']
+        queries = FEEDS[feed]
+    except (BadSignature, KeyError, TypeError):
+        return "Unknown calendar feed", 404
+
+    user = execute_query(
+        'SELECT user_name, department_id, feed_version FROM "user" WHERE user_id = %s', (user_id,), fetch='one'
+    )
+    if not user or claims.get('v') != user['feed_version']:
+        return "Unknown calendar feed", 404
+    if feed == 'department' and not user['department_id']:
+        return "Unknown calendar feed", 404
+    feed_id = user_id if feed == 'user' else user['department_id']
+
+    since = None
+    token_values = decode_cursor(request.args.get('sync'))
+    if token_values:
+        try:
+            since = datetime.fromisoformat(token_values[0])
+        except (TypeError, ValueError):
+            since = None
+        if since and since.tzinfo is None:
+            since = None    # not one of ours: tokens carry the database's UTC offset
+        if since and datetime.now(timezone.utc) - since > timedelta(days=ICS_SYNC_MAX_AGE):
+            since = None    # tombstones are gone: fall back to the full feed
+
+    stamp = execute_query(queries['version'], {'id': feed_id}, fetch='one')
+    if stamp:
+        version, now = stamp['version'], stamp['now']
+    else:
+        version, now = 0, execute_query("SELECT now() AS now", fetch='one')['now']
+    etag = f"{feed}{feed_id}-v{version}" + (f"-{since.timestamp():.0f}" if since else "")
+
+    if not is_resource_modified(request.environ, etag=etag):
+        response = app.response_class(status=304)
+    else:
+        params = {'id': feed_id, 'since': since}
+        if since:
+            query = queries['meetings'] + " AND m.updated_at > %(since)s UNION ALL " + queries['cancelled']
+            series_rows = execute_query(queries['series'] + " AND s.updated_at > %(since)s", params, fetch='all')
+            cancelled = execute_query(queries['series_cancelled'], params, fetch='all')
+        else:
+            query = queries['meetings'] + " ORDER BY m.meeting_date, m.start_time"
+            series_rows = execute_query(queries['series'], params, fetch='all')
+            cancelled = []
+        series = load_series(series_rows, *series_span(series_rows)) if series_rows else []
+
+        host = request.host
+        events = itertools.chain(
+            (ics_event(row, host) for row in execute_query(query, params, fetch='stream', row_type='record')),
+            (ics_series(s, host) for s in series),
+            (ics_event(row, host, f"series-{row['series_id']}") for row in cancelled))
+        name = f"{user['user_name']} - meetings" if feed == 'user' else "Department meetings"
+        response = app.response_class(ics_stream(name, events), mimetype='text/calendar')
+        response.headers['X-Sync-Token'] = encode_cursor([(now - timedelta(seconds=ICS_SYNC_OVERLAP)).isoformat()])
+
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+# ---------------- PARTITIONS ----------------
+# meeting and meeting_participant are partitioned by month of meeting_date
+# (migrations/0011). The retention leader keeps the next
+# PARTITION_MONTHS_AHEAD months created ahead of time, so new meetings do
+# not pile up in the DEFAULT partitions. With PARTITION_MONTHS_KEPT set it
+# also detaches months older than that: a DETACH instead of row-by-row
+# deletes when RETENTION_DAYS keeps history. Detached months that are empty
+# (retention already archived them) are dropped; the others are left as
+# standalone meeting_YYYYMM / meeting_participant_YYYYMM tables.
+
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", 12))
+PARTITION_MONTHS_KEPT = int(os.environ.get("PARTITION_MONTHS_KEPT", 0))     # 0: never detach
+
+MEETING_PARTITIONS_QUERY = """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'meeting'::regclass AND c.relname ~ '^meeting_[0-9]{6}$'
+    ORDER BY c.relname
+"""
+
+
+def first_of_month(day, months=0):
+    """The 1st of day's month, `months` months later (earlier if negative)."""
+    year, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + year, month + 1, 1)
+
+
+DETACHED_FOREIGN_KEYS_QUERY = """
+    SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'
+"""
+
+
+def detach_partition(suffix):
+    """
+    Detach one month from both tables (inside transaction()); drops it if
+    empty. Returns True if the month still held rows and was kept.
+    """
+    # Participants first: the meeting month cannot leave while rows reference it.
+    execute_query(f"ALTER TABLE meeting_participant DETACH PARTITION meeting_participant_{suffix}",
+                  commit=True, fetch=None)
+    # The detached table keeps the partition's foreign keys as its own, and the one
+    # to meeting would still pin the rows of meeting_{suffix}. Like the archive
+    # tables, the standalone month has no foreign keys.
+    for fk in execute_query(DETACHED_FOREIGN_KEYS_QUERY, (f"meeting_participant_{suffix}",), fetch='all'):
+        execute_query(f'ALTER TABLE meeting_participant_{suffix} DROP CONSTRAINT "{fk["conname"]}"',
+                      commit=True, fetch=None)
+    execute_query(f"ALTER TABLE meeting DETACH PARTITION meeting_{suffix}", commit=True, fetch=None)
+    used = execute_query(f"""
+        SELECT EXISTS (SELECT 1 FROM meeting_{suffix})
+            OR EXISTS (SELECT 1 FROM meeting_participant_{suffix}) AS used
+    """, fetch='one')['used']
+    if not used:
+        execute_query(f"DROP TABLE meeting_participant_{suffix}, meeting_{suffix}", commit=True, fetch=None)
+    # The month's meetings left the tables: every process forgets them.
+    notify_change('meeting_changed')
+    after_commit(invalidate_conflict_days)
+    invalidate_meeting_pages()
+    return used
+
+
+def maintain_partitions():
+    """
+    Create the coming months' partitions and detach expired ones; returns
+    (created, detached) months. A month that fails is reported and skipped,
+    so one bad month never holds up the others or the retention run.
+    """
+    this_month = first_of_month(date.today())
+    created, detached, failed = [], [], 0
+    with app.app_context():
+        for n in range(PARTITION_MONTHS_AHEAD + 1):
+            month = first_of_month(this_month, n)
+            try:
+                with transaction():
+                    if execute_query("SELECT create_meeting_partition(%s) AS created",
+                                     (month,), fetch='one', commit=True)['created']:
+                        created.append(month)
+            except Exception as e:
+                failed += 1
+                print(f"❌ Could not create meeting partitions for {month:%Y-%m}: {e}")
+
+        if PARTITION_MONTHS_KEPT:
+            cutoff = first_of_month(this_month, -PARTITION_MONTHS_KEPT)
+            for row in execute_query(MEETING_PARTITIONS_QUERY, fetch='all'):
+                suffix = row['relname'][-6:]
+                month = date(int(suffix[:4]), int(suffix[4:]), 1)
+                if month >= cutoff:
+                    continue
+                try:
+                    with transaction():
+                        used = detach_partition(suffix)
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ Could not detach meeting partitions for {month:%Y-%m}: {e}")
+                    continue
+                detached.append(month)
+                print(f"✅ Detached meeting partitions for {month:%Y-%m}"
+                      f"{' (kept as standalone tables)' if used else ' (empty, dropped)'}")
+
+    count('partition_changes_total', len(created), action='created')
+    count('partition_changes_total', len(detached), action='detached')
+    count('partition_changes_total', failed, action='failed')
+    if created:
+        print(f"✅ Created meeting partitions for {', '.join(f'{m:%Y-%m}' for m in created)}")
+    return created, detached
+
+
+@app.cli.command("partitions")
+def partitions_command():
+    """Create the coming months' meeting partitions (and detach expired ones) now."""
+    maintain_partitions()
+
+
+# ---------------- RETENTION ----------------
+# Past meetings and their participants are moved to meeting_archive /
+# meeting_participant_archive (migrations/0010) by one process at a time:
+# every process runs a retention thread, but only the one holding the
+# Postgres advisory lock RETENTION_LOCK_KEY does the work, and another takes
+# over if it dies (the lock goes with its connection). Each batch of
+# RETENTION_BATCH_SIZE meetings is its own short transaction, with a pause
+# between batches, so the hot tables are never locked for long. Archiving is
+# opt-in: nothing is moved until RETENTION_DAYS is set to a positive number
+# (the leader still keeps the partitions current).
+
+RETENTION_WORKER = os.environ.get("RETENTION_WORKER", "1") == "1"          # run the retention thread in web processes
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", 0))                 # archive meetings older than today - N days (0: off)
+RETENTION_INTERVAL = float(os.environ.get("RETENTION_INTERVAL", 3600))    # seconds between runs
+RETENTION_BATCH_SIZE = int(os.environ.get("RETENTION_BATCH_SIZE", 500))
+RETENTION_BATCH_PAUSE = float(os.environ.get("RETENTION_BATCH_PAUSE", 0.5))   # seconds between batches
+RETENTION_LEADER_RETRY = float(os.environ.get("RETENTION_LEADER_RETRY", 60))  # followers retry the lock this often
+RETENTION_LOCK_KEY = 72616401
+
+RETENTION_BATCH_QUERY = """
+    SELECT meeting_id FROM meeting
+    WHERE meeting_date < CURRENT_DATE - %s
+    ORDER BY meeting_date
+    LIMIT %s
+    FOR UPDATE SKIP LOCKED
+"""
+
+_retention_pid = None
+
+
+def archive_batch():
+    """Archive up to RETENTION_BATCH_SIZE past meetings in one transaction; returns (meetings, participants)."""
+    if RETENTION_DAYS <= 0:
+        return 0, 0
+    with app.app_context():
+        with transaction():
+            # Not cancellations: the feed triggers skip tombstones for these (migrations/0010).
+            execute_query("SET LOCAL app.archiving = 'on'", commit=True, fetch=None)
+            ids = [row['meeting_id'] for row in execute_query(
+                RETENTION_BATCH_QUERY, (RETENTION_DAYS, RETENTION_BATCH_SIZE), fetch='all')]
+            if not ids:
+                return 0, 0
+
+            participants = execute_query("""
+                WITH moved AS (
+                    DELETE FROM meeting_participant
+                    WHERE meeting_date < CURRENT_DATE - %s AND meeting_id = ANY(%s)
+                    RETURNING participant_id, meeting_id, user_id
+                )
+                INSERT INTO meeting_participant_archive (participant_id, meeting_id, user_id)
+                SELECT participant_id, meeting_id, user_id FROM moved
+                RETURNING participant_id
+            """, (RETENTION_DAYS, ids), fetch='all', commit=True)
+
+            archived = execute_query("""
+                WITH moved AS (
+                    DELETE FROM meeting
+                    WHERE meeting_date < CURRENT_DATE - %s AND meeting_id = ANY(%s)
+                    RETURNING meeting_id, meeting_title, meeting_date, start_time, end_time,
+                              user_id, department_id, venue, updated_at
+                )
+                INSERT INTO meeting_archive (meeting_id, meeting_title, meeting_date, start_time, end_time,
+                                             user_id, department_id, venue, updated_at)
+                SELECT * FROM moved
+                RETURNING meeting_date
+            """, (RETENTION_DAYS, ids), fetch='all', commit=True)
+
+            dates = sorted({row['meeting_date'] for row in archived})
+            notify_change('meeting_changed', ','.join(d.isoformat() for d in dates))
+            after_commit(lambda: invalidate_conflict_days(dates))
+            invalidate_meeting_pages()
+    return len(archived), len(participants)
+
+
+def run_retention():
+    """Keep the partitions current, then archive every meeting older than RETENTION_DAYS, batch by batch."""
+    started = time.perf_counter()
+    meetings = participants = batches = 0
+    try:
+        try:
+            maintain_partitions()
+        except Exception as e:
+            # Partition upkeep must not stop archiving; the next run tries again.
+            print(f"❌ Partition maintenance failed: {e}")
+        while True:
+            batch_started = time.perf_counter()
+            moved, moved_participants = archive_batch()
+            if moved:
+                batches += 1
+                meetings += moved
+                participants += moved_participants
+                observe('retention_batch_seconds', time.perf_counter() - batch_started)
+                count('retention_archived_total', moved, table='meeting')
+                count('retention_archived_total', moved_participants, table='meeting_participant')
+                flush_metrics()
+            if moved < RETENTION_BATCH_SIZE:
+                break
+            if batches % 20 == 0:
+                print(f"   Retention: {meetings} meetings archived so far")
+            time.sleep(RETENTION_BATCH_PAUSE)
+
+        with app.app_context():
+            prune_meeting_tombstones()
+    except Exception:
+        count('retention_runs_total', result='error')
+        raise
+    count('retention_runs_total', result='ok')
+    flush_metrics(force=True)
+    print(f"[{datetime.now()}] ✅ Retention: archived {meetings} meetings, {participants} participants "
+          f"in {batches} batches ({time.perf_counter() - started:.1f}s)")
+    return meetings
+
+
+def run_retention_worker():
+    """Become the retention leader when the advisory lock is free, then run retention every RETENTION_INTERVAL."""
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(get_database_url())
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (RETENTION_LOCK_KEY,))
+            if cursor.fetchone()[0]:
+                print(f"✅ Retention leader: pid {os.getpid()}")
+                while True:
+                    run_retention()
+                    time.sleep(RETENTION_INTERVAL)
+                    cursor.execute("SELECT 1")     # still holding the lock? (it lives as long as conn)
         except Exception as e:
-            print(f"Error deleting old meetings: {e}")
+            print(f"❌ Retention worker error: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+        time.sleep(RETENTION_LEADER_RETRY)
+
+
+def start_retention_worker():
+    """Start the retention thread once per process; only the lock holder does any work."""
+    global _retention_pid
+    if _retention_pid == os.getpid():
+        return
+    _retention_pid = os.getpid()
+    threading.Thread(target=run_retention_worker, name="retention", daemon=True).start()
 
-    scheduler = BackgroundScheduler()
-    scheduler.add_job(delete_past_meetings, 'cron', hour=0, minute=0)
-    scheduler.start()
+
+@app.cli.command("retention")
+def retention_command():
+    """Run retention once in the foreground (skipped while another process holds the leader lock)."""
+    conn = psycopg2.connect(get_database_url())
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (RETENTION_LOCK_KEY,))
+        if not cursor.fetchone()[0]:
+            print("Another process is running retention.")
+            return
+        run_retention()
+    finally:
+        conn.close()
+
+
+# ---------------- RUN APP ----------------
+if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,315 @@
+"""
+ASGI entry point: the read-only JSON endpoints on an async Postgres pool,
+everything else handed to the Flask app.
+
+Under sync gunicorn every in-flight request holds a worker thread, so a few
+slow searches could starve the pool for every other page. Here
+/admin/search-meetings, /admin/search-departments and
+/department_calendar/events are coroutines on asyncpg: one process keeps
+hundreds of them in flight, each holding a database connection only while
+its statements run (at most ASYNC_DB_POOL_MAX at once). They use app.py's
+queries, session cookie, role cache and metrics, so responses, auth checks
+and /metrics match the Flask routes they replace; the parts of those that
+block (metrics file writes, the role cache's lock) run on a thread, never
+on the event loop. Every other request goes through asgiref's WsgiToAsgi
+to the Flask app, on the loop's thread pool.
+
+This path is opt-in. The Procfile serves app:app under sync gunicorn and
+nothing here runs unless web: is changed to one of:
+
+    uvicorn asgi:application --workers 4
+    gunicorn asgi:application -k uvicorn.workers.UvicornWorker -w 4
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.cookies import CookieError, SimpleCookie
+from urllib.parse import parse_qsl
+
+import asyncpg
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from itsdangerous import BadSignature
+from werkzeug.http import http_date, is_resource_modified, quote_etag
+
+from app import (ACCESS_LOG, ADMIN_ROLE_ID, CALENDAR_MAX_DAYS, DB_POOL_TIMEOUT,
+                 DEPARTMENT_EVENTS_QUERY, DEPARTMENT_SERIES_QUERY, DEPARTMENT_VERSION_QUERY, ID_KEY_TYPES,
+                 MEETING_KEY_TYPES, MEETING_PAGE_KEY, PREPARED_STATEMENTS, ROLE_QUERY, SEARCH_MEETINGS_SELECT,
+                 SERIES_EXCEPTIONS_QUERY, USER_DEPARTMENT_QUERY, app, cached_role, calendar_event, count,
+                 flush_metrics, get_database_url, listing_filters, listing_occurrences, listing_series_query,
+                 merge_listing, observe, occurrence_window, page_query, page_rows, positional_query,
+                 remember_role, search_condition, search_result, series_from_rows, series_span,
+                 start_background_workers)
+
+ASYNC_DB_POOL_MIN = int(os.environ.get("ASYNC_DB_POOL_MIN", 1))
+ASYNC_DB_POOL_MAX = int(os.environ.get("ASYNC_DB_POOL_MAX", 20))
+
+_pool = None
+_pool_lock = None
+
+
+async def in_thread(fn, *args):
+    """Run a blocking app.py helper (file I/O, threading locks) on the loop's thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def get_pool():
+    """This process's asyncpg pool, created on first use (with the app's background threads)."""
+    global _pool, _pool_lock
+    if _pool is None:
+        if _pool_lock is None:
+            _pool_lock = asyncio.Lock()
+        async with _pool_lock:
+            if _pool is None:
+                start_background_workers()
+                _pool = await asyncpg.create_pool(get_database_url(), min_size=ASYNC_DB_POOL_MIN,
+                                                  max_size=ASYNC_DB_POOL_MAX)
+    return _pool
+
+
+def load_session(cookie_header):
+    """The Flask session from the request's cookie ({} if missing, expired or tampered with)."""
+    serializer = app.session_interface.get_signing_serializer(app)
+    if serializer is None:
+        return {}
+    try:
+        morsel = SimpleCookie(cookie_header).get(app.config["SESSION_COOKIE_NAME"])
+    except CookieError:
+        return {}
+    if morsel is None:
+        return {}
+    try:
+        return serializer.loads(morsel.value, max_age=int(app.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return {}
+
+
+class Request:
+    """One async request: query args, headers, session and its database accounting."""
+
+    def __init__(self, scope):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.args = dict(parse_qsl(scope["query_string"].decode("latin-1")))
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        self.session = load_session(self.headers.get("cookie", ""))
+        self.remote_addr = (scope.get("client") or (None,))[0]
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.pool_seconds = 0.0
+
+    async def fetch(self, query, params=(), fetch='all'):
+        """Run a %s-style query on the async pool; rows as dicts ('one': first row or None)."""
+        started = time.perf_counter()
+        async with (await get_pool()).acquire(timeout=DB_POOL_TIMEOUT) as conn:
+            acquired = time.perf_counter()
+            rows = await conn.fetch(positional_query(query), *params)
+        self.pool_seconds += acquired - started
+        self.query_seconds += time.perf_counter() - acquired
+        self.queries += 1
+        rows = [dict(row) for row in rows]
+        if fetch == 'one':
+            return rows[0] if rows else None
+        return rows
+
+    async def is_admin(self):
+        """is_admin() for this request, through the same per-process role cache."""
+        user_id = self.session.get("user_id")
+        if user_id is None:
+            return False
+        version, hit, role_id = await in_thread(cached_role, user_id)
+        if not hit:
+            row = await self.fetch(ROLE_QUERY, (user_id,), fetch='one')
+            role_id = row["role_id"] if row else None
+            await in_thread(remember_role, user_id, version, role_id)
+        return role_id == ADMIN_ROLE_ID
+
+    async def load_series(self, rows, start, end):
+        """app.load_series() on the async pool: Series for the rows, with their exceptions for [start, end]."""
+        series = series_from_rows(rows)
+        if series:
+            exceptions_query = PREPARED_STATEMENTS[SERIES_EXCEPTIONS_QUERY][0]
+            for row in await self.fetch(exceptions_query, (list(series), start, end, start, end)):
+                series[row["series_id"]].add_exception(row)
+        return list(series.values())
+
+
+class Response:
+    def __init__(self, body, status=200, headers=None):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+
+
+def json_response(payload, status=200, headers=None):
+    return Response(json.dumps(payload, default=str).encode(), status,
+                    {"Content-Type": "application/json", **(headers or {})})
+
+
+async def search_meetings(request):
+    if not await request.is_admin():
+        return json_response({"error": "Unauthorized"}, 403)
+
+    keyword = request.args.get("q", "").strip()
+    where, params, series_where, series_params = listing_filters(keyword)
+
+    # app.fetch_listing_page() with the queries on the async pool.
+    key_columns, _ = MEETING_PAGE_KEY
+    query, params, page = page_query(SEARCH_MEETINGS_SELECT, where, params, key_columns, request.args,
+                                     key_types=MEETING_KEY_TYPES)
+    rows = await request.fetch(query, params)
+    start, end = occurrence_window(rows, page)
+    series_rows = await request.fetch(*listing_series_query(series_where, series_params, start, end))
+    occurrences = []
+    if series_rows:
+        start, end = series_span(series_rows, start, end)
+        occurrences = listing_occurrences(await request.load_series(series_rows, start, end), start, end)
+    results, next_cursor, prev_cursor = merge_listing(rows, occurrences, page)
+    return json_response({"meetings": [search_result(m) for m in results],
+                          "next": next_cursor, "prev": prev_cursor})
+
+
+async def search_departments(request):
+    if not await request.is_admin():
+        return json_response({"error": "Unauthorized"}, 403)
+
+    keyword = request.args.get("q", "").strip()
+    where, params = [], []
+    if keyword:
+        condition, params = search_condition(keyword, columns=["department_name"])
+        where.append(condition)
+
+    query, params, page = page_query("SELECT * FROM department", where, params, ["department_id"],
+                                     request.args, descending=False, key_types=ID_KEY_TYPES)
+    departments, next_cursor, prev_cursor = page_rows(await request.fetch(query, params), page,
+                                                      ["department_id"])
+    return json_response({"departments": departments, "next": next_cursor, "prev": prev_cursor})
+
+
+async def department_calendar_events(request):
+    """The department event feed of app.department_calendar_events, with the same ETag / 304 handling."""
+    if "user_id" not in request.session:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    dept = await request.fetch(USER_DEPARTMENT_QUERY, (request.session["user_id"],), fetch='one')
+    department_id = dept["department_id"] if dept else None
+    if not department_id:
+        return json_response({"error": "Department not assigned"}, 404)
+
+    try:
+        start = date.fromisoformat(request.args["start"][:10])
+        end = date.fromisoformat(request.args["end"][:10])
+    except (KeyError, ValueError):
+        return json_response({"error": "start and end must be YYYY-MM-DD dates"}, 400)
+    if not start < end or (end - start).days > CALENDAR_MAX_DAYS:
+        return json_response({"error": f"Date range must be 1 to {CALENDAR_MAX_DAYS} days"}, 400)
+
+    stamp = await request.fetch(DEPARTMENT_VERSION_QUERY, (department_id,), fetch='one')
+    version, changed_at = (stamp["version"], stamp["changed_at"]) if stamp else (0, None)
+    etag = f"dept{department_id}-v{version}-{start}-{end}"
+    headers = {"ETag": quote_etag(etag), "Cache-Control": "private, no-cache"}
+    if changed_at:
+        headers["Last-Modified"] = http_date(changed_at)
+
+    conditional = {"REQUEST_METHOD": request.method,
+                   "HTTP_IF_NONE_MATCH": request.headers.get("if-none-match", ""),
+                   "HTTP_IF_MODIFIED_SINCE": request.headers.get("if-modified-since", "")}
+    if not is_resource_modified(conditional, etag=etag, last_modified=changed_at):
+        return Response(b"", 304, headers)
+
+    last = end - timedelta(days=1)
+    meetings = await request.fetch(DEPARTMENT_EVENTS_QUERY, (department_id, start, end))
+    series = await request.load_series(await request.fetch(DEPARTMENT_SERIES_QUERY, (department_id, start, last)),
+                                       start, last)
+    meetings += [dict(occ, date_iso=occ["meeting_date"].isoformat())
+                 for s in series for occ in s.occurrences(start, last)]
+    return json_response([calendar_event(m) for m in meetings], headers=headers)
+
+
+ROUTES = {
+    "/admin/search-meetings": search_meetings,
+    "/admin/search-departments": search_departments,
+    "/department_calendar/events": department_calendar_events,
+}
+
+class FlaskInstance(WsgiToAsgiInstance):
+    # asgiref runs every WSGI call on one shared thread (thread_sensitive=True),
+    # which would serve the Flask routes one request at a time.
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False)
+
+
+class FlaskApplication(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await FlaskInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+flask_application = FlaskApplication(app)
+
+
+async def handle(request):
+    try:
+        return await ROUTES[request.path](request)
+    except asyncio.TimeoutError:
+        print(f"❌ No async database connection free within {DB_POOL_TIMEOUT}s for {request.path}")
+        return json_response({"error": "Server busy, please try again in a moment."}, 503)
+    except (asyncpg.PostgresError, OSError) as e:
+        print(f"❌ Database error on {request.path}: {e}")
+        return json_response({"error": "Database error"}, 500)
+
+
+def record(request, response, elapsed):
+    """The Flask after_request bookkeeping: request metrics and the JSON access-log line (blocking: use in_thread)."""
+    count('db_queries_total', request.queries)
+    observe('http_request_duration_seconds', elapsed, route=request.path, method=request.method,
+            status=response.status)
+    observe('http_request_queries', request.queries, route=request.path)
+    observe('http_request_query_seconds', request.query_seconds, route=request.path)
+    flush_metrics()
+
+    if ACCESS_LOG:
+        print(json.dumps({
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'method': request.method,
+            'path': request.path,
+            'route': request.path,
+            'status': response.status,
+            'duration_ms': round(elapsed * 1000, 2),
+            'queries': request.queries,
+            'query_ms': round(request.query_seconds * 1000, 2),
+            'pool_wait_ms': round(request.pool_seconds * 1000, 2),
+            'user_id': request.session.get('user_id'),
+            'remote_addr': request.remote_addr,
+            'pid': os.getpid(),
+            'async': True,
+        }), flush=True)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _pool is not None:
+                await _pool.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http" or scope["path"] not in ROUTES or scope["method"] not in ("GET", "HEAD"):
+        return await flask_application(scope, receive, send)
+
+    started = time.perf_counter()
+    request = Request(scope)
+    response = await handle(request)
+    body = response.body if request.method == "GET" else b""
+    headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()]
+    headers.append((b"content-length", str(len(response.body) if response.status != 304 else 0).encode()))
+    await send({"type": "http.response.start", "status": response.status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+    await in_thread(record, request, response, time.perf_counter() - started)
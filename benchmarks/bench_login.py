@@ -0,0 +1,115 @@
+"""
+Login throughput benchmark.
+
+Password verification: N client threads log in concurrently, each either
+checking the hash on its own thread (the old path) or through the bounded
+hash pool (verify_password/run_hashing), at one or more PBKDF2 costs. No
+database is needed for this part.
+
+End to end: with --url, N threads POST to a running server's /login with
+the given credentials and report throughput and latency percentiles.
+
+    python benchmarks/bench_login.py --clients 1,8,32 --costs 260000,600000
+    python benchmarks/bench_login.py --url http://localhost:8000 --username 1 --password secret
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import HASH_WORKERS, HashPoolBusy, run_hashing  # noqa: E402
+
+PASSWORD = 'correct horse battery staple'
+
+
+def drive(clients, attempts, login):
+    """Run `attempts` logins per client thread; return (wall seconds, latencies, rejected)."""
+    latencies, rejected = [], []
+    lock = threading.Lock()
+
+    def client():
+        mine, busy = [], 0
+        for _ in range(attempts):
+            started = time.perf_counter()
+            try:
+                login()
+            except HashPoolBusy:
+                busy += 1
+                continue
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+            rejected.append(busy)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, latencies, sum(rejected)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else float('nan')
+
+
+def report(label, clients, wall, latencies, rejected):
+    print(f"{label:>22} {clients:>8} {len(latencies) / wall:>10.1f} "
+          f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+          f"{percentile(latencies, 99) * 1000:>9.1f} {rejected:>9}")
+
+
+def bench_hashing(args):
+    print(f"hash pool: {HASH_WORKERS} workers")
+    print(f"{'path':>22} {'clients':>8} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rejected':>9}")
+    for cost in [int(c) for c in args.costs.split(',')]:
+        stored = generate_password_hash(PASSWORD, f'pbkdf2:sha256:{cost}')
+        paths = [
+            (f'inline   {cost}', lambda: check_password_hash(stored, PASSWORD)),
+            (f'pool     {cost}', lambda: run_hashing(check_password_hash, stored, PASSWORD)),
+        ]
+        for clients in [int(c) for c in args.clients.split(',')]:
+            for label, login in paths:
+                report(label, clients, *drive(clients, args.attempts, login))
+
+
+def bench_http(args):
+    import requests
+
+    def login():
+        response = requests.post(f"{args.url.rstrip('/')}/login", allow_redirects=False,
+                                 data={'username': args.username, 'password': args.password})
+        if response.status_code == 503:
+            raise HashPoolBusy()
+        if response.status_code != 302:
+            raise SystemExit(f"login failed with HTTP {response.status_code}")
+
+    print(f"{'path':>22} {'clients':>8} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rejected':>9}")
+    for clients in [int(c) for c in args.clients.split(',')]:
+        report('POST /login', clients, *drive(clients, args.attempts, login))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', default='1,4,16,64', help='comma-separated concurrent client counts')
+    parser.add_argument('--attempts', type=int, default=20, help='logins per client')
+    parser.add_argument('--costs', default='260000', help='comma-separated PBKDF2 iteration counts')
+    parser.add_argument('--url', help='base URL of a running server (end-to-end mode)')
+    parser.add_argument('--username', help='user id or email for end-to-end mode')
+    parser.add_argument('--password', help='password for end-to-end mode')
+    args = parser.parse_args()
+
+    if args.url:
+        bench_http(args)
+    else:
+        bench_hashing(args)
+
+
+if __name__ == '__main__':
+    main()
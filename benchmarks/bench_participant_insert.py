@@ -0,0 +1,106 @@
+"""
+Participant insert benchmark: time to write N meeting_participant rows.
+
+Compares the old per-row paths with the bulk insert_participants() helper
+(and COPY for reference). Runs against DATABASE_URL on a TEMP table that
+shadows meeting_participant, so no real data is touched.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_participant_insert.py
+    python benchmarks/bench_participant_insert.py --counts 10,100,500,2000 --repeat 5
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import get_database_url, insert_participants  # noqa: E402
+
+MEETING_ID = 1
+MEETING_DATE = date(2026, 1, 1)
+
+
+def per_row_commit(conn, user_ids):
+    """Old edit_meeting path: one INSERT + COMMIT per participant."""
+    cur = conn.cursor()
+    for uid in user_ids:
+        cur.execute("INSERT INTO meeting_participant (user_id, meeting_id, meeting_date) VALUES (%s, %s, %s)",
+                    (uid, MEETING_ID, MEETING_DATE))
+        conn.commit()
+
+
+def per_row_single_tx(conn, user_ids):
+    """Old create_schedule path: one INSERT per participant, one COMMIT."""
+    cur = conn.cursor()
+    for uid in user_ids:
+        cur.execute("INSERT INTO meeting_participant (user_id, meeting_id, meeting_date) VALUES (%s, %s, %s)",
+                    (uid, MEETING_ID, MEETING_DATE))
+    conn.commit()
+
+
+def bulk_values(conn, user_ids):
+    """Current path: insert_participants() multi-row VALUES."""
+    insert_participants(conn, MEETING_ID, user_ids, MEETING_DATE)
+    conn.commit()
+
+
+def copy_from(conn, user_ids):
+    """COPY FROM STDIN, for reference."""
+    buf = io.StringIO(''.join(f"{uid}\t{MEETING_ID}\t{MEETING_DATE}\n" for uid in user_ids))
+    conn.cursor().copy_from(buf, 'meeting_participant', columns=('user_id', 'meeting_id', 'meeting_date'))
+    conn.commit()
+
+
+METHODS = [
+    ('per-row commit', per_row_commit),
+    ('per-row, 1 tx', per_row_single_tx),
+    ('execute_values', bulk_values),
+    ('COPY', copy_from),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--counts', default='10,50,100,500,1000,2000',
+                        help='comma-separated participant counts')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per point (median is reported)')
+    args = parser.parse_args()
+    counts = [int(c) for c in args.counts.split(',')]
+
+    conn = psycopg2.connect(get_database_url())
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TEMP TABLE meeting_participant (
+            participant_id SERIAL PRIMARY KEY,
+            meeting_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            meeting_date DATE NOT NULL
+        )
+    """)
+    conn.commit()
+
+    print(f"{'participants':>12}" + ''.join(f"{name:>18}" for name, _ in METHODS))
+    for n in counts:
+        user_ids = list(range(1, n + 1))
+        cells = []
+        for _, method in METHODS:
+            timings = []
+            for _ in range(args.repeat):
+                cur.execute("TRUNCATE meeting_participant")
+                conn.commit()
+                started = time.perf_counter()
+                method(conn, user_ids)
+                timings.append(time.perf_counter() - started)
+            cells.append(f"{statistics.median(timings) * 1000:>15.1f} ms")
+        print(f"{n:>12}" + ''.join(cells))
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
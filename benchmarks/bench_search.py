@@ -0,0 +1,126 @@
+"""
+Search benchmark: meeting search latency before and after the search indexes.
+
+Builds a synthetic dataset (default 1M meetings) in a scratch schema, then
+times the first page of the view_all_meetings search with
+  - the old predicate (ILIKE OR-ed across the joined tables)
+  - the current search_condition() predicate
+first without indexes, then after applying migrations/0002_search_indexes.sql.
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --meetings 200000 --keep
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import MEETING_LIST_SELECT, MEETING_SEARCH, get_database_url, search_condition  # noqa: E402
+from migrate import MIGRATIONS_DIR, split_statements  # noqa: E402
+
+SCHEMA = 'bench_search'
+KEYWORDS = ['review', 'dept 17', 'user 4242', 'zzz-no-match']
+OLD_CONDITION = "m.meeting_title ILIKE %s OR d.department_name ILIKE %s OR u.user_name ILIKE %s"
+PAGE = " ORDER BY m.meeting_date DESC, m.meeting_id DESC LIMIT 51"
+
+
+def build_dataset(cur, meetings, users, departments):
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path = {SCHEMA}, public")
+    cur.execute("""
+        CREATE TABLE department (department_id SERIAL PRIMARY KEY, department_name VARCHAR(100));
+        CREATE TABLE role (role_id INTEGER PRIMARY KEY, role_name VARCHAR(50));
+        CREATE TABLE "user" (
+            user_id SERIAL PRIMARY KEY, user_name VARCHAR(100), email VARCHAR(100),
+            user_mobileno VARCHAR(15), password_hash TEXT, role_id INTEGER, department_id INTEGER
+        );
+        CREATE TABLE meeting (
+            meeting_id SERIAL PRIMARY KEY, meeting_title VARCHAR(200), meeting_date DATE,
+            start_time TIME, end_time TIME, venue VARCHAR(100), user_id INTEGER, department_id INTEGER
+        );
+        CREATE TABLE meeting_participant (
+            participant_id SERIAL PRIMARY KEY, meeting_id INTEGER, user_id INTEGER, meeting_date DATE
+        );
+        INSERT INTO role VALUES (100, 'Admin'), (101, 'Faculty');
+    """)
+    cur.execute("INSERT INTO department (department_name) SELECT 'Dept ' || g FROM generate_series(1, %s) g",
+                (departments,))
+    cur.execute("""
+        INSERT INTO "user" (user_name, email, user_mobileno, role_id, department_id)
+        SELECT 'User ' || g, 'user' || g || '@example.edu', lpad(g::text, 10, '9'), 101, 1 + g %% %s
+        FROM generate_series(1, %s) g
+    """, (departments, users))
+    cur.execute("""
+        INSERT INTO meeting (meeting_title, meeting_date, start_time, end_time, venue, user_id, department_id)
+        SELECT (ARRAY['Budget', 'Syllabus', 'Exam', 'Faculty'])[1 + g %% 4]
+                   || CASE WHEN g %% 50 = 0 THEN ' review ' ELSE ' meeting ' END || g,
+               DATE '2020-01-01' + (g %% 2500),
+               TIME '08:00' + (g %% 36) * INTERVAL '15 minutes',
+               TIME '09:00' + (g %% 36) * INTERVAL '15 minutes',
+               'Room ' || (g %% 40), 1 + g %% %s, 1 + g %% %s
+        FROM generate_series(1, %s) g
+    """, (users, departments, meetings))
+    cur.execute("""
+        INSERT INTO meeting_participant (meeting_id, user_id, meeting_date)
+        SELECT meeting_id, user_id, meeting_date FROM meeting
+    """)
+    cur.execute("CREATE INDEX ON meeting_participant (meeting_id, meeting_date)")
+    cur.execute("ANALYZE")
+
+
+def time_query(cur, query, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run_round(cur, label, repeat):
+    print(f"\n{label}")
+    print(f"{'keyword':>16}{'old predicate':>18}{'search_condition':>20}")
+    for keyword in KEYWORDS:
+        old = time_query(cur, MEETING_LIST_SELECT + " WHERE " + OLD_CONDITION + PAGE,
+                         ["%" + keyword + "%"] * 3, repeat)
+        condition, params = search_condition(keyword, **MEETING_SEARCH)
+        new = time_query(cur, MEETING_LIST_SELECT + " WHERE " + condition + PAGE, params, repeat)
+        print(f"{keyword:>16}{old:>15.1f} ms{new:>17.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--meetings', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--departments', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query (median is reported)')
+    parser.add_argument('--keep', action='store_true', help=f'keep the {SCHEMA} schema afterwards')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(get_database_url())
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        print(f"Building {args.meetings} meetings in schema {SCHEMA} ...")
+        build_dataset(cur, args.meetings, args.users, args.departments)
+        run_round(cur, "Without search indexes", args.repeat)
+
+        with open(os.path.join(MIGRATIONS_DIR, '0002_search_indexes.sql')) as f:
+            for statement in split_statements(f.read()):
+                cur.execute(statement)
+        cur.execute("ANALYZE")
+        run_round(cur, "With migrations/0002_search_indexes.sql", args.repeat)
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
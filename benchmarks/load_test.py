@@ -0,0 +1,292 @@
+"""
+Load test for the main routes of a running server.
+
+Each scenario runs --clients threads for --duration seconds against --url;
+every thread has its own logged-in requests.Session. Login happens before
+the clock starts (except in the login scenario, where it is what is timed).
+Reports throughput and p50/p95/p99 latency per scenario and writes the
+same numbers as JSON and CSV to --out, tagged with the git revision and
+the dataset manifest, so runs can be diffed across builds.
+
+Expects a database seeded by seed_dataset.py: users log in by id with the
+seed password, user 1 is the admin. DATABASE_URL is read only to pick
+faculty users who organize upcoming meetings (the edit_meeting targets).
+
+    python benchmarks/seed_dataset.py --reset --manifest /tmp/dataset.json
+    gunicorn app:app -w 4 &
+    python benchmarks/load_test.py --url http://localhost:8000 --manifest /tmp/dataset.json
+    python benchmarks/load_test.py --scenarios my_schedule,search_meetings --clients 32 --label pool-32
+
+create_schedule and edit_meeting write to the database; reseed before a
+run that must be compared with an earlier one.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import psycopg2
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import get_database_url  # noqa: E402
+
+PASSWORD = 'bench-password'
+ADMIN_ID = 1
+SEARCH_TERMS = ['Budget', 'Review', 'Exam', 'Committee', 'Lab', 'Seminar Hall', 'Planning']
+OK_STATUSES = {200, 302, 304}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else float('nan')
+
+
+class Client:
+    """One simulated user: a requests.Session logged in as user_id."""
+
+    def __init__(self, base_url, user_id, password, department_id=None, meetings=(), users=5000, today=None):
+        self.base_url = base_url
+        self.today = today or date.today()
+        self.user_id = user_id
+        self.department_id = department_id
+        self.password = password
+        self.meetings = list(meetings)
+        self.users = users
+        self.rng = random.Random(user_id)
+        self.http = requests.Session()
+
+    def url(self, path):
+        return self.base_url + path
+
+    def login(self):
+        response = self.http.post(self.url('/login'), allow_redirects=False,
+                                  data={'username': self.user_id, 'password': self.password})
+        if response.status_code != 302:
+            raise SystemExit(f"❌ login as user {self.user_id} failed with HTTP {response.status_code}")
+        return response
+
+    def meeting_form(self):
+        day = self.today + timedelta(days=self.rng.randint(1, 365))
+        start = 8 * 60 + self.rng.randrange(0, 36) * 15
+        end = start + self.rng.choice([30, 60, 90])
+        invited = self.rng.sample(range(2, self.users + 1), 3)
+        return {
+            'meeting_title': f"Load test {self.user_id}",
+            'meeting_date': day.isoformat(),
+            'start_time': f"{start // 60:02d}:{start % 60:02d}",
+            'end_time': f"{end // 60:02d}:{end % 60:02d}",
+            'venue': 'Room 101',
+            'department_id': self.department_id,
+            'participants': [str(self.user_id)] + [str(u) for u in invited],
+        }
+
+
+def scenario_login(client):
+    return requests.post(client.url('/login'), allow_redirects=False,
+                         data={'username': client.user_id, 'password': client.password})
+
+
+def scenario_my_schedule(client):
+    return client.http.get(client.url('/faculty/my-schedule'))
+
+
+def scenario_view_all_meetings(client):
+    return client.http.get(client.url('/admin/view-meetings'))
+
+
+def scenario_search_meetings(client):
+    return client.http.get(client.url('/admin/search-meetings'),
+                           params={'q': client.rng.choice(SEARCH_TERMS)})
+
+
+def scenario_department_calendar(client):
+    month = client.today.replace(day=1) + timedelta(days=31 * client.rng.randint(-3, 3))
+    start = month.replace(day=1) - timedelta(days=7)
+    return client.http.get(client.url('/department_calendar/events'),
+                           params={'start': start.isoformat(),
+                                   'end': (start + timedelta(days=42)).isoformat()})
+
+
+def scenario_create_schedule(client):
+    return client.http.post(client.url('/faculty/create-schedule'), allow_redirects=False,
+                            data=client.meeting_form())
+
+
+def scenario_edit_meeting(client):
+    form = client.meeting_form()
+    form['meeting_title'] = f"Edited by load test {client.user_id}"
+    return client.http.post(client.url(f"/faculty/meeting-edit/{client.rng.choice(client.meetings)}"),
+                            allow_redirects=False, data=form)
+
+
+# name -> (request function, runs as the admin)
+SCENARIOS = {
+    'login': (scenario_login, False),
+    'my_schedule': (scenario_my_schedule, False),
+    'view_all_meetings': (scenario_view_all_meetings, True),
+    'search_meetings': (scenario_search_meetings, True),
+    'department_calendar': (scenario_department_calendar, False),
+    'create_schedule': (scenario_create_schedule, False),
+    'edit_meeting': (scenario_edit_meeting, False),
+}
+
+
+def pick_organizers(clients, seed, today):
+    """(user id, department id, upcoming meeting ids) for faculty who organize meetings."""
+    conn = psycopg2.connect(get_database_url())
+    cursor = conn.cursor()
+    cursor.execute("SELECT setseed(%s)", (seed / 2 ** 31,))
+    cursor.execute("""
+        SELECT m.user_id, u.department_id, (array_agg(m.meeting_id))[1:20]
+        FROM meeting m
+        JOIN "user" u ON u.user_id = m.user_id
+        WHERE m.meeting_date > %s AND m.user_id <> %s
+        GROUP BY m.user_id, u.department_id
+        ORDER BY random()
+        LIMIT %s
+    """, (today, ADMIN_ID, clients))
+    organizers = cursor.fetchall()
+    conn.close()
+    if not organizers:
+        raise SystemExit('❌ No upcoming meetings found; seed the database with seed_dataset.py first.')
+    return [organizers[i % len(organizers)] for i in range(clients)]
+
+
+def run_scenario(name, clients, duration):
+    """Drive one scenario with all clients for `duration` seconds."""
+    request_fn = SCENARIOS[name][0]
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(client):
+        mine, codes = [], Counter()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = request_fn(client).status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            codes[status] += 1
+            if status in OK_STATUSES:
+                mine.append(elapsed)
+        with lock:
+            latencies.extend(mine)
+            statuses.update(codes)
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in clients]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    completed = sum(statuses.values())
+    return {
+        'scenario': name,
+        'clients': len(clients),
+        'seconds': round(wall, 3),
+        'requests': completed,
+        'errors': completed - len(latencies),
+        'throughput': round(len(latencies) / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2) if latencies else None,
+        'statuses': {str(k): v for k, v in sorted(statuses.items(), key=str)},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(out_dir, label, run, results):
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, label)
+    with open(base + '.json', 'w') as f:
+        json.dump({**run, 'results': results}, f, indent=2)
+    fields = ['scenario', 'clients', 'seconds', 'requests', 'errors', 'throughput',
+              'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['label', 'revision'] + fields, extrasaction='ignore')
+        writer.writeheader()
+        for row in results:
+            writer.writerow({'label': label, 'revision': run['revision'], **row})
+    return base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000', help='base URL of the running server')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--clients', type=int, default=16, help='concurrent clients per scenario')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per scenario')
+    parser.add_argument('--users', type=int, default=5000, help='user count of the seeded dataset')
+    parser.add_argument('--password', default=PASSWORD)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--manifest', help="seed_dataset.py --manifest file, recorded with the results; its anchor_date stands in for today")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results'),
+                        help='directory for the JSON and CSV results')
+    parser.add_argument('--label', help='result file name (default: timestamp)')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    base_url = args.url.rstrip('/')
+    dataset, today = None, date.today()
+    if args.manifest:
+        with open(args.manifest) as f:
+            dataset = json.load(f)
+        args.users = dataset.get('users', args.users)
+        if dataset.get('anchor_date'):
+            today = date.fromisoformat(dataset['anchor_date'])
+
+    faculty = [Client(base_url, user_id, args.password, department_id, meetings, args.users, today)
+               for user_id, department_id, meetings in pick_organizers(args.clients, args.seed, today)]
+    admins = [Client(base_url, ADMIN_ID, args.password, users=args.users, today=today)
+              for _ in range(args.clients)]
+    for client in faculty + admins:
+        client.login()
+
+    run = {
+        'label': args.label or datetime.now().strftime('%Y%m%d-%H%M%S'),
+        'revision': git_revision(),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'url': base_url,
+        'clients': args.clients,
+        'duration': args.duration,
+        'dataset': dataset,
+    }
+    print(f"{'scenario':>20} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    results = []
+    for name in names:
+        result = run_scenario(name, admins if SCENARIOS[name][1] else faculty, args.duration)
+        results.append(result)
+        print(f"{name:>20} {result['throughput']:>9.1f} {result['p50_ms']:>9.1f} "
+              f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+    base = write_results(args.out, run['label'], run, results)
+    print(f"✅ Results written to {base}.json and {base}.csv")
+
+
+if __name__ == '__main__':
+    main()
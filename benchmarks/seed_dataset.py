@@ -0,0 +1,191 @@
+"""
+Seed DATABASE_URL with a synthetic, reproducible dataset for load tests.
+
+Applies the migrations, then bulk-loads departments, users, meetings and
+participants with COPY. The same --seed, sizes and --anchor-date always
+produce the same rows, so runs of load_test.py against different builds are
+comparable. Meeting dates run from --past-days before --anchor-date to
+--future-days after it; pass --anchor-date to move the window forward.
+
+Every user's password is --password (hashed once with the app's
+PASSWORD_HASH_METHOD, so logins cost what they cost in production); user 1
+is the admin, everyone else is faculty.
+
+    DATABASE_URL=postgresql://.../bench python benchmarks/seed_dataset.py --reset
+    python benchmarks/seed_dataset.py --users 500 --departments 20 --meetings 50000 --reset
+
+--reset TRUNCATEs the app's tables first. Point it at a scratch database.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import psycopg2
+from werkzeug.security import generate_password_hash
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import PASSWORD_HASH_METHOD, get_database_url  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+PASSWORD = 'bench-password'
+COPY_CHUNK = 50000
+ADMIN_ID = 1
+ANCHOR_DATE = date(2026, 1, 5)
+
+# Tables TRUNCATEd by --reset, if they exist in this schema.
+SEEDED_TABLES = ['meeting_participant', 'meeting', 'meeting_tombstone', '"user"', 'department',
+                 'registration_requests', 'email_outbox', 'department_calendar_version',
+                 'user_calendar_version']
+
+TITLE_WORDS = ['Budget', 'Curriculum', 'Review', 'Planning', 'Committee', 'Exam', 'Research',
+               'Placement', 'Syllabus', 'Faculty', 'Board', 'Audit', 'Admissions', 'Lab', 'Seminar']
+VENUES = ['Room 101', 'Room 204', 'Seminar Hall', 'Board Room', 'Library', 'Online']
+DURATIONS = [30, 45, 60, 90, 120]
+
+
+def copy_rows(cursor, table, columns, rows):
+    """COPY an iterable of tuples into table, COPY_CHUNK rows per statement."""
+    total, buf = 0, io.StringIO()
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    for row in rows:
+        buf.write('\t'.join(str(value) for value in row))
+        buf.write('\n')
+        total += 1
+        if total % COPY_CHUNK == 0:
+            buf.seek(0)
+            cursor.copy_expert(statement, buf)
+            buf = io.StringIO()
+    if buf.tell():
+        buf.seek(0)
+        cursor.copy_expert(statement, buf)
+    return total
+
+
+def reset(cursor):
+    existing = []
+    for table in SEEDED_TABLES:
+        cursor.execute("SELECT to_regclass(%s)", (table,))
+        if cursor.fetchone()[0]:
+            existing.append(table)
+    cursor.execute(f"TRUNCATE {', '.join(existing)} RESTART IDENTITY CASCADE")
+
+
+def user_rows(args, rng, password_hash):
+    for user_id in range(1, args.users + 1):
+        role_id = 100 if user_id == ADMIN_ID else 101
+        yield (user_id, f"Bench User {user_id}", f"user{user_id}@bench.example",
+               f"9{user_id:09d}", password_hash, rng.randint(1, args.departments), role_id)
+
+
+def meeting_rows(args, rng, departments):
+    """Yield (meeting row, participant ids); organizers are faculty, in their own department."""
+    first_day = args.anchor_date - timedelta(days=args.past_days)
+    span = args.past_days + args.future_days
+    for meeting_id in range(1, args.meetings + 1):
+        organizer = rng.randint(2, args.users)
+        day = first_day + timedelta(days=rng.randint(0, span))
+        start = 8 * 60 + rng.randrange(0, 40) * 15
+        end = min(start + rng.choice(DURATIONS), 23 * 60 + 59)
+        title = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {meeting_id}"
+        invited = rng.sample(range(2, args.users + 1), min(args.participants, args.users - 1))
+        participants = {organizer, *invited[:rng.randint(1, len(invited))]}
+        yield ((meeting_id, title, day, f"{start // 60:02d}:{start % 60:02d}",
+                f"{end // 60:02d}:{end % 60:02d}", organizer, departments[organizer],
+                rng.choice(VENUES)), participants)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--departments', type=int, default=200)
+    parser.add_argument('--meetings', type=int, default=1000000)
+    parser.add_argument('--participants', type=int, default=6, help='max invitees per meeting')
+    parser.add_argument('--anchor-date', type=date.fromisoformat, default=ANCHOR_DATE,
+                        help='YYYY-MM-DD the meeting dates are spread around (default: %(default)s)')
+    parser.add_argument('--past-days', type=int, default=365, help='meeting dates start this far back')
+    parser.add_argument('--future-days', type=int, default=180, help='and run this far ahead')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--password', default=PASSWORD)
+    parser.add_argument('--reset', action='store_true', help='TRUNCATE the app tables first')
+    parser.add_argument('--manifest', help='write the dataset parameters and row counts here (JSON)')
+    args = parser.parse_args()
+    if args.users < 2:
+        parser.error('--users must be at least 2 (user 1 is the admin)')
+
+    rng = random.Random(args.seed)
+    conn = psycopg2.connect(get_database_url())
+    migrate(conn)
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT count(*) FROM "user"')
+    if cursor.fetchone()[0] and not args.reset:
+        raise SystemExit('❌ Database already has users; pass --reset to replace them.')
+    if args.reset:
+        reset(cursor)
+
+    # Monthly partitions for the whole date span, so nothing is loaded into the DEFAULT ones.
+    cursor.execute("""
+        SELECT count(*) FILTER (WHERE create_meeting_partition(month::date))
+        FROM generate_series(date_trunc('month', %s::date - %s), %s::date + %s, INTERVAL '1 month') AS month
+    """, (args.anchor_date, args.past_days, args.anchor_date, args.future_days))
+    conn.commit()
+
+    started = time.perf_counter()
+    password_hash = generate_password_hash(args.password, PASSWORD_HASH_METHOD)
+    copy_rows(cursor, 'department', ['department_id', 'department_name'],
+              ((d, f"Department {d}") for d in range(1, args.departments + 1)))
+
+    users = list(user_rows(args, rng, password_hash))
+    departments = {row[0]: row[5] for row in users}
+    copy_rows(cursor, '"user"', ['user_id', 'user_name', 'email', 'user_mobileno', 'password_hash',
+                                 'department_id', 'role_id'], users)
+    print(f"✅ {args.departments} departments, {args.users} users")
+
+    # Meetings and participants are loaded in lock-step chunks so neither list is held in memory.
+    meeting_count = participant_count = 0
+    generator = meeting_rows(args, rng, departments)
+    while meeting_count < args.meetings:
+        meetings, participants = [], []
+        for row, members in generator:
+            meetings.append(row)
+            participants.extend((row[0], user_id, row[2]) for user_id in sorted(members))
+            if len(meetings) == COPY_CHUNK:
+                break
+        meeting_count += copy_rows(cursor, 'meeting', ['meeting_id', 'meeting_title', 'meeting_date',
+                                                       'start_time', 'end_time', 'user_id',
+                                                       'department_id', 'venue'], meetings)
+        participant_count += copy_rows(cursor, 'meeting_participant', ['meeting_id', 'user_id', 'meeting_date'],
+                                       participants)
+        conn.commit()
+        print(f"   {meeting_count}/{args.meetings} meetings")
+
+    for table, column in [('department', 'department_id'), ('"user"', 'user_id'),
+                          ('meeting', 'meeting_id'), ('meeting_participant', 'participant_id')]:
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence(%s, %s), "
+                       f"(SELECT coalesce(max({column}), 0) + 1 FROM {table}), false)",
+                       (table, column))
+    conn.commit()
+
+    conn.autocommit = True
+    cursor.execute("ANALYZE")
+    elapsed = time.perf_counter() - started
+    print(f"✅ {meeting_count} meetings, {participant_count} participants in {elapsed:.1f}s")
+
+    if args.manifest:
+        with open(args.manifest, 'w') as f:
+            json.dump({'seed': args.seed, 'users': args.users, 'departments': args.departments,
+                       'meetings': meeting_count, 'participants': participant_count,
+                       'past_days': args.past_days, 'future_days': args.future_days,
+                       'admin_user_id': ADMIN_ID, 'anchor_date': args.anchor_date.isoformat(),
+                       'seeded_on': date.today().isoformat(),
+                       'seconds': round(elapsed, 1)}, f, indent=2)
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Apply the SQL files in migrations/ to DATABASE_URL, in version order.
+
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # show applied / pending versions
+    python migrate.py --verify   # check the hot queries are served by indexes
+
+Each file is named <version>_<name>.sql and runs in its own transaction;
+applied versions are recorded in the schema_migrations table. A file whose
+first line is "-- migrate: no-transaction" (needed for CREATE INDEX
+CONCURRENTLY) runs statement by statement in autocommit mode instead, so
+its statements must be idempotent.
+
+--verify EXPLAINs each query in HOT_QUERIES (taken from app.py) and checks
+that its table is reached through an index condition. Sequential scans are
+disabled while it runs, so the check is "an index can serve this predicate"
+rather than "the planner picks it on this (maybe tiny) database".
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date, timedelta
+
+import psycopg2
+
+from app import (BUSY_QUERY, CONFLICT_DATES_QUERY, CONFLICT_DAY_QUERY, CONFLICT_QUERY,
+                 DEPARTMENT_EVENTS_QUERY, DEPARTMENT_SERIES_QUERY, LOGIN_BY_EMAIL, LOGIN_BY_ID,
+                 MEETING_MEMBERS_QUERY, PENDING_REQUESTS_QUERY, PREPARED_STATEMENTS, REQUEST_BY_EMAIL,
+                 RETENTION_BATCH_QUERY, SERIES_EXCEPTIONS_QUERY, SERIES_FOR_USERS_QUERY, USER_BY_MOBILE, get_database_url)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+NO_TRANSACTION = '-- migrate: no-transaction'
+
+
+def load_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if filename.endswith('.sql'):
+            version = filename.split('_', 1)[0]
+            with open(os.path.join(MIGRATIONS_DIR, filename)) as f:
+                migrations.append((version, filename, f.read()))
+    return migrations
+
+
+def split_statements(sql):
+    """Split a no-transaction migration into statements (one per ';' at end of line)."""
+    statements, current = [], []
+    for line in sql.splitlines():
+        if line.strip().startswith('--') and not current:
+            continue
+        current.append(line)
+        if line.rstrip().endswith(';'):
+            statements.append('\n'.join(current))
+            current = []
+    if ''.join(current).strip():
+        statements.append('\n'.join(current))
+    return [s.strip() for s in statements if s.strip()]
+
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) PRIMARY KEY,
+            filename TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    conn.commit()
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(conn):
+    done = applied_versions(conn)
+    pending = [m for m in load_migrations() if m[0] not in done]
+    for version, filename, sql in pending:
+        cursor = conn.cursor()
+        try:
+            if sql.startswith(NO_TRANSACTION):
+                conn.autocommit = True
+                for statement in split_statements(sql):
+                    cursor.execute(statement)
+                conn.autocommit = False
+            else:
+                cursor.execute(sql)
+            cursor.execute("INSERT INTO schema_migrations (version, filename) VALUES (%s, %s)",
+                           (version, filename))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            conn.autocommit = False
+            print(f"❌ {filename} failed")
+            raise
+        print(f"✅ Applied {filename}")
+    if not pending:
+        print("Database is up to date.")
+
+
+TODAY = date.today()
+
+# (label, query, sample parameters, table that must be read through an index)
+HOT_QUERIES = [
+    ('conflict check', PREPARED_STATEMENTS[CONFLICT_QUERY][0],
+     (TODAY, [1, 2, 3], '09:00', '10:00', 0), 'meeting'),
+    ('conflict index day load', PREPARED_STATEMENTS[CONFLICT_DAY_QUERY][0], (TODAY,), 'meeting'),
+    ('series conflict dates', PREPARED_STATEMENTS[CONFLICT_DATES_QUERY][0],
+     ([TODAY, TODAY + timedelta(days=7)], [1, 2, 3], '09:00', '10:00'), 'meeting'),
+    ('series of participants', PREPARED_STATEMENTS[SERIES_FOR_USERS_QUERY][0],
+     ([1, 2, 3], TODAY, TODAY), 'meeting_series_participant'),
+    ('series exceptions', PREPARED_STATEMENTS[SERIES_EXCEPTIONS_QUERY][0],
+     ([1, 2], TODAY, TODAY, TODAY, TODAY), 'meeting_series_exception'),
+    ('department series window', DEPARTMENT_SERIES_QUERY,
+     (1, TODAY, TODAY + timedelta(days=42)), 'meeting_series'),
+    ('free-slot busy intervals', PREPARED_STATEMENTS[BUSY_QUERY][0],
+     ([1, 2, 3], TODAY, TODAY + timedelta(days=13)), 'meeting_participant'),
+    ('login by user id', PREPARED_STATEMENTS[LOGIN_BY_ID][0], (1,), 'user'),
+    ('login by email', PREPARED_STATEMENTS[LOGIN_BY_EMAIL][0], ('someone@example.com',), 'user'),
+    ('registration mobile check', USER_BY_MOBILE, ('9876543210',), 'user'),
+    ('registration request check', REQUEST_BY_EMAIL, ('someone@example.com',), 'registration_requests'),
+    ('pending registrations', PENDING_REQUESTS_QUERY, None, 'registration_requests'),
+    ('department calendar window', DEPARTMENT_EVENTS_QUERY,
+     (1, TODAY, TODAY + timedelta(days=42)), 'meeting'),
+    ('meeting members', MEETING_MEMBERS_QUERY, (1,), 'meeting_participant'),
+    ('retention batch', RETENTION_BATCH_QUERY, (0, 500), 'meeting'),
+]
+
+
+def index_scanned(plan, table):
+    """True if some node of an EXPLAIN (FORMAT JSON) plan reads table (or one of its monthly
+    partitions) through an index condition."""
+    if re.fullmatch(rf'{table}(_\d{{6}}|_default)?', plan.get('Relation Name', '')) and ('Index Cond' in plan or plan['Node Type'] == 'Bitmap Heap Scan'):
+        return True
+    return any(index_scanned(child, table) for child in plan.get('Plans', []))
+
+
+def verify(conn):
+    cursor = conn.cursor()
+    cursor.execute("SET enable_seqscan = off")
+    failures = 0
+    for label, query, params, table in HOT_QUERIES:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cursor.fetchone()[0][0]['Plan']
+        if index_scanned(plan, table):
+            print(f"✅ {label}: {table} read through an index")
+        else:
+            failures += 1
+            print(f"❌ {label}: no index condition on {table}")
+    conn.rollback()
+    return failures == 0
+
+
+def status(conn):
+    done = applied_versions(conn)
+    for version, filename, _ in load_migrations():
+        print(f"{'applied' if version in done else 'pending':>8}  {filename}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument('--status', action='store_true', help='list migrations without applying them')
+    parser.add_argument('--verify', action='store_true', help='check the hot queries use indexes')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(get_database_url())
+    try:
+        if args.status:
+            status(conn)
+        elif args.verify:
+            if not verify(conn):
+                sys.exit(1)
+        else:
+            migrate(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,57 @@
+-- Baseline schema: the tables app.py has always expected to exist. Every
+-- statement is IF NOT EXISTS / ON CONFLICT DO NOTHING, so on a database that
+-- predates the migrations directory this only records the baseline as applied;
+-- on an empty database it creates the schema the later migrations build on.
+CREATE TABLE IF NOT EXISTS role (
+    role_id INTEGER PRIMARY KEY,
+    role_name VARCHAR(50) NOT NULL
+);
+
+-- app.py relies on these two ids: 100 is the admin role, 101 the role
+-- approved registrations get.
+INSERT INTO role (role_id, role_name) VALUES (100, 'Admin'), (101, 'Faculty')
+ON CONFLICT (role_id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS department (
+    department_id SERIAL PRIMARY KEY,
+    department_name VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS "user" (
+    user_id SERIAL PRIMARY KEY,
+    user_name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL,
+    user_mobileno VARCHAR(15),
+    password_hash TEXT NOT NULL,
+    department_id INTEGER,
+    role_id INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS meeting (
+    meeting_id SERIAL PRIMARY KEY,
+    meeting_title VARCHAR(200) NOT NULL,
+    meeting_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    user_id INTEGER NOT NULL,              -- organizer
+    department_id INTEGER,
+    venue VARCHAR(200)
+);
+
+CREATE TABLE IF NOT EXISTS meeting_participant (
+    participant_id SERIAL PRIMARY KEY,
+    meeting_id INTEGER NOT NULL REFERENCES meeting (meeting_id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES "user" (user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS registration_requests (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) NOT NULL,
+    user_mobileno VARCHAR(15),
+    password_hash TEXT NOT NULL,
+    role_id INTEGER,
+    department_id INTEGER,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',   -- pending | approved | rejected
+    created_at TIMESTAMP NOT NULL DEFAULT now()
+);
@@ -0,0 +1,17 @@
+-- Outbox for notification emails. Requests insert rows; the outbox worker
+-- (see "EMAIL OUTBOX" in app.py) delivers them over a reused SMTP session.
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    recipients TEXT[] NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'pending',   -- pending | sent | dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    sent_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS email_outbox_due_idx
+    ON email_outbox (next_attempt_at) WHERE status = 'pending';
@@ -0,0 +1,28 @@
+-- migrate: no-transaction
+-- Indexes behind search_condition() in app.py: pg_trgm GIN indexes make
+-- ILIKE '%keyword%' an index lookup, and the foreign-key btrees let the
+-- department / creator / role arms of a search join the same BitmapOr.
+-- Built CONCURRENTLY so live traffic is not blocked; if a build fails, drop the
+-- INVALID index it leaves behind and re-run.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_title_trgm_idx
+    ON meeting USING gin (meeting_title gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_department_id_idx
+    ON meeting (department_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_user_id_idx
+    ON meeting (user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_name_trgm_idx
+    ON "user" USING gin (user_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_email_trgm_idx
+    ON "user" USING gin (email gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_department_id_idx
+    ON "user" (department_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_role_id_idx
+    ON "user" (role_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS department_name_trgm_idx
+    ON department USING gin (department_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS role_name_trgm_idx
+    ON role USING gin (role_name gin_trgm_ops);
@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- Login resolves the identifier to either user_id (primary key) or email and
+-- runs an equality lookup; this btree serves the email side. The trigram
+-- index from 0002 can answer '=' too, but only through a slower bitmap scan.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_email_idx
+    ON "user" (email);
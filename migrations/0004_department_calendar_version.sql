@@ -0,0 +1,45 @@
+-- Per-department change version for the department calendar feed. Statement
+-- triggers on meeting bump the row of every department an INSERT / UPDATE /
+-- DELETE touched (once per statement, so a bulk COPY costs one upsert per
+-- department), whichever code path made the change. The feed derives its
+-- ETag / Last-Modified from (version, changed_at).
+CREATE TABLE IF NOT EXISTS department_calendar_version (
+    department_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_department_calendar() RETURNS trigger AS $$
+DECLARE
+    changed INTEGER[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changed := ARRAY(SELECT department_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        changed := ARRAY(SELECT department_id FROM old_rows);
+    ELSE
+        changed := ARRAY(SELECT department_id FROM new_rows UNION ALL SELECT department_id FROM old_rows);
+    END IF;
+
+    -- Sorted so concurrent writers lock the version rows in the same order.
+    INSERT INTO department_calendar_version AS v (department_id)
+    SELECT DISTINCT d FROM unnest(changed) AS d WHERE d IS NOT NULL ORDER BY d
+    ON CONFLICT (department_id) DO UPDATE SET version = v.version + 1, changed_at = now();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS meeting_calendar_insert ON meeting;
+CREATE TRIGGER meeting_calendar_insert AFTER INSERT ON meeting
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+
+DROP TRIGGER IF EXISTS meeting_calendar_update ON meeting;
+CREATE TRIGGER meeting_calendar_update AFTER UPDATE ON meeting
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+
+DROP TRIGGER IF EXISTS meeting_calendar_delete ON meeting;
+CREATE TRIGGER meeting_calendar_delete AFTER DELETE ON meeting
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
@@ -0,0 +1,8 @@
+-- migrate: no-transaction
+-- Serves the department calendar feed's range scan
+-- (department_id = ? AND meeting_date >= ? AND meeting_date < ?). It also
+-- covers every lookup by department_id alone, so the single-column index
+-- from 0002 is dropped once this one exists.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_department_date_idx
+    ON meeting (department_id, meeting_date);
+DROP INDEX CONCURRENTLY IF EXISTS meeting_department_id_idx;
@@ -0,0 +1,100 @@
+-- Change tracking behind the ICS calendar feeds.
+--  * meeting.updated_at is stamped on every insert/update; a sync-token poll
+--    returns the meetings stamped after its token.
+--  * meeting_tombstone records meetings that left a feed (meeting deleted or
+--    moved to another department, participant removed) so a sync-token poll
+--    can send them as STATUS:CANCELLED. Rows older than ICS_SYNC_MAX_AGE are
+--    pruned; older tokens get the full feed instead.
+--  * user_calendar_version is the per-user counterpart of
+--    department_calendar_version (0004): bumped, in commit order, whenever a
+--    meeting the user takes part in changes. The feeds' ETags come from these.
+ALTER TABLE meeting ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE TABLE IF NOT EXISTS meeting_tombstone (
+    meeting_id INTEGER NOT NULL,
+    user_id INTEGER,
+    department_id INTEGER,
+    removed_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+CREATE INDEX IF NOT EXISTS meeting_tombstone_user_idx
+    ON meeting_tombstone (user_id, removed_at) WHERE user_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS meeting_tombstone_department_idx
+    ON meeting_tombstone (department_id, removed_at) WHERE department_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS meeting_tombstone_removed_at_idx
+    ON meeting_tombstone (removed_at);
+
+CREATE TABLE IF NOT EXISTS user_calendar_version (
+    user_id INTEGER PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION stamp_meeting_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS meeting_stamp_updated_at ON meeting;
+CREATE TRIGGER meeting_stamp_updated_at BEFORE INSERT OR UPDATE ON meeting
+    FOR EACH ROW EXECUTE FUNCTION stamp_meeting_updated_at();
+
+CREATE OR REPLACE FUNCTION bump_user_calendars(user_ids INTEGER[]) RETURNS void AS $$
+    -- Sorted so concurrent writers lock the version rows in the same order.
+    INSERT INTO user_calendar_version AS v (user_id)
+    SELECT DISTINCT u FROM unnest(user_ids) AS u WHERE u IS NOT NULL ORDER BY u
+    ON CONFLICT (user_id) DO UPDATE SET version = v.version + 1, changed_at = now();
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION track_participant_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_calendars(ARRAY(SELECT user_id FROM new_rows));
+    ELSE
+        INSERT INTO meeting_tombstone (meeting_id, user_id)
+        SELECT meeting_id, user_id FROM old_rows;
+        PERFORM bump_user_calendars(ARRAY(SELECT user_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_meeting_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO meeting_tombstone (meeting_id, department_id)
+        SELECT meeting_id, department_id FROM old_rows;
+    ELSE
+        INSERT INTO meeting_tombstone (meeting_id, department_id)
+        SELECT o.meeting_id, o.department_id
+        FROM old_rows o JOIN new_rows n ON n.meeting_id = o.meeting_id
+        WHERE o.department_id IS DISTINCT FROM n.department_id;
+    END IF;
+    PERFORM bump_user_calendars(ARRAY(
+        SELECT p.user_id FROM meeting_participant p
+        WHERE p.meeting_id IN (SELECT meeting_id FROM old_rows)
+    ));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS participant_feed_insert ON meeting_participant;
+CREATE TRIGGER participant_feed_insert AFTER INSERT ON meeting_participant
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_participant_changes();
+
+DROP TRIGGER IF EXISTS participant_feed_delete ON meeting_participant;
+CREATE TRIGGER participant_feed_delete AFTER DELETE ON meeting_participant
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_participant_changes();
+
+DROP TRIGGER IF EXISTS meeting_feed_update ON meeting;
+CREATE TRIGGER meeting_feed_update AFTER UPDATE ON meeting
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_meeting_changes();
+
+DROP TRIGGER IF EXISTS meeting_feed_delete ON meeting;
+CREATE TRIGGER meeting_feed_delete AFTER DELETE ON meeting
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_meeting_changes();
@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- Participant lookups by meeting: the participant_count subquery of
+-- MEETING_LIST_SELECT (run once per row by the meeting export), the member
+-- list/export and the DELETE in edit_meeting / delete_meeting.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_participant_meeting_id_idx
+    ON meeting_participant (meeting_id, user_id);
@@ -0,0 +1,19 @@
+-- migrate: no-transaction
+-- Index pack for the hot paths; `python migrate.py --verify` checks that the
+-- queries behind them (HOT_QUERIES in migrate.py) are answered through these.
+--   conflict checks / conflict index loads: meeting by date and time
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_date_start_idx
+    ON meeting (meeting_date, start_time);
+--   "my meetings", free slots, ICS user feed: participant rows by user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS meeting_participant_user_idx
+    ON meeting_participant (user_id, meeting_id);
+--   login and registration duplicate checks (user_email_idx also comes from 0003)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_email_idx
+    ON "user" (email);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_mobileno_idx
+    ON "user" (user_mobileno);
+--   pending registration list (newest first) and the duplicate-request check
+CREATE INDEX CONCURRENTLY IF NOT EXISTS registration_requests_status_created_idx
+    ON registration_requests (status, created_at);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS registration_requests_email_idx
+    ON registration_requests (email);
@@ -0,0 +1,68 @@
+-- Recurring meetings. A series is one row holding an RRULE subset
+-- (app.py: Recurrence) anchored at first_date; its occurrences are never
+-- stored, only expanded for the date window a check or view asks for.
+-- last_date is the last date the rule produces (UNTIL, or derived from
+-- COUNT when the series is saved), so "series that can touch this window"
+-- is a range test on (first_date, last_date).
+CREATE TABLE IF NOT EXISTS meeting_series (
+    series_id SERIAL PRIMARY KEY,
+    meeting_title VARCHAR(200) NOT NULL,
+    rrule TEXT NOT NULL,                   -- e.g. FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,TH;UNTIL=20270630
+    first_date DATE NOT NULL,
+    last_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES "user" (user_id) ON DELETE CASCADE,   -- organizer
+    department_id INTEGER,
+    venue VARCHAR(200),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    CHECK (first_date <= last_date)
+);
+
+CREATE INDEX IF NOT EXISTS meeting_series_user_idx ON meeting_series (user_id);
+CREATE INDEX IF NOT EXISTS meeting_series_department_span_idx
+    ON meeting_series (department_id, last_date, first_date);
+
+CREATE TABLE IF NOT EXISTS meeting_series_participant (
+    series_id INTEGER NOT NULL REFERENCES meeting_series (series_id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES "user" (user_id) ON DELETE CASCADE,
+    PRIMARY KEY (series_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS meeting_series_participant_user_idx
+    ON meeting_series_participant (user_id, series_id);
+
+-- One row per occurrence that differs from the rule: cancelled, or moved /
+-- retimed / relocated (the non-NULL columns override the series' values).
+-- Moved occurrences stay within the series' first_date..last_date.
+CREATE TABLE IF NOT EXISTS meeting_series_exception (
+    series_id INTEGER NOT NULL REFERENCES meeting_series (series_id) ON DELETE CASCADE,
+    occurrence_date DATE NOT NULL,
+    cancelled BOOLEAN NOT NULL DEFAULT FALSE,
+    meeting_date DATE,
+    start_time TIME,
+    end_time TIME,
+    venue VARCHAR(200),
+    PRIMARY KEY (series_id, occurrence_date)
+);
+
+CREATE INDEX IF NOT EXISTS meeting_series_exception_moved_idx
+    ON meeting_series_exception (series_id, meeting_date) WHERE meeting_date IS NOT NULL;
+
+-- Series changes show up in the department calendar like meeting changes
+-- (bump_department_calendar is from 0004). Exception writes touch the
+-- series' updated_at, which fires the update trigger.
+DROP TRIGGER IF EXISTS meeting_series_calendar_insert ON meeting_series;
+CREATE TRIGGER meeting_series_calendar_insert AFTER INSERT ON meeting_series
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+
+DROP TRIGGER IF EXISTS meeting_series_calendar_update ON meeting_series;
+CREATE TRIGGER meeting_series_calendar_update AFTER UPDATE ON meeting_series
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+
+DROP TRIGGER IF EXISTS meeting_series_calendar_delete ON meeting_series;
+CREATE TRIGGER meeting_series_calendar_delete AFTER DELETE ON meeting_series
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
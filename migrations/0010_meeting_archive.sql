@@ -0,0 +1,65 @@
+-- Retention (app.py: run_retention) moves past meetings and their
+-- participants here in small batches instead of deleting them in one
+-- statement. No foreign keys: archived rows outlive deleted users.
+CREATE TABLE IF NOT EXISTS meeting_archive (
+    meeting_id INTEGER PRIMARY KEY,
+    meeting_title VARCHAR(200) NOT NULL,
+    meeting_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    user_id INTEGER NOT NULL,
+    department_id INTEGER,
+    venue VARCHAR(200),
+    updated_at TIMESTAMPTZ,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS meeting_archive_date_idx ON meeting_archive (meeting_date);
+
+CREATE TABLE IF NOT EXISTS meeting_participant_archive (
+    participant_id INTEGER PRIMARY KEY,
+    meeting_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS meeting_participant_archive_meeting_idx ON meeting_participant_archive (meeting_id);
+CREATE INDEX IF NOT EXISTS meeting_participant_archive_user_idx ON meeting_participant_archive (user_id);
+
+-- Archiving a past meeting is not a cancellation: with app.archiving = 'on'
+-- (SET LOCAL by the retention batch) the feed triggers from 0006 skip the
+-- tombstones, so subscribed calendars keep their history. The version bumps
+-- still happen, since the feeds' content did change.
+CREATE OR REPLACE FUNCTION track_participant_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_calendars(ARRAY(SELECT user_id FROM new_rows));
+    ELSE
+        IF current_setting('app.archiving', true) IS DISTINCT FROM 'on' THEN
+            INSERT INTO meeting_tombstone (meeting_id, user_id)
+            SELECT meeting_id, user_id FROM old_rows;
+        END IF;
+        PERFORM bump_user_calendars(ARRAY(SELECT user_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_meeting_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        IF current_setting('app.archiving', true) IS DISTINCT FROM 'on' THEN
+            INSERT INTO meeting_tombstone (meeting_id, department_id)
+            SELECT meeting_id, department_id FROM old_rows;
+        END IF;
+    ELSE
+        INSERT INTO meeting_tombstone (meeting_id, department_id)
+        SELECT o.meeting_id, o.department_id
+        FROM old_rows o JOIN new_rows n ON n.meeting_id = o.meeting_id
+        WHERE o.department_id IS DISTINCT FROM n.department_id;
+    END IF;
+    PERFORM bump_user_calendars(ARRAY(
+        SELECT p.user_id FROM meeting_participant p
+        WHERE p.meeting_id IN (SELECT meeting_id FROM old_rows)
+    ));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,147 @@
+-- Monthly range partitioning of meeting and meeting_participant on
+-- meeting_date. meeting_participant gets its own meeting_date column (kept
+-- equal to its meeting's through the foreign key's ON UPDATE CASCADE) so a
+-- participant row lives in the same month as its meeting, and a query that
+-- joins the two on (meeting_id, meeting_date) and filters the date only
+-- reads the matching month of each table.
+--
+-- Partitions are meeting_YYYYMM / meeting_participant_YYYYMM, plus a
+-- DEFAULT partition each for dates nobody created a month for yet.
+-- create_meeting_partition() adds a month (moving any rows the default
+-- partitions already hold for it); app.py's maintain_partitions() calls it
+-- ahead of time and detaches old months.
+--
+-- Needs PostgreSQL 13+ (BEFORE ROW triggers on partitioned tables). The
+-- tables are rebuilt and copied inside this migration's transaction, so
+-- run it in a maintenance window on a large database.
+
+ALTER TABLE meeting_participant RENAME TO meeting_participant_unpartitioned;
+ALTER TABLE meeting_participant_unpartitioned
+    RENAME CONSTRAINT meeting_participant_pkey TO meeting_participant_unpartitioned_pkey;
+ALTER TABLE meeting RENAME TO meeting_unpartitioned;
+ALTER TABLE meeting_unpartitioned RENAME CONSTRAINT meeting_pkey TO meeting_unpartitioned_pkey;
+
+CREATE TABLE meeting (
+    meeting_id INTEGER NOT NULL DEFAULT nextval('meeting_meeting_id_seq'),
+    meeting_title VARCHAR(200) NOT NULL,
+    meeting_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    user_id INTEGER NOT NULL,              -- organizer
+    department_id INTEGER,
+    venue VARCHAR(200),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (meeting_id, meeting_date)
+) PARTITION BY RANGE (meeting_date);
+
+CREATE TABLE meeting_participant (
+    participant_id INTEGER NOT NULL DEFAULT nextval('meeting_participant_participant_id_seq'),
+    meeting_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES "user" (user_id) ON DELETE CASCADE,
+    meeting_date DATE NOT NULL,
+    PRIMARY KEY (participant_id, meeting_date),
+    FOREIGN KEY (meeting_id, meeting_date) REFERENCES meeting (meeting_id, meeting_date)
+        ON DELETE CASCADE ON UPDATE CASCADE
+) PARTITION BY RANGE (meeting_date);
+
+ALTER SEQUENCE meeting_meeting_id_seq OWNED BY meeting.meeting_id;
+ALTER SEQUENCE meeting_participant_participant_id_seq OWNED BY meeting_participant.participant_id;
+
+CREATE TABLE meeting_default PARTITION OF meeting DEFAULT;
+CREATE TABLE meeting_participant_default PARTITION OF meeting_participant DEFAULT;
+
+-- Adds the month containing `month` to both tables; FALSE if it exists.
+-- The partitions are built standalone and ATTACHed, which locks the parents
+-- far more lightly than CREATE TABLE ... PARTITION OF.
+CREATE OR REPLACE FUNCTION create_meeting_partition(month DATE) RETURNS BOOLEAN AS $$
+DECLARE
+    first_day DATE := date_trunc('month', month)::date;
+    next_day DATE := (date_trunc('month', month) + INTERVAL '1 month')::date;
+    suffix TEXT := to_char(month, 'YYYYMM');
+BEGIN
+    IF to_regclass('meeting_' || suffix) IS NOT NULL THEN
+        RETURN FALSE;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE meeting INCLUDING DEFAULTS)', 'meeting_' || suffix);
+    EXECUTE format('CREATE TABLE %I (LIKE meeting_participant INCLUDING DEFAULTS)',
+                   'meeting_participant_' || suffix);
+
+    -- Rows the default partitions took for this month move to the new one
+    -- (participants first: they reference the meetings).
+    EXECUTE format('WITH moved AS (DELETE FROM meeting_participant_default
+                                   WHERE meeting_date >= %L AND meeting_date < %L RETURNING *)
+                    INSERT INTO %I SELECT * FROM moved', first_day, next_day, 'meeting_participant_' || suffix);
+    EXECUTE format('WITH moved AS (DELETE FROM meeting_default
+                                   WHERE meeting_date >= %L AND meeting_date < %L RETURNING *)
+                    INSERT INTO %I SELECT * FROM moved', first_day, next_day, 'meeting_' || suffix);
+
+    EXECUTE format('ALTER TABLE meeting ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   'meeting_' || suffix, first_day, next_day);
+    EXECUTE format('ALTER TABLE meeting_participant ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   'meeting_participant_' || suffix, first_day, next_day);
+    RETURN TRUE;
+END
+$$ LANGUAGE plpgsql;
+
+-- A month for everything already stored, and the next twelve.
+SELECT create_meeting_partition(month::date)
+FROM generate_series(
+    date_trunc('month', LEAST((SELECT min(meeting_date) FROM meeting_unpartitioned), CURRENT_DATE)),
+    date_trunc('month', CURRENT_DATE) + INTERVAL '12 months',
+    INTERVAL '1 month'
+) AS month;
+
+INSERT INTO meeting (meeting_id, meeting_title, meeting_date, start_time, end_time,
+                     user_id, department_id, venue, updated_at)
+SELECT meeting_id, meeting_title, meeting_date, start_time, end_time,
+       user_id, department_id, venue, updated_at
+FROM meeting_unpartitioned;
+
+INSERT INTO meeting_participant (participant_id, meeting_id, user_id, meeting_date)
+SELECT p.participant_id, p.meeting_id, p.user_id, m.meeting_date
+FROM meeting_participant_unpartitioned p
+JOIN meeting_unpartitioned m ON m.meeting_id = p.meeting_id;
+
+DROP TABLE meeting_participant_unpartitioned;
+DROP TABLE meeting_unpartitioned;
+
+-- The indexes of 0002 / 0005 / 0007 / 0008, now partitioned (one per month).
+CREATE INDEX meeting_title_trgm_idx ON meeting USING gin (meeting_title gin_trgm_ops);
+CREATE INDEX meeting_user_id_idx ON meeting (user_id);
+CREATE INDEX meeting_department_date_idx ON meeting (department_id, meeting_date);
+CREATE INDEX meeting_date_start_idx ON meeting (meeting_date, start_time);
+CREATE INDEX meeting_participant_meeting_id_idx ON meeting_participant (meeting_id, user_id);
+CREATE INDEX meeting_participant_user_idx ON meeting_participant (user_id, meeting_id);
+
+-- The triggers of 0004 / 0006 went with the old tables. Statement triggers
+-- on the partitioned parents see the rows of every partition a statement
+-- touched.
+CREATE TRIGGER meeting_calendar_insert AFTER INSERT ON meeting
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+CREATE TRIGGER meeting_calendar_update AFTER UPDATE ON meeting
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+CREATE TRIGGER meeting_calendar_delete AFTER DELETE ON meeting
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_department_calendar();
+
+CREATE TRIGGER meeting_stamp_updated_at BEFORE INSERT OR UPDATE ON meeting
+    FOR EACH ROW EXECUTE FUNCTION stamp_meeting_updated_at();
+
+CREATE TRIGGER participant_feed_insert AFTER INSERT ON meeting_participant
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_participant_changes();
+CREATE TRIGGER participant_feed_delete AFTER DELETE ON meeting_participant
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_participant_changes();
+CREATE TRIGGER meeting_feed_update AFTER UPDATE ON meeting
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_meeting_changes();
+CREATE TRIGGER meeting_feed_delete AFTER DELETE ON meeting
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_meeting_changes();
+
+ANALYZE meeting;
+ANALYZE meeting_participant;
@@ -0,0 +1,80 @@
+-- Series in the ICS feeds (0006 covers plain meetings).
+--  * meeting_series.updated_at is stamped on every insert/update, like
+--    meeting.updated_at, so a sync-token poll picks up changed series
+--    (exception writes already touch it, see 0009).
+--  * meeting_series_tombstone records series that left a feed (series
+--    deleted or moved to another department, participant removed) so a
+--    sync-token poll can send them as STATUS:CANCELLED.
+--  * Series and series participant changes bump user_calendar_version for
+--    the series' participants; department_calendar_version is bumped by the
+--    0009 triggers.
+CREATE TABLE IF NOT EXISTS meeting_series_tombstone (
+    series_id INTEGER NOT NULL,
+    user_id INTEGER,
+    department_id INTEGER,
+    removed_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+CREATE INDEX IF NOT EXISTS meeting_series_tombstone_user_idx
+    ON meeting_series_tombstone (user_id, removed_at) WHERE user_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS meeting_series_tombstone_department_idx
+    ON meeting_series_tombstone (department_id, removed_at) WHERE department_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS meeting_series_tombstone_removed_at_idx
+    ON meeting_series_tombstone (removed_at);
+
+DROP TRIGGER IF EXISTS meeting_series_stamp_updated_at ON meeting_series;
+CREATE TRIGGER meeting_series_stamp_updated_at BEFORE INSERT OR UPDATE ON meeting_series
+    FOR EACH ROW EXECUTE FUNCTION stamp_meeting_updated_at();
+
+CREATE OR REPLACE FUNCTION track_series_participant_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_user_calendars(ARRAY(SELECT user_id FROM new_rows));
+    ELSE
+        INSERT INTO meeting_series_tombstone (series_id, user_id)
+        SELECT series_id, user_id FROM old_rows;
+        PERFORM bump_user_calendars(ARRAY(SELECT user_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+-- Deleting a series cascades to its participants, whose trigger above
+-- tombstones and bumps the user feeds.
+CREATE OR REPLACE FUNCTION track_series_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO meeting_series_tombstone (series_id, department_id)
+        SELECT series_id, department_id FROM old_rows;
+    ELSE
+        INSERT INTO meeting_series_tombstone (series_id, department_id)
+        SELECT o.series_id, o.department_id
+        FROM old_rows o JOIN new_rows n ON n.series_id = o.series_id
+        WHERE o.department_id IS DISTINCT FROM n.department_id;
+        PERFORM bump_user_calendars(ARRAY(
+            SELECT sp.user_id FROM meeting_series_participant sp
+            WHERE sp.series_id IN (SELECT series_id FROM old_rows)
+        ));
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS series_participant_feed_insert ON meeting_series_participant;
+CREATE TRIGGER series_participant_feed_insert AFTER INSERT ON meeting_series_participant
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_series_participant_changes();
+
+DROP TRIGGER IF EXISTS series_participant_feed_delete ON meeting_series_participant;
+CREATE TRIGGER series_participant_feed_delete AFTER DELETE ON meeting_series_participant
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_series_participant_changes();
+
+DROP TRIGGER IF EXISTS meeting_series_feed_update ON meeting_series;
+CREATE TRIGGER meeting_series_feed_update AFTER UPDATE ON meeting_series
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_series_changes();
+
+DROP TRIGGER IF EXISTS meeting_series_feed_delete ON meeting_series;
+CREATE TRIGGER meeting_series_feed_delete AFTER DELETE ON meeting_series
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION track_series_changes();
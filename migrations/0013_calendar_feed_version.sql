@@ -0,0 +1,4 @@
+-- Calendar feed links (app.py: calendar_feed_url) carry the user's
+-- feed_version; bumping it (POST /calendar/reset) revokes every link
+-- issued so far without touching the app secret.
+ALTER TABLE "user" ADD COLUMN IF NOT EXISTS feed_version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,32 @@
+"""
+Unit tests for app.py's pure logic. No database is needed: importing app
+only builds the Flask app, and the tests below stub the query helpers they
+reach. Run from the repository root with `python -m pytest tests`.
+"""
+import os
+import sys
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["EMAIL_OUTBOX_WORKER"] = "0"
+os.environ["RETENTION_WORKER"] = "0"
+os.environ["ACCESS_LOG"] = "0"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytest  # noqa: E402
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    """Flask test client without the background threads (they would try to reach Postgres)."""
+    funcs = app_module.app.before_request_funcs.setdefault(None, [])
+    removed = [f for f in funcs if f is app_module.start_background_workers]
+    for f in removed:
+        funcs.remove(f)
+    app_module.app.config["TESTING"] = True
+    try:
+        yield app_module.app.test_client()
+    finally:
+        funcs.extend(removed)
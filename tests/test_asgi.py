@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+asgi = pytest.importorskip("asgi")
+import app as A
+
+
+def http_scope(path, query=b""):
+    return {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query,
+            "root_path": "", "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80)}
+
+
+async def call(scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi.application(scope, receive, send)
+    return messages
+
+
+@pytest.fixture
+def no_workers(monkeypatch):
+    monkeypatch.setattr(A.app, "before_request_funcs", {None: [A.start_request_timer]})
+
+
+def test_flask_requests_run_concurrently(no_workers, monkeypatch):
+    def slow_view():
+        time.sleep(0.3)
+        return "done"
+    monkeypatch.setitem(A.app.view_functions, "logout", slow_view)
+
+    async def both():
+        return await asyncio.gather(call(http_scope("/logout")), call(http_scope("/logout")))
+
+    started = time.perf_counter()
+    results = asyncio.run(both())
+    assert time.perf_counter() - started < 0.55
+    assert all(messages[0]["status"] == 200 for messages in results)
+
+
+def test_role_cache_and_metrics_stay_off_the_event_loop(monkeypatch):
+    loop_threads, seen = set(), []
+
+    def cached_role(user_id):
+        seen.append(("cached_role", threading.current_thread()))
+        return (0, 0), True, A.ADMIN_ROLE_ID
+
+    def record(request, response, elapsed):
+        seen.append(("record", threading.current_thread()))
+
+    async def fetch(self, query, params=(), fetch='all'):
+        return []
+
+    monkeypatch.setattr(asgi, "cached_role", cached_role)
+    monkeypatch.setattr(asgi, "record", record)
+    monkeypatch.setattr(asgi.Request, "fetch", fetch)
+    monkeypatch.setattr(asgi, "load_session", lambda cookie: {"user_id": 1})
+
+    async def run():
+        loop_threads.add(threading.current_thread())
+        return await call(http_scope("/admin/search-meetings"))
+
+    messages = asyncio.run(run())
+    assert messages[0]["status"] == 200
+    assert [name for name, _ in seen] == ["cached_role", "record"]
+    assert not loop_threads & {thread for _, thread in seen}
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import app as A
+
+
+@pytest.fixture
+def feed_db(monkeypatch):
+    """execute_query for calendar_feed: user 1 at feed_version 2, an empty feed."""
+    queries = []
+
+    def execute_query(query, params=None, fetch='all', **kwargs):
+        queries.append((" ".join(query.split()), params))
+        if 'FROM "user"' in query:
+            return {'user_name': "Ann", 'department_id': 3, 'feed_version': 2}
+        if 'calendar_version' in query:
+            return {'version': 5, 'now': datetime(2099, 6, 1, 12, tzinfo=timezone.utc)}
+        return iter([]) if fetch == 'stream' else []
+    monkeypatch.setattr(A, 'execute_query', execute_query)
+    return queries
+
+
+def feed_path(claims):
+    with A.app.test_request_context():
+        return "/calendar/" + A._feed_serializer().dumps(claims) + ".ics"
+
+
+def test_feed_serves_current_version(client, feed_db):
+    response = client.get(feed_path({'u': 1, 'f': 'user', 'v': 2}))
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).startswith("BEGIN:VCALENDAR")
+    assert A.decode_cursor(response.headers['X-Sync-Token'])
+
+
+@pytest.mark.parametrize('claims', [{'u': 1, 'f': 'user', 'v': 1}, {'u': 1, 'f': 'user'}, {'u': 1, 'f': 'other', 'v': 2}])
+def test_revoked_or_unknown_feed_is_404(client, feed_db, claims):
+    assert client.get(feed_path(claims)).status_code == 404
+
+
+def test_naive_sync_token_falls_back_to_full_feed(client, feed_db):
+    sync = A.encode_cursor(["2099-06-01T11:00:00"])
+    response = client.get(feed_path({'u': 1, 'f': 'user', 'v': 2}) + "?sync=" + sync)
+    assert response.status_code == 200
+    assert not any('%(since)s' in query for query, _ in feed_db)
+
+
+def test_aware_sync_token_sends_changes_only(client, feed_db):
+    sync = A.encode_cursor(["2099-06-01T11:00:00+00:00"])
+    response = client.get(feed_path({'u': 1, 'f': 'user', 'v': 2}) + "?sync=" + sync)
+    assert response.status_code == 200
+    assert any('m.updated_at > %(since)s' in query for query, _ in feed_db)
+
+
+def test_reset_bumps_feed_version(client, feed_db):
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    response = client.post("/calendar/reset")
+    assert response.status_code == 302
+    assert ('UPDATE "user" SET feed_version = feed_version + 1 WHERE user_id = %s', (1,)) in feed_db
@@ -0,0 +1,65 @@
+import random
+from datetime import date, time
+
+import pytest
+
+import app as A
+
+DAY = date(2099, 6, 1)
+
+
+def row(meeting_id, user_id, start, end):
+    return {'meeting_id': meeting_id, 'user_id': user_id, 'user_name': f"User {user_id}",
+            'meeting_title': f"Meeting {meeting_id}", 'meeting_date': DAY,
+            'start_time': start, 'end_time': end, 'meeting_department_name': "Physics"}
+
+
+@pytest.fixture
+def day():
+    return A.DayIndex([
+        row(1, 10, time(9), time(10)),
+        row(2, 10, time(8), time(17)),          # long meeting that starts first
+        row(3, 10, time(11), time(12)),
+        row(3, 20, time(11), time(12)),
+    ])
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (time(9, 30), time(9, 45), {1, 2}),
+    (time(10), time(11), {2}),                  # intervals are half-open: 1 ends, 3 starts
+    (time(11, 30), time(18), {2, 3}),
+    (time(17), time(18), set()),
+    (time(7), time(8), set()),
+])
+def test_overlapping(day, start, end, expected):
+    assert set(day.overlapping(10, start, end)) == expected
+
+
+def test_overlapping_skips_excluded_meeting_and_unknown_users(day):
+    assert set(day.overlapping(10, time(9), time(12), exclude_meeting_id=2)) == {1, 3}
+    assert day.overlapping(99, time(0), time(23)) == []
+
+
+def test_remove_meeting(day):
+    day.remove_meeting(2)
+    assert set(day.overlapping(10, time(8), time(17))) == {1, 3}
+    assert day.overlapping(20, time(8), time(17)) == [3]
+    day.remove_meeting(42)                       # unknown ids are ignored
+
+
+def test_matches_a_linear_scan():
+    rng = random.Random(5)
+    rows = []
+    for meeting_id in range(1, 300):
+        start = rng.randrange(0, 23 * 4)
+        end = start + rng.randint(1, 16)
+        rows.append(row(meeting_id, rng.randint(1, 5), time(start // 4, start % 4 * 15),
+                        time(min(end // 4, 23), end % 4 * 15 if end < 96 else 59)))
+    index = A.DayIndex(rows)
+    for _ in range(200):
+        user_id = rng.randint(1, 5)
+        start = time(rng.randrange(0, 23), rng.choice([0, 15, 30, 45]))
+        end = time(start.hour + 1, start.minute)
+        expected = {r['meeting_id'] for r in rows
+                    if r['user_id'] == user_id and r['start_time'] < end and r['end_time'] > start}
+        assert set(index.overlapping(user_id, start, end)) == expected
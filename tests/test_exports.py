@@ -0,0 +1,42 @@
+from datetime import date
+
+import pytest
+
+import app as A
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('=HYPERLINK("http://x","y")', '\'=HYPERLINK("http://x","y")'),
+    ('+1', "'+1"),
+    ('-2+3', "'-2+3"),
+    ('@SUM(A1)', "'@SUM(A1)"),
+    ('\tcmd', "'\tcmd"),
+    ('Staff meeting', 'Staff meeting'),
+    ('', ''),
+    (-5, -5),
+    (None, None),
+    (date(2099, 6, 1), date(2099, 6, 1)),
+])
+def test_export_cell_neutralises_formulas(value, expected):
+    assert A.export_cell(value) == expected
+
+
+def test_csv_export_quotes_formula_titles():
+    rows = [{'meeting_id': 1, 'meeting_title': '=cmd|"/c calc"!A1', 'venue': '@home'}]
+    columns = [("ID", "meeting_id"), ("Title", "meeting_title"), ("Venue", "venue")]
+    text = "".join(A.csv_stream(columns, rows))
+    assert text.splitlines()[1] == '1,"\'=cmd|""/c calc""!A1",\'@home'
+
+
+def test_member_export_reads_only_the_meeting_date_partition(client, monkeypatch):
+    calls = []
+
+    def execute_query(query, params=None, fetch='all', **kwargs):
+        calls.append((query, params))
+        return {'meeting_date': date(2099, 6, 1)} if fetch == 'one' else iter([])
+    monkeypatch.setattr(A, 'is_admin', lambda: True)
+    monkeypatch.setattr(A, 'execute_query', execute_query)
+    response = client.get("/admin/export-meeting-members/7")
+    assert response.status_code == 200
+    assert calls[-1] == (A.MEETING_MEMBERS_QUERY, (7, date(2099, 6, 1)))
+    assert "mp.meeting_date = %s" in A.MEETING_MEMBERS_QUERY
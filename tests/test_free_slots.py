@@ -0,0 +1,62 @@
+from datetime import date, time
+
+import pytest
+
+import app as A
+
+MONDAY = date(2099, 6, 1)       # far enough ahead that "now" never trims the window
+assert MONDAY.weekday() == 0
+
+
+@pytest.fixture
+def busy(monkeypatch):
+    """Install the rows busy_bitmaps() reads: (user_id, date, 'HH:MM', 'HH:MM')."""
+    def install(*rows):
+        monkeypatch.setattr(A, 'execute_prepared', lambda name, params: [
+            {'user_id': u, 'meeting_date': d, 'start_time': time.fromisoformat(s), 'end_time': time.fromisoformat(e)}
+            for u, d, s, e in rows])
+        monkeypatch.setattr(A, 'participant_series', lambda ids, start, end: [])
+    return install
+
+
+def test_slot_index_rounds_to_quarter_hours():
+    assert A._slot_index(time(9, 0)) == 36
+    assert A._slot_index(time(9, 10)) == 36
+    assert A._slot_index(time(9, 10), round_up=True) == 37
+    assert A._slot_index(time(9, 15), round_up=True) == 37
+    assert A._slot_index(time(9, 15, 30), round_up=True) == 38
+
+
+def test_busy_bitmaps_set_one_bit_per_slot(busy):
+    busy((1, MONDAY, '09:00', '10:00'), (1, MONDAY, '10:00', '10:20'), (2, MONDAY, '09:05', '09:10'))
+    bitmaps = A.busy_bitmaps([1, 2], MONDAY, MONDAY)
+    assert bitmaps[(1, MONDAY)] == ((1 << 6) - 1) << 36      # 09:00-10:30 after rounding out
+    assert bitmaps[(2, MONDAY)] == 1 << 36
+
+
+def test_free_slots_skip_everyone_busy_time(busy):
+    busy((1, MONDAY, '09:00', '10:00'), (2, MONDAY, '10:30', '11:00'))
+    slots = A.find_free_slots([1, 2], MONDAY, MONDAY, time(9), time(12), 30, limit=5)
+    assert [(s['start_time'], s['end_time']) for s in slots] == [
+        ('10:00', '10:30'), ('11:00', '11:30'), ('11:30', '12:00')]
+
+
+def test_free_slots_skip_weekends_unless_asked(busy):
+    busy()
+    saturday = date(2099, 6, 6)
+    assert A.find_free_slots([1], saturday, saturday, time(9), time(10), 60) == []
+    assert len(A.find_free_slots([1], saturday, saturday, time(9), time(10), 60, weekends=True)) == 1
+
+
+def test_duration_longer_than_the_window_finds_nothing(monkeypatch):
+    monkeypatch.setattr(A, 'busy_bitmaps', lambda *a: pytest.fail('should not query'))
+    assert A.find_free_slots([1], MONDAY, MONDAY, time(9), time(17), 10 ** 12) == []
+
+
+def test_route_rejects_duration_beyond_working_hours(client):
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    response = client.get('/faculty/free-slots?duration=1000000000000&day_start=09:00&day_end=17:00')
+    assert response.status_code == 400
+    response = client.get('/faculty/free-slots?duration=481&day_start=09:00&day_end=17:00')
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+import app as A
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setattr(A, '_hash_slots', threading.BoundedSemaphore(1))
+    monkeypatch.setattr(A, 'HASH_TIMEOUT', 0.05)
+    return A._hash_slots
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes(one_slot):
+    release, finished = threading.Event(), threading.Event()
+
+    def slow_hash():
+        release.wait(5)
+        finished.set()
+        return "hash"
+
+    with pytest.raises(A.HashPoolBusy):
+        A.run_hashing(slow_hash)
+    # The first hash is still running on the pool, so there is no free slot.
+    with pytest.raises(A.HashPoolBusy):
+        A.run_hashing(lambda: "other")
+
+    release.set()
+    assert finished.wait(5)
+    for _ in range(100):            # the done-callback runs just after the function returns
+        if one_slot.acquire(timeout=0.05):
+            one_slot.release()
+            break
+    assert A.run_hashing(lambda: "other") == "other"
+
+
+def test_failing_hash_gives_its_slot_back(one_slot):
+    def broken():
+        raise ValueError("bad hash")
+
+    with pytest.raises(ValueError):
+        A.run_hashing(broken)
+    assert A.run_hashing(lambda: "ok") == "ok"
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    monkeypatch.setattr(A, 'execute_prepared', lambda name, params=(), fetch='all', **kw: calls.append((name, params)))
+    return calls
+
+
+@pytest.mark.parametrize('identifier, expected', [
+    (" 42 ", (A.LOGIN_BY_ID, (42,))),
+    ("ann@example.org", (A.LOGIN_BY_EMAIL, ("ann@example.org",))),
+])
+def test_find_login_user_lookups(lookups, identifier, expected):
+    A.find_login_user(identifier)
+    assert lookups == [expected]
+
+
+@pytest.mark.parametrize('identifier', ["²", "١٢", "12²", "9999999999", "ann"])
+def test_find_login_user_rejects_non_ascii_digits_and_junk(lookups, identifier):
+    assert A.find_login_user(identifier) is None
+    assert lookups == []
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import app as A
+
+
+@pytest.fixture
+def no_pool(monkeypatch):
+    monkeypatch.setattr(A, 'pool_stats', lambda: {})
+
+
+def test_metrics_denied_without_token_or_admin(client, no_pool, monkeypatch):
+    monkeypatch.setattr(A, 'METRICS_TOKEN', None)
+    assert client.get("/metrics").status_code == 401
+
+
+def test_metrics_with_token(client, no_pool, monkeypatch):
+    monkeypatch.setattr(A, 'METRICS_TOKEN', "s3cret")
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "# TYPE http_request_duration_seconds histogram" in response.get_data(as_text=True)
+
+
+def test_metrics_for_admins(client, no_pool, monkeypatch):
+    monkeypatch.setattr(A, 'METRICS_TOKEN', None)
+    monkeypatch.setattr(A, 'is_admin', lambda: True)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_snapshots_of_exited_workers_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(A, 'METRICS_DIR', str(tmp_path))
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    snapshot = {'db_queries_total': [[[], 7]]}
+    for pid in (os.getppid(), exited.pid):
+        (tmp_path / f"{pid}.json").write_text(json.dumps(snapshot))
+
+    merged = A.collect_metrics()
+    assert merged['db_queries_total'][()] >= 7
+    assert (tmp_path / f"{os.getppid()}.json").exists()
+    assert not (tmp_path / f"{exited.pid}.json").exists()
+    assert (tmp_path / f"{os.getpid()}.json").exists()
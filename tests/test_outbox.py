@@ -0,0 +1,199 @@
+import contextlib
+import smtplib
+import socket
+
+import pytest
+
+import app as A
+
+
+@pytest.mark.parametrize("attempts, expected", [(1, 30), (2, 60), (3, 120), (7, 1920), (8, 3600), (20, 3600)])
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch, attempts, expected):
+    monkeypatch.setattr(A, 'EMAIL_RETRY_BASE', 30)
+    monkeypatch.setattr(A, 'EMAIL_RETRY_MAX', 3600)
+    assert A.retry_delay(attempts) == expected
+
+
+def test_quota_counts_the_last_minute_only(monkeypatch):
+    monkeypatch.setattr(A, 'EMAIL_RATE_PER_MINUTE', 3)
+    now = A.time.monotonic()
+    session = A.SMTPSession()
+    session.sent_times = [now - 90, now - 30, now - 1]
+    assert session.quota() == 1
+    session.sent_times.append(now)
+    assert session.rate_limited()
+
+
+class FakeOutbox:
+    """email_outbox stand-in for execute_query: claims pending rows, records the UPDATEs."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+        self.transactions = 0
+
+    def execute_query(self, query, params=None, fetch='all', commit=False, **kwargs):
+        sql = " ".join(query.split())
+        if sql.startswith('UPDATE email_outbox SET next_attempt_at'):
+            claimed, self.rows = self.rows[:params[1]], self.rows[params[1]:]
+            return claimed
+        self.updates.append((sql.split(' SET ')[1].split(',')[0], params))
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.transactions += 1
+        yield
+
+
+class FakeSMTP:
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.sent = []
+
+    def quota(self):
+        return 100
+
+    def send(self, recipients, message):
+        if recipients[0] in self.fail_for:
+            raise smtplib.SMTPRecipientsRefused({recipients[0]: (550, b'no such user')})
+        self.sent.append(recipients)
+
+    def close(self):
+        pass
+
+
+def outbox_rows(*specs):
+    return [{'id': i, 'recipients': [address], 'subject': 's', 'body': 'b', 'attempts': attempts}
+            for i, (address, attempts) in enumerate(specs, 1)]
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    def install(rows):
+        fake = FakeOutbox(rows)
+        monkeypatch.setattr(A, 'execute_query', fake.execute_query)
+        monkeypatch.setattr(A, 'transaction', fake.transaction)
+        monkeypatch.setattr(A, 'EMAIL_MAX_ATTEMPTS', 3)
+        return fake
+    return install
+
+
+def test_each_outcome_is_committed_on_its_own(outbox):
+    fake = outbox(outbox_rows(('a@x', 0), ('bad@x', 0), ('dead@x', 2)))
+    smtp = FakeSMTP(fail_for=['bad@x', 'dead@x'])
+    assert A.drain_outbox(smtp) == 3
+    assert smtp.sent == [['a@x']]
+    assert [update[0] for update in fake.updates] == ["status = 'sent'", "attempts = %s", "status = 'dead'"]
+    assert fake.updates[1][1][2] == A.retry_delay(1)
+    assert fake.transactions == 1 + 3        # the claim, then one per message
+
+
+def test_claim_is_limited_by_the_rate(outbox):
+    fake = outbox(outbox_rows(*[(f"u{i}@x", 0) for i in range(10)]))
+    smtp = FakeSMTP()
+    smtp.quota = lambda: 4
+    assert A.drain_outbox(smtp, batch_size=20) == 4
+    assert len(fake.rows) == 6
+
+
+def test_nothing_is_claimed_while_rate_limited(outbox):
+    fake = outbox(outbox_rows(('a@x', 0)))
+    smtp = FakeSMTP()
+    smtp.quota = lambda: 0
+    assert A.drain_outbox(smtp) == 0
+    assert len(fake.rows) == 1
+
+
+
+def test_leader_checks_its_lock_before_every_batch(monkeypatch):
+    batches = []
+
+    class DroppedLock:
+        checks = 0
+
+        def execute(self, query):
+            self.checks += 1
+            if self.checks == 3:
+                raise A.psycopg2.OperationalError("server closed the connection")
+
+    class Session(FakeSMTP):
+        last_used = 0
+
+        def rate_limited(self):
+            return False
+    monkeypatch.setattr(A, 'SMTPSession', Session)
+    monkeypatch.setattr(A, 'drain_outbox', lambda session: batches.append(1) or 50)   # never runs dry
+    with pytest.raises(A.psycopg2.OperationalError):
+        A.drain_forever(DroppedLock())
+    assert len(batches) == 2
+
+def test_smtp_session_delivers_to_a_local_server(monkeypatch):
+    """SMTPSession against aiosmtpd, the stand-in server the SMTP settings document."""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    from aiosmtpd.handlers import Sink
+
+    class Recorder(Sink):
+        def __init__(self):
+            self.envelopes = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.envelopes.append(envelope)
+            return '250 OK'
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    handler = Recorder()
+    controller = controller_module.Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    try:
+        monkeypatch.setattr(A, 'SMTP_SERVER', '127.0.0.1')
+        monkeypatch.setattr(A, 'SMTP_PORT', port)
+        monkeypatch.setattr(A, 'SMTP_STARTTLS', False)
+        monkeypatch.setattr(A, 'SENDER_PASSWORD', None)
+        monkeypatch.setattr(A, 'SENDER_EMAIL', 'scheduler@example.com')
+        session = A.SMTPSession()
+        row = {'recipients': ['a@example.com', 'b@example.com'], 'subject': 'Meeting Updated: Budget',
+               'body': 'Date: 2026-10-20'}
+        session.send(row['recipients'], A.outbox_message(row))
+        session.send(['c@example.com'], A.outbox_message(dict(row, recipients=['c@example.com'])))
+        session.close()
+    finally:
+        controller.stop()
+
+    assert [e.rcpt_tos for e in handler.envelopes] == [['a@example.com', 'b@example.com'], ['c@example.com']]
+    assert handler.envelopes[0].mail_from == 'scheduler@example.com'
+    assert b'Subject: Meeting Updated: Budget' in handler.envelopes[0].content
+
+
+def test_failed_delete_queues_no_cancellation(client, monkeypatch):
+    queued, transaction = [], {'open': False}
+
+    @contextlib.contextmanager
+    def fake_transaction():
+        transaction['open'] = True
+        try:
+            yield None
+        finally:
+            transaction['open'] = False
+
+    def execute_query(query, params=None, fetch='all', commit=False, **kwargs):
+        if query.lstrip().startswith("DELETE FROM meeting "):
+            raise A.psycopg2.errors.LockNotAvailable("busy")
+        if fetch == 'one':
+            return {'meeting_title': "Budget", 'meeting_date': A.date(2099, 6, 1)}
+        return [{'email': 'a@x'}]
+    monkeypatch.setattr(A, 'execute_query', execute_query)
+    monkeypatch.setattr(A, 'transaction', fake_transaction)
+    monkeypatch.setattr(A, 'enqueue_email', lambda *args: queued.append(transaction['open']))
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+    with pytest.raises(A.psycopg2.errors.LockNotAvailable):
+        client.get("/faculty/delete-meeting/7")
+    assert queued == []
+
+    monkeypatch.setattr(A, 'execute_query', lambda query, params=None, fetch='all', **kw: (
+        {'meeting_title': "Budget", 'meeting_date': A.date(2099, 6, 1)} if fetch == 'one' else [{'email': 'a@x'}]))
+    monkeypatch.setattr(A, 'meeting_written', lambda *a, **kw: None)
+    assert client.get("/faculty/delete-meeting/7").status_code == 302
+    assert queued == [True]     # queued inside the transaction
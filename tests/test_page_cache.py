@@ -0,0 +1,35 @@
+import hashlib
+import pickle
+from datetime import date, datetime, time, timezone
+
+import app as A
+
+
+def test_file_store_round_trips_listing_rows(tmp_path):
+    store = A.FilePageStore(str(tmp_path), 10)
+    entry = {"built_at": 1.5, "data": {
+        "meetings": [{"meeting_id": 1, "meeting_date": date(2099, 6, 1), "start_time": time(9, 30),
+                      "venue": None, "participant_count": 3,
+                      "updated_at": datetime(2099, 6, 1, 8, tzinfo=timezone.utc)}],
+        "search_query": "", "next_cursor": None, "xlsx_export": False}}
+    store.set("key", entry)
+    assert store.get("key") == entry
+    assert store.get("other") is None
+
+
+def test_file_store_never_unpickles(tmp_path):
+    class Boom:
+        def __reduce__(self):
+            return (exec, ("raise SystemExit('unpickled')",))
+
+    store = A.FilePageStore(str(tmp_path), 10)
+    path = tmp_path / (hashlib.sha256(b"key").hexdigest() + ".page")
+    path.write_bytes(pickle.dumps(Boom()))
+    assert store.get("key") is None
+
+
+def test_file_store_keeps_at_most_size_pages(tmp_path):
+    store = A.FilePageStore(str(tmp_path), 2)
+    for n in range(4):
+        store.set(f"page{n}", {"built_at": n, "data": {}})
+    assert len(list(tmp_path.glob("*.page"))) == 2
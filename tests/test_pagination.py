@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+import app as A
+
+KEY_COLUMNS, KEY_FIELDS = A.MEETING_PAGE_KEY
+
+
+def test_cursor_round_trip():
+    token = A.encode_cursor([date(2099, 6, 1), 42])
+    assert "=" not in token
+    assert A.decode_cursor(token) == ["2099-06-01", 42]
+
+
+@pytest.mark.parametrize('token', [None, "", "!!!", A.encode_cursor({"a": 1})[:-1], "bm90IGpzb24"])
+def test_decode_cursor_rejects_garbage(token):
+    assert A.decode_cursor(token) is None
+
+
+def test_page_query_seeks_past_the_cursor():
+    args = {"after": A.encode_cursor(["2099-06-01", 42]), "limit": "10"}
+    query, params, page = A.page_query("SELECT * FROM meeting m", ["m.user_id = %s"], [7], KEY_COLUMNS, args,
+                                       key_types=A.MEETING_KEY_TYPES)
+    assert "((m.meeting_date, m.meeting_id) < (%s, %s))" in query
+    assert query.endswith("ORDER BY m.meeting_date DESC, m.meeting_id DESC LIMIT %s")
+    assert params == [7, date(2099, 6, 1), 42, 11]
+    assert page == (10, True, [date(2099, 6, 1), 42])
+
+
+def test_page_query_before_cursor_walks_backwards():
+    args = {"before": A.encode_cursor(["2099-06-01", 42])}
+    query, params, page = A.page_query("SELECT * FROM meeting m", [], [], KEY_COLUMNS, args,
+                                       key_types=A.MEETING_KEY_TYPES)
+    assert "(m.meeting_date, m.meeting_id) > (%s, %s)" in query
+    assert "ASC" in query
+    assert page == (A.PAGE_SIZE, False, [date(2099, 6, 1), 42])
+
+
+@pytest.mark.parametrize('values', [
+    [["x"], 42],
+    ["2099-06-01", {"id": 1}],
+    ["not a date", 42],
+    [20990601, 42],
+    ["2099-06-01", "forty-two"],
+])
+def test_forged_cursor_values_are_ignored(values):
+    args = {"after": A.encode_cursor(values)}
+    query, params, page = A.page_query("SELECT * FROM meeting m", [], [], KEY_COLUMNS, args,
+                                       key_types=A.MEETING_KEY_TYPES)
+    assert "WHERE" not in query
+    assert params == [A.PAGE_SIZE + 1]
+    assert page == (A.PAGE_SIZE, True, None)
+
+
+def test_untyped_cursor_accepts_only_scalars():
+    args = {"after": A.encode_cursor([[1, 2]])}
+    query, params, _ = A.page_query("SELECT * FROM department", [], [], ["department_id"], args)
+    assert "WHERE" not in query
+    args = {"after": A.encode_cursor([5])}
+    query, params, _ = A.page_query("SELECT * FROM department", [], [], ["department_id"], args)
+    assert params == [5, A.PAGE_SIZE + 1]
+
+
+def test_page_rows_cursors():
+    rows = [{"meeting_date": date(2099, 6, d), "meeting_id": d} for d in (5, 4, 3)]
+    page, next_cursor, prev_cursor = A.page_rows(list(rows), (2, True, None), KEY_FIELDS)
+    assert page == rows[:2]
+    assert A.decode_cursor(next_cursor) == ["2099-06-04", 4]
+    assert prev_cursor is None
+
+    # A ?before= page arrives in ascending order and is turned around.
+    page, next_cursor, prev_cursor = A.page_rows(list(reversed(rows)), (2, False, [date(2099, 6, 6), 6]), KEY_FIELDS)
+    assert page == [rows[1], rows[2]]
+    assert A.decode_cursor(prev_cursor) == ["2099-06-04", 4]
+    assert A.decode_cursor(next_cursor) == ["2099-06-03", 3]
+
+
+def test_search_meetings_route_ignores_forged_cursor(client, monkeypatch):
+    seen = []
+    monkeypatch.setattr(A, 'is_admin', lambda: True)
+    monkeypatch.setattr(A, 'execute_query', lambda query, params=None, **kw: seen.append(params) or [])
+    response = client.get("/admin/search-meetings?after=" + A.encode_cursor([[1], {"x": 2}]))
+    assert response.status_code == 200
+    assert response.get_json() == {"meetings": [], "next": None, "prev": None}
+    assert seen[0] == [A.PAGE_SIZE + 1]       # the meeting query; seen[1] looks up series
@@ -0,0 +1,56 @@
+from datetime import date
+
+import psycopg2.extras
+
+import app as A
+
+DAY = date(2099, 6, 1)
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for execute_values: it records each statement sent."""
+    encoding = "UTF8"
+
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.closed = False
+
+    def mogrify(self, template, args):
+        return template % tuple(repr(a).encode() for a in args)
+
+    def execute(self, sql):
+        self.connection.statements.append(sql)
+
+    def close(self):
+        self.closed = True
+
+
+def test_duplicates_are_inserted_once_in_first_seen_order(monkeypatch):
+    calls = []
+    monkeypatch.setattr(psycopg2.extras, "execute_values",
+                        lambda cursor, sql, rows, page_size: calls.append((rows, page_size)))
+    A.insert_participants(FakeConnection(), 7, ["3", 1, 3, "1", 2], DAY)
+    assert calls == [([(3, 7, DAY), (1, 7, DAY), (2, 7, DAY)], A.PARTICIPANT_BATCH_SIZE)]
+
+
+def test_no_participants_means_no_statement():
+    conn = FakeConnection()
+    A.insert_participants(conn, 7, [], DAY)
+    assert conn.statements == []
+
+
+def test_one_statement_per_batch(monkeypatch):
+    monkeypatch.setattr(A, "PARTICIPANT_BATCH_SIZE", 2)
+    conn = FakeConnection()
+    A.insert_participants(conn, 7, [1, 2, 3, 2, 4, 5], DAY)
+    assert len(conn.statements) == 3                # 5 distinct users, 2 per INSERT
+    assert all(s.startswith(b"INSERT INTO meeting_participant") for s in conn.statements)
+    assert conn.statements[-1].endswith(b"VALUES (5,7,datetime.date(2099, 6, 1))")
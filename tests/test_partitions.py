@@ -0,0 +1,101 @@
+import contextlib
+from datetime import date
+
+import pytest
+
+import app as A
+import migrate
+
+
+@pytest.mark.parametrize("day, months, expected", [
+    (date(2026, 10, 18), 0, date(2026, 10, 1)),
+    (date(2026, 12, 31), 1, date(2027, 1, 1)),
+    (date(2026, 1, 15), -1, date(2025, 12, 1)),
+    (date(2026, 3, 1), -27, date(2023, 12, 1)),
+])
+def test_first_of_month(day, months, expected):
+    assert A.first_of_month(day, months) == expected
+
+
+class FakeDatabase:
+    """execute_query stand-in: records statements, answers the catalog queries."""
+
+    def __init__(self, partitions, used=(), broken=()):
+        self.partitions = partitions
+        self.used = set(used)
+        self.broken = set(broken)
+        self.statements = []
+
+    def execute_query(self, query, params=None, fetch='all', commit=False, **kwargs):
+        sql = " ".join(query.split())
+        self.statements.append(sql)
+        if 'create_meeting_partition' in sql:
+            return {'created': False}
+        if 'pg_inherits' in sql:
+            return [{'relname': name} for name in self.partitions]
+        if 'pg_constraint' in sql:
+            return [{'conname': 'meeting_participant_meeting_id_meeting_date_fkey'}]
+        if sql.startswith('ALTER TABLE meeting DETACH'):
+            suffix = sql.split('_')[-1]
+            if suffix in self.broken:
+                raise RuntimeError('lock timeout')
+        if 'EXISTS' in sql:
+            return {'used': any(s in sql for s in self.used)}
+        return None
+
+
+@pytest.fixture
+def database(monkeypatch):
+    def install(**kwargs):
+        db = FakeDatabase(**kwargs)
+        monkeypatch.setattr(A, 'execute_query', db.execute_query)
+        monkeypatch.setattr(A, 'transaction', contextlib.nullcontext)
+        monkeypatch.setattr(A, 'notify_change', lambda *a: None)
+        monkeypatch.setattr(A, 'after_commit', lambda fn: None)
+        monkeypatch.setattr(A, 'PARTITION_MONTHS_KEPT', 6)
+        monkeypatch.setattr(A, 'PARTITION_MONTHS_AHEAD', 2)
+        return db
+    return install
+
+
+def test_month_with_rows_drops_its_foreign_key_before_the_meeting_detach(database):
+    db = database(partitions=['meeting_202001'], used=['202001'])
+    created, detached = A.maintain_partitions()
+    assert detached == [date(2020, 1, 1)]
+    ddl = [s for s in db.statements if s.startswith('ALTER TABLE')]
+    assert ddl == [
+        'ALTER TABLE meeting_participant DETACH PARTITION meeting_participant_202001',
+        'ALTER TABLE meeting_participant_202001 DROP CONSTRAINT "meeting_participant_meeting_id_meeting_date_fkey"',
+        'ALTER TABLE meeting DETACH PARTITION meeting_202001',
+    ]
+    assert not any(s.startswith('DROP TABLE') for s in db.statements)
+
+
+def test_empty_month_is_dropped(database):
+    db = database(partitions=['meeting_202001'])
+    A.maintain_partitions()
+    assert 'DROP TABLE meeting_participant_202001, meeting_202001' in db.statements
+
+
+def test_recent_months_are_kept(database):
+    current = A.first_of_month(date.today())
+    db = database(partitions=[f"meeting_{current:%Y%m}"])
+    assert A.maintain_partitions() == ([], [])
+    assert not any('DETACH' in s for s in db.statements)
+
+
+def test_failing_month_does_not_stop_the_others(database):
+    database(partitions=['meeting_202001', 'meeting_202002'], broken=['202001'])
+    created, detached = A.maintain_partitions()
+    assert detached == [date(2020, 2, 1)]
+
+
+def test_index_scanned_accepts_partitions():
+    scan = {'Node Type': 'Index Scan', 'Index Cond': '(x = 1)'}
+    assert migrate.index_scanned(dict(scan, **{'Relation Name': 'meeting_202601'}), 'meeting')
+    assert migrate.index_scanned(dict(scan, **{'Relation Name': 'meeting_default'}), 'meeting')
+    assert not migrate.index_scanned(dict(scan, **{'Relation Name': 'meeting_participant_202601'}), 'meeting')
+    assert migrate.index_scanned({'Node Type': 'Append', 'Plans': [
+        {'Node Type': 'Seq Scan', 'Relation Name': 'meeting_202512'},
+        dict(scan, **{'Relation Name': 'meeting_202601'}),
+    ]}, 'meeting')
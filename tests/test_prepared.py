@@ -0,0 +1,82 @@
+import psycopg2
+import psycopg2.errors
+import pytest
+
+import app as A
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = [("x",)]
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql.split()[0])
+        if sql.startswith("EXECUTE") and self.conn.fail_execute:
+            raise self.conn.fail_execute
+
+    def fetchone(self):
+        return (1,)
+
+    def __iter__(self):
+        return iter([(1,)])
+
+
+class FakeConn:
+    def __init__(self, fail_execute=None):
+        self.prepared = set()
+        self.statements = []
+        self.fail_execute = fail_execute
+        self.closed = False
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    holder = {}
+
+    def use(fake):
+        holder['conn'] = fake
+        monkeypatch.setattr(A, 'get_db', lambda: fake)
+        monkeypatch.setattr(A, 'release_db', lambda c: None)
+        monkeypatch.setattr(A, 'DB_PREPARE', True)
+        return fake
+    return use
+
+
+NAME = A.prepared_statement('test_prepared_one', "SELECT %s AS x")
+
+
+def test_prepares_once_per_connection(conn):
+    fake = conn(FakeConn())
+    assert A.execute_prepared(NAME, (1,)) == [{'x': 1}]
+    assert A.execute_prepared(NAME, (1,)) == [{'x': 1}]
+    assert fake.statements == ['PREPARE', 'EXECUTE', 'EXECUTE']
+
+
+def test_failed_execute_keeps_statement_marked_prepared(conn):
+    fake = conn(FakeConn(fail_execute=psycopg2.errors.DivisionByZero()))
+    with pytest.raises(psycopg2.Error):
+        A.execute_prepared(NAME, (1,))
+    assert NAME in fake.prepared
+
+    fake.fail_execute = None
+    A.execute_prepared(NAME, (1,))
+    assert fake.statements == ['PREPARE', 'EXECUTE', 'EXECUTE']
+
+
+def test_missing_statement_is_prepared_again(conn):
+    fake = conn(FakeConn(fail_execute=psycopg2.errors.InvalidSqlStatementName()))
+    fake.prepared.add(NAME)
+    with pytest.raises(psycopg2.Error):
+        A.execute_prepared(NAME, (1,))
+    assert NAME not in fake.prepared
+
+
+def test_positional_query_numbers_placeholders():
+    assert A.positional_query("a = %s AND b = ANY(%s)") == "a = $1 AND b = ANY($2)"
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+import app as A
+
+START = date(2099, 1, 31)       # a month end, so MONTHLY skips the short months
+
+
+def brute_force(rule, start, end):
+    """The rule's dates in [start, end] by testing every day with occurs_on()."""
+    days = []
+    day = start
+    while day <= end:
+        if rule.occurs_on(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+@pytest.mark.parametrize('rrule', [
+    'FREQ=DAILY;COUNT=20',
+    'FREQ=DAILY;INTERVAL=3;UNTIL=20990401',
+    'FREQ=WEEKLY;COUNT=15',
+    'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE,FR;UNTIL=20990601',
+    'FREQ=MONTHLY;COUNT=12',
+    'FREQ=MONTHLY;INTERVAL=2;UNTIL=21001231',
+])
+def test_between_matches_occurs_on(rrule):
+    rule = A.Recurrence(rrule, START)
+    window_start, window_end = START - timedelta(days=10), date(2101, 1, 1)
+    assert list(rule.between(window_start, window_end)) == brute_force(rule, window_start, window_end)
+    middle = START + timedelta(days=40)
+    assert list(rule.between(middle, window_end)) == brute_force(rule, middle, window_end)
+
+
+def test_count_and_until():
+    rule = A.Recurrence('FREQ=WEEKLY;BYDAY=TU,TH;COUNT=5', date(2099, 6, 2))     # a Tuesday
+    assert list(rule.between(date(2099, 1, 1), date(2100, 1, 1))) == [
+        date(2099, 6, 2), date(2099, 6, 4), date(2099, 6, 9), date(2099, 6, 11), date(2099, 6, 16)]
+    assert rule.last == date(2099, 6, 16)
+    assert A.Recurrence('FREQ=DAILY;UNTIL=20990605', date(2099, 6, 2)).last == date(2099, 6, 5)
+
+
+@pytest.mark.parametrize('rrule, message', [
+    ('FREQ=DAILY', 'needs an end date'),
+    ('FREQ=YEARLY;COUNT=2', 'daily, weekly or monthly'),
+    ('FREQ=DAILY;INTERVAL=0;COUNT=2', 'Repeat interval'),
+    ('FREQ=DAILY;BYDAY=MO;COUNT=2', 'weekly'),
+    ('FREQ=DAILY;UNTIL=20980101', 'no meetings'),
+])
+def test_invalid_rules(rrule, message):
+    with pytest.raises(ValueError, match=message):
+        A.Recurrence(rrule, START)
+
+
+@pytest.mark.parametrize('form, first_date', [
+    ({'repeat': 'DAILY', 'repeat_interval': '999999999', 'repeat_count': '3'}, date(2026, 1, 1)),
+    ({'repeat': 'DAILY', 'repeat_count': '3'}, date(9999, 12, 30)),
+    ({'repeat': 'MONTHLY', 'repeat_interval': '99', 'repeat_count': '5'}, date(9999, 12, 30)),
+    ({'repeat': 'MONTHLY', 'repeat_interval': '99', 'repeat_count': '5'}, date(2026, 1, 1)),
+    ({'repeat': 'DAILY', 'repeat_until': '9999-12-31'}, date(2026, 1, 1)),
+])
+def test_series_rule_turns_calendar_overflow_into_form_errors(form, first_date):
+    with pytest.raises(ValueError):
+        A.series_rule(MultiDict(form), first_date)
+
+
+def test_rule_ending_at_the_last_supported_date():
+    rule = A.series_rule(MultiDict({'repeat': 'DAILY', 'repeat_until': '9999-12-31'}), date(9999, 12, 29))
+    assert list(rule.between(date(9999, 1, 1), date.max)) == [
+        date(9999, 12, 29), date(9999, 12, 30), date(9999, 12, 31)]
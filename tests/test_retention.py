@@ -0,0 +1,27 @@
+import pytest
+
+import app as A
+
+
+@pytest.fixture
+def no_database(monkeypatch):
+    calls = []
+    monkeypatch.setattr(A, 'execute_query', lambda *args, **kwargs: calls.append(args) or [])
+    monkeypatch.setattr(A, 'maintain_partitions', lambda: calls.append("partitions"))
+    monkeypatch.setattr(A, 'prune_meeting_tombstones', lambda: calls.append("tombstones"))
+    monkeypatch.setattr(A, 'flush_metrics', lambda force=False: None)
+    return calls
+
+
+def test_retention_archives_nothing_unless_configured(no_database, monkeypatch):
+    monkeypatch.setattr(A, 'RETENTION_DAYS', 0)
+    assert A.archive_batch() == (0, 0)
+    assert A.run_retention() == 0
+    assert no_database == ["partitions", "tombstones"]
+
+
+def test_retention_archives_past_meetings_when_configured(no_database, monkeypatch):
+    monkeypatch.setattr(A, 'RETENTION_DAYS', 30)
+    monkeypatch.setattr(A, 'transaction', A.contextmanager(lambda: (yield None)))
+    assert A.archive_batch() == (0, 0)      # nothing due
+    assert no_database[-1] == (A.RETENTION_BATCH_QUERY, (30, A.RETENTION_BATCH_SIZE))
@@ -0,0 +1,169 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+import app as A
+
+KEY_COLUMNS, _ = A.MEETING_PAGE_KEY
+
+
+def series_row(series_id, rrule, first_date, **extra):
+    rule = A.Recurrence(rrule, first_date)
+    return dict({
+        'series_id': series_id, 'meeting_title': f"Series {series_id}", 'rrule': rrule,
+        'first_date': first_date, 'last_date': rule.last, 'start_time': time(9), 'end_time': time(10),
+        'venue': "Room 1", 'organizer_id': 1, 'department_id': 3, 'meeting_department_name': "Physics",
+        'user_name': "Ann", 'user_mobileno': None, 'participant_count': 2,
+        'updated_at': datetime(2099, 1, 1, tzinfo=timezone.utc),
+    }, **extra)
+
+
+def meeting(meeting_id, day):
+    return {'meeting_id': meeting_id, 'meeting_title': f"Meeting {meeting_id}", 'meeting_date': day,
+            'start_time': time(11), 'end_time': time(12), 'venue': None, 'user_id': 2,
+            'department_name': "Physics", 'user_name': "Bob", 'user_mobileno': None, 'participant_count': 1}
+
+
+MEETINGS = [meeting(i, date(2099, 6, 1) + timedelta(days=(i * 7) % 40)) for i in range(1, 31)]
+SERIES_ROWS = [series_row(1, 'FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10', date(2099, 6, 1)),
+               series_row(2, 'FREQ=DAILY;INTERVAL=3;COUNT=8', date(2099, 6, 5))]
+
+
+def listing_page(args):
+    """fetch_listing_page() with the meeting query answered from MEETINGS."""
+    _, _, page = A.page_query("SELECT", [], [], KEY_COLUMNS, args, key_types=A.MEETING_KEY_TYPES)
+    limit, forward, cursor = page
+    key = lambda m: (m['meeting_date'], m['meeting_id'])
+    rows = sorted(MEETINGS, key=key, reverse=forward)
+    if cursor is not None:
+        rows = [m for m in rows if (key(m) < tuple(cursor) if forward else key(m) > tuple(cursor))]
+    rows = [dict(m) for m in rows[:limit + 1]]
+    start, end = A.occurrence_window(rows, page)
+    series = [A.Series(row) for row in SERIES_ROWS]
+    start, end = A.series_span(SERIES_ROWS, start, end)
+    return A.merge_listing(rows, A.listing_occurrences(series, start, end), page)
+
+
+def everything():
+    occurrences = A.listing_occurrences([A.Series(row) for row in SERIES_ROWS], date(2099, 1, 1), date(2100, 1, 1))
+    rows = [dict(m, list_key=m['meeting_id']) for m in MEETINGS] + occurrences
+    return [(r['meeting_date'], r['list_key']) for r in sorted(
+        rows, key=lambda r: (r['meeting_date'], r['list_key']), reverse=True)]
+
+
+def test_pages_cover_meetings_and_occurrences_exactly_once():
+    seen, args = [], {"limit": "7"}
+    while True:
+        rows, next_cursor, prev_cursor = listing_page(args)
+        assert len(rows) <= 7
+        seen += [(r['meeting_date'], r['list_key']) for r in rows]
+        if not next_cursor:
+            break
+        args = {"limit": "7", "after": next_cursor}
+    assert seen == everything()
+    assert len([key for key in seen if key[1] < 0]) == 18
+
+    # ...and back again through the ?before= cursors.
+    back = [(r['meeting_date'], r['list_key']) for r in rows]
+    while prev_cursor:
+        rows, _, prev_cursor = listing_page({"limit": "7", "before": prev_cursor})
+        back = [(r['meeting_date'], r['list_key']) for r in rows] + back
+    assert back == everything()
+
+
+def test_occurrence_rows_have_the_listing_columns():
+    [occ] = A.listing_occurrences([A.Series(SERIES_ROWS[0])], date(2099, 6, 1), date(2099, 6, 1))
+    assert occ['meeting_id'] is None
+    assert occ['list_key'] == -1
+    assert occ['department_name'] == "Physics"
+    assert occ['user_id'] == 1
+    assert A.search_result(occ)['meeting_date'] == "2099-06-01"
+
+
+def test_import_sweep_rejects_rows_overlapping_an_occurrence(monkeypatch):
+    series = A.Series(SERIES_ROWS[0])
+    series.members = {5: "Eve"}
+    monkeypatch.setattr(A, 'execute_query', lambda *a, **kw: [])
+    monkeypatch.setattr(A, 'participant_series', lambda ids, start, end: [series])
+    rows = [
+        {"line": 2, "meeting_title": "Clash", "meeting_date": date(2099, 6, 4),      # a Thursday
+         "start_time": time(9, 30), "end_time": time(10, 30), "participants": [5, 6]},
+        {"line": 3, "meeting_title": "Fine", "meeting_date": date(2099, 6, 4),
+         "start_time": time(10), "end_time": time(11), "participants": [5]},
+        {"line": 4, "meeting_title": "Free day", "meeting_date": date(2099, 6, 3),
+         "start_time": time(9), "end_time": time(10), "participants": [5]},
+    ]
+    rejected = A.sweep_import_conflicts(rows)
+    assert list(rejected) == [2]
+    assert "Series 1" in rejected[2]
+
+
+def test_ics_series_has_rrule_exdate_and_override():
+    series = A.Series(SERIES_ROWS[0])
+    series.add_exception({'occurrence_date': date(2099, 6, 4), 'cancelled': True, 'meeting_date': None,
+                          'start_time': None, 'end_time': None, 'venue': None})
+    series.add_exception({'occurrence_date': date(2099, 6, 8), 'cancelled': False, 'meeting_date': date(2099, 6, 9),
+                          'start_time': time(14), 'end_time': None, 'venue': None})
+    text = A.ics_series(series, "example.org")
+    assert text.count("BEGIN:VEVENT") == 2
+    assert "UID:series-1@example.org" in text
+    assert "DTSTART:20990601T090000" in text
+    assert "RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=10;BYDAY=MO,TH" in text
+    assert "EXDATE:20990604T090000" in text
+    assert "RECURRENCE-ID:20990608T090000" in text
+    assert "DTSTART:20990609T140000" in text
+
+
+def test_ics_series_starts_at_the_first_real_occurrence():
+    # Starts on a Wednesday but only meets on Mondays: DTSTART must be an occurrence.
+    series = A.Series(series_row(7, 'FREQ=WEEKLY;BYDAY=MO;COUNT=3', date(2099, 6, 3)))
+    text = A.ics_series(series, "example.org")
+    assert "DTSTART:20990608T090000" in text
+    assert "COUNT=3" in text
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(A, 'is_admin', lambda: True)
+
+
+def test_export_merges_occurrences_newest_first(client, admin, monkeypatch):
+    def execute_query(query, params=None, fetch='all', **kwargs):
+        if "meeting_series" in query:
+            return iter(SERIES_ROWS[1:])
+        return iter(sorted(MEETINGS[:5], key=lambda m: (m['meeting_date'], m['meeting_id']), reverse=True))
+    monkeypatch.setattr(A, 'execute_query', execute_query)
+    monkeypatch.setattr(A, 'execute_prepared', lambda name, params=(), **kw: [])
+    lines = client.get("/admin/export-meetings").get_data(as_text=True).splitlines()[1:]
+    dates = [line.split(",")[2] for line in lines]
+    assert len(lines) == 5 + 8
+    assert dates == sorted(dates, reverse=True)
+    assert sum(1 for line in lines if line.startswith(",Series 2,")) == 8
+
+
+def test_export_occurrences_match_a_full_expansion(monkeypatch):
+    rows = [series_row(n, f'FREQ=DAILY;INTERVAL={n};COUNT={10 * n}', date(2099, 6, n)) for n in range(1, 6)]
+    rows.sort(key=lambda r: (r['last_date'], r['series_id']), reverse=True)
+    monkeypatch.setattr(A, 'execute_query', lambda query, params=None, fetch='all', **kw: iter(rows))
+    monkeypatch.setattr(A, 'execute_prepared', lambda name, params=(), **kw: [])
+    expected = sorted(A.listing_occurrences([A.Series(r) for r in rows], date(2099, 1, 1), date(2101, 1, 1)),
+                      key=lambda o: (o['meeting_date'], o['list_key']), reverse=True)
+    got = list(A.export_occurrences([], []))
+    assert [(o['meeting_date'], o['list_key']) for o in got] == \
+        [(o['meeting_date'], o['list_key']) for o in expected]
+
+
+def test_export_occurrences_read_series_only_as_the_export_reaches_them(monkeypatch):
+    rows = [series_row(n, 'FREQ=WEEKLY;COUNT=3', date(2099, 6, 1) - timedelta(weeks=10 * n)) for n in range(1, 4)]
+    read = []
+
+    def series_stream():
+        for row in rows:
+            read.append(row['series_id'])
+            yield row
+    monkeypatch.setattr(A, 'execute_query', lambda query, params=None, fetch='all', **kw: series_stream())
+    monkeypatch.setattr(A, 'execute_prepared', lambda name, params=(), **kw: [])
+    occurrences = A.export_occurrences([], [])
+    assert next(occurrences)['list_key'] == -1
+    assert read == [1, 2]       # the second series is only peeked at, the third not read
+    assert len(list(occurrences)) == 8